@@ -1,6 +1,16 @@
+import os
+
 import pandas as pd
+from locking import get_data_lock, write_locked
+from money import read_csv_with_amounts
+from profiles import DATA_DIR
+from snapshots import load_snapshot, save_csv_with_snapshot, write_snapshot
+from telemetry import track_operation
+
+ACCOUNTS_FILENAME = "accounts.csv"
 
-ACCOUNTS_FILE = "data/accounts.csv"
+# Held in memory as integer cents, written to the CSV file as decimal amounts.
+AMOUNT_COLUMNS = ["Balance", "Goal_Amount"]
 
 
 class Account:
@@ -8,17 +18,19 @@ class Account:
     Represents one financial account.
     """
 
+    __slots__ = ("account_id", "name", "balance", "is_goal", "goal_amount", "note")
+
     def __init__(
         self,
         account_id: int,
         name: str,
-        balance: float,
+        balance: int,
         is_goal: str = "No",
-        goal_amount: float = "",
+        goal_amount: int = "",
         note: str = "",
     ) -> None:
         """
-        Initializes a new account.
+        Initializes a new account. The balance and goal amount are in cents.
         """
         self.account_id = account_id
         self.name = name
@@ -44,13 +56,16 @@ class Account:
 class AccountService:
     """
     Manages accounts and their manipulation in a CSV file.
+    Balances and goal amounts are kept as integer cents.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, data_dir: str = DATA_DIR) -> None:
         """
-        Initializes the class with a path to the CSV file.
+        Initializes the class with the path to the CSV file in the profile's data directory.
+        The file is loaded on first access to the accounts.
         """
-        self.filepath = ACCOUNTS_FILE
+        self.filepath = os.path.join(data_dir, ACCOUNTS_FILENAME)
+        self.lock = get_data_lock(data_dir)
         self.columns = [
             "Account_ID",
             "Name",
@@ -59,30 +74,102 @@ class AccountService:
             "Goal_Amount",
             "Note",
         ]
-        self.load_or_initialize_accounts_file()
+        self.version = 0
+        self._df = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Returns the accounts DataFrame, loading the CSV file on first access.
+        The file is loaded under the write lock, so two threads never both load it.
+        """
+        if self._df is None:
+            with self.lock.write():
+                if self._df is None:
+                    self.load_or_initialize_accounts_file()
+        return self._df
+
+    @df.setter
+    def df(self, accounts_df: pd.DataFrame) -> None:
+        """
+        Replaces the accounts DataFrame.
+        """
+        self._df = accounts_df
 
+    def snapshot(self) -> tuple:
+        """
+        Returns the accounts version and DataFrame as one consistent pair. Changes are
+        made on a copy of the DataFrame, so the returned one can be read without a lock.
+        """
+        while True:
+            # Loading takes the write lock, so it cannot happen under the read lock.
+            self.df
+            with self.lock.read():
+                if self._df is not None:
+                    return self.version, self._df
+
+    def copy_on_write(self) -> None:
+        """
+        Replaces the DataFrame with a shallow copy before a change, so snapshots
+        handed out earlier keep their data.
+        """
+        if self._df is not None:
+            self._df = self._df.copy(deep=False)
+
+    @track_operation
     def load_or_initialize_accounts_file(self) -> None:
         """
         Loads the accounts CSV file or creates a new one if it doesn't exist.
+        Uses the binary snapshot instead of parsing the CSV file when it is up to date.
         """
         try:
-            self.df = pd.read_csv(self.filepath)
+            snapshot_df = load_snapshot(self.filepath)
+            if snapshot_df is not None:
+                self.df = snapshot_df
+                return
+            self.df = read_csv_with_amounts(self.filepath, AMOUNT_COLUMNS)
+            self.normalize_columns()
+            write_snapshot(self.filepath, self.df)
         except FileNotFoundError:
             self.df = pd.DataFrame(columns=self.columns)
             main_account = Account(
-                account_id=self.get_new_account_id(), name="Main", balance=0.0
+                account_id=self.get_new_account_id(), name="Main", balance=0
             )
             self.df = pd.concat(
                 [self.df, pd.DataFrame([main_account.convert_to_dict()])],
                 ignore_index=True,
             )
-            self.df.to_csv(self.filepath, index=False)
+            self.save_accounts_to_file()
 
+    @track_operation
+    @write_locked
     def save_accounts_to_file(self) -> None:
         """
-        Saves the DataFrame of accounts to the CSV file.
+        Saves the DataFrame of accounts to the CSV file and refreshes its snapshot.
         """
-        self.df.to_csv(self.filepath, index=False)
+        self.normalize_columns()
+        save_csv_with_snapshot(self.filepath, self.df, AMOUNT_COLUMNS)
+        self.version += 1
+
+    @write_locked
+    def reload(self) -> None:
+        """
+        Drops the loaded accounts so the file is read again on next access, e.g. after
+        a checkpoint rollback. The version is bumped so caches built on it are dropped too.
+        """
+        self.df = None
+        self.version += 1
+
+    def normalize_columns(self) -> None:
+        """
+        Gives the columns the same types they have after loading the CSV file,
+        so the saved snapshot matches a fresh load.
+        """
+        self.df["Account_ID"] = self.df["Account_ID"].astype(int)
+        self.df["Balance"] = self.df["Balance"].astype("int64")
+        self.df["Goal_Amount"] = pd.to_numeric(self.df["Goal_Amount"], errors="coerce").astype("Int64")
+        self.df["Note"] = self.df["Note"].mask(self.df["Note"] == "")
+        self.df = self.df.infer_objects()
 
     def get_new_account_id(self) -> int:
         """
@@ -93,16 +180,18 @@ class AccountService:
         else:
             return self.df["Account_ID"].max() + 1
 
+    @track_operation
+    @write_locked
     def add_account(
         self,
         name: str,
-        balance: float,
+        balance: int,
         is_goal: str = "No",
-        goal_amount: float = "",
+        goal_amount: int = "",
         note: str = "",
     ) -> Account:
         """
-        Adds a new account with a unique ID.
+        Adds a new account with a unique ID. The balance and goal amount are in cents.
         """
         account = Account(
             account_id=self.get_new_account_id(),
@@ -117,6 +206,22 @@ class AccountService:
         self.save_accounts_to_file()
         return account
 
+    @track_operation
+    @write_locked
+    def restore_account(self, account_record: dict) -> None:
+        """
+        Puts back a deleted account (a row as returned by DataFrame.to_dict("records"))
+        at its place in the ID order.
+        """
+        self.df = (
+            pd.concat([self.df, pd.DataFrame([account_record])], ignore_index=True)
+            .sort_values("Account_ID", kind="stable")
+            .reset_index(drop=True)
+        )
+        self.save_accounts_to_file()
+
+    @track_operation
+    @write_locked
     def edit_account_name(self, account_id: int, new_name: str) -> None:
         """
         Edits an existing account's name.
@@ -124,6 +229,8 @@ class AccountService:
         self.df.loc[self.df["Account_ID"] == account_id, "Name"] = new_name
         self.save_accounts_to_file()
 
+    @track_operation
+    @write_locked
     def delete_account(self, account_id: int) -> None:
         """
         Deletes an account and transfers its balance to the Main account.
@@ -147,9 +254,9 @@ class AccountService:
         else:
             print(f"Account with ID '{account_id}' was not found.")
 
-    def get_account_balance(self, account_name: str) -> float:
+    def get_account_balance(self, account_name: str) -> int:
         """
-        Retrieves the balance of an account by its name.
+        Retrieves the balance in cents of an account by its name.
         Returns the balance if the account is found, otherwise None.
         """
         account_row = self.df[self.df["Name"].str.lower() == account_name.lower()]
@@ -159,9 +266,11 @@ class AccountService:
             print(f"Account with name '{account_name}' was not found.")
             return None
 
-    def update_account_balance(self, account_name: str, amount: float) -> None:
+    @track_operation
+    @write_locked
+    def update_account_balance(self, account_name: str, amount: int) -> None:
         """
-        Updates the balance of an account by a given amount.
+        Updates the balance of an account by a given amount in cents.
         If the amount is negative, it will deduct from the balance.
         """
         account_index = self.df[
@@ -173,7 +282,21 @@ class AccountService:
         else:
             print(f"Account with name '{account_name}' was not found.")
 
-    def check_if_balance_negative(self, account_name: str, amount: float) -> bool:
+    @track_operation
+    @write_locked
+    def update_account_balances(self, amounts: dict) -> None:
+        """
+        Updates the balances of several accounts (by name, amounts in cents) with one save.
+        """
+        amounts = pd.Series(amounts, dtype="int64")
+        amounts = amounts.groupby(amounts.index.str.lower()).sum()
+        account_names = self.df["Name"].str.lower()
+        for account_name in amounts.index.difference(account_names):
+            print(f"Account with name '{account_name}' was not found.")
+        self.df["Balance"] = self.df["Balance"] + account_names.map(amounts).fillna(0).to_numpy(dtype="int64")
+        self.save_accounts_to_file()
+
+    def check_if_balance_negative(self, account_name: str, amount: int) -> bool:
         """
         Checks if the account balance after a transaction would be negative.
         Returns True if the balance would be negative, False otherwise.
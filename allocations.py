@@ -0,0 +1,281 @@
+import os
+
+import numpy as np
+import pandas as pd
+from money import read_csv_with_amounts, to_cents
+from snapshots import save_csv
+from telemetry import track_operation
+
+ALLOCATIONS_FILENAME = "allocations.csv"
+
+ALLOCATION_KINDS = ["Percent", "Fixed"]
+
+# Fixed amounts are held in memory as integer cents, written to the CSV file as decimal amounts.
+AMOUNT_COLUMNS = ["Amount"]
+
+
+class AllocationRule:
+    """
+    Represents one share of an income category that goes to another account:
+    a percentage of the income or a fixed amount in cents, depending on the kind.
+    """
+
+    def __init__(
+        self, rule_id: int, category_name: str, to_account: str, kind: str, percent: float, amount: int
+    ) -> None:
+        """
+        Initializes a new allocation rule.
+        """
+        self.rule_id = rule_id
+        self.category_name = category_name
+        self.to_account = to_account
+        self.kind = kind
+        self.percent = percent
+        self.amount = amount
+
+    def convert_to_dict(self) -> dict:
+        """
+        Converts the rule instance to a dictionary suitable for DataFrame.
+        """
+        return {
+            "Rule_ID": self.rule_id,
+            "Category": self.category_name,
+            "To_Account": self.to_account,
+            "Kind": self.kind,
+            "Percent": self.percent,
+            "Amount": self.amount,
+        }
+
+
+class AllocationService:
+    """
+    Manages income allocation rules in a CSV file and turns an income into the transfers they ask for.
+    """
+
+    def __init__(self, transaction_service: any, account_service: any) -> None:
+        """
+        Initializes the class with the path to the CSV file next to the ledger and the service instances.
+        The file is loaded on first access to the rules.
+        """
+        self.filepath = os.path.join(os.path.dirname(transaction_service.filepath), ALLOCATIONS_FILENAME)
+        self.transaction_service = transaction_service
+        self.account_service = account_service
+        self.columns = ["Rule_ID", "Category", "To_Account", "Kind", "Percent", "Amount"]
+        self._df = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Returns the rules DataFrame, loading the CSV file on first access.
+        """
+        if self._df is None:
+            self.load_or_initialize_allocations_file()
+        return self._df
+
+    @df.setter
+    def df(self, rules_df: pd.DataFrame) -> None:
+        """
+        Replaces the rules DataFrame.
+        """
+        self._df = rules_df
+
+    def load_or_initialize_allocations_file(self) -> None:
+        """
+        Loads the rules CSV file or creates a new one if it doesn't exist.
+        Files with a single Value column for both kinds are split into the
+        Percent and Amount columns.
+        """
+        try:
+            rules_df = pd.read_csv(self.filepath)
+            if "Value" in rules_df.columns:
+                is_percent = rules_df["Kind"] == "Percent"
+                rules_df["Percent"] = rules_df["Value"].where(is_percent, 0.0)
+                rules_df["Amount"] = to_cents(rules_df["Value"].where(~is_percent, 0.0))
+                self.df = rules_df[self.columns]
+                self.save_allocations_to_file()
+            else:
+                self.df = read_csv_with_amounts(self.filepath, AMOUNT_COLUMNS)
+        except FileNotFoundError:
+            self.df = pd.DataFrame(columns=self.columns)
+            self.save_allocations_to_file()
+
+    def save_allocations_to_file(self) -> None:
+        """
+        Saves the DataFrame of rules to the CSV file, with the fixed amounts in decimal units.
+        """
+        save_csv(self.filepath, self.df, AMOUNT_COLUMNS)
+
+    def get_new_rule_id(self) -> int:
+        """
+        Generates a new rule ID.
+        """
+        if self.df.empty:
+            return 1
+        else:
+            return int(self.df["Rule_ID"].max()) + 1
+
+    def add_rule(
+        self, category_name: str, to_account: str, kind: str, value: any
+    ) -> AllocationRule:
+        """
+        Adds a rule sending a percentage or a fixed amount of each income of the category to an account.
+        The value is the percentage for a Percent rule and the amount in cents for a Fixed rule.
+        """
+        is_percent = kind == "Percent"
+        rule = AllocationRule(
+            self.get_new_rule_id(),
+            category_name,
+            to_account,
+            kind,
+            float(value) if is_percent else 0.0,
+            0 if is_percent else int(value),
+        )
+        self.df = pd.concat(
+            [self.df, pd.DataFrame([rule.convert_to_dict()])], ignore_index=True
+        )
+        self.save_allocations_to_file()
+        return rule
+
+    def delete_rule(self, rule_id: int) -> None:
+        """
+        Deletes a rule.
+        """
+        self.df = self.df[self.df["Rule_ID"] != rule_id].reset_index(drop=True)
+        self.save_allocations_to_file()
+
+    def rename_category(self, old_category_name: str, new_category_name: str) -> None:
+        """
+        Moves the rules of a renamed income category to its new name.
+        """
+        if self.df["Category"].eq(old_category_name).any():
+            self.df.loc[self.df["Category"] == old_category_name, "Category"] = new_category_name
+            self.save_allocations_to_file()
+
+    def rename_account(self, old_account_name: str, new_account_name: str) -> None:
+        """
+        Points the rules allocating to a renamed account at its new name.
+        """
+        if self.df["To_Account"].eq(old_account_name).any():
+            self.df.loc[self.df["To_Account"] == old_account_name, "To_Account"] = new_account_name
+            self.save_allocations_to_file()
+
+    def delete_rules(self, column: str, name: str) -> None:
+        """
+        Deletes the rules of a deleted category (column "Category") or allocating
+        to a deleted account (column "To_Account").
+        """
+        if self.df[column].eq(name).any():
+            self.df = self.df[self.df[column] != name].reset_index(drop=True)
+            self.save_allocations_to_file()
+
+    def restore_rules(self, rule_records: list) -> None:
+        """
+        Puts back deleted rules (rows as returned by DataFrame.to_dict("records")).
+        """
+        if not rule_records:
+            return
+        self.df = (
+            pd.concat([self.df, pd.DataFrame(rule_records)], ignore_index=True)
+            .sort_values("Rule_ID", kind="stable")
+            .reset_index(drop=True)
+        )
+        self.save_allocations_to_file()
+
+    def compute_allocations(
+        self, category_name: str, amount: int, from_account: str
+    ) -> pd.DataFrame:
+        """
+        Returns the amount in cents to transfer to each account for an income of the category.
+        Fixed amounts are taken as they are and percentages from the whole income;
+        when they add up to more than the income, all of them are scaled down.
+        Shares are rounded down to whole cents, so the remainder stays on the receiving account.
+        Rules pointing at the receiving account or at a deleted account are ignored.
+        """
+        rules_df = self.df[
+            (self.df["Category"] == category_name)
+            & (self.df["To_Account"] != from_account)
+            & self.df["To_Account"].isin(self.account_service.df["Name"])
+        ]
+        shares = np.where(
+            rules_df["Kind"].to_numpy() == "Percent",
+            amount * rules_df["Percent"].to_numpy(dtype=float) / 100,
+            rules_df["Amount"].to_numpy(dtype=np.int64),
+        )
+        if shares.sum() > amount:
+            shares = shares * amount / shares.sum()
+        shares = np.floor(np.round(shares, 6)).astype(np.int64)
+
+        allocations_df = (
+            pd.DataFrame({"To_Account": rules_df["To_Account"].to_numpy(), "Amount": shares})
+            .groupby("To_Account", sort=False, as_index=False)["Amount"]
+            .sum()
+        )
+        return allocations_df[allocations_df["Amount"] > 0].reset_index(drop=True)
+
+    @track_operation
+    def add_income_with_allocations(
+        self,
+        date: str,
+        amount: int,
+        category_name: str,
+        to_account: str,
+        note: str,
+        allocations_df: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """
+        Records an income and its allocation transfers with one ledger write
+        and one write of the account balances, both under the write lock.
+        Returns the added rows.
+        """
+        account_ids = dict(zip(self.account_service.df["Name"], self.account_service.df["Account_ID"]))
+        count = len(allocations_df)
+        transfer_note = note or f"{category_name} allocation"
+
+        income_df = pd.DataFrame(
+            [
+                {
+                    "Type": "Income",
+                    "Date": date,
+                    "Amount": amount,
+                    "Category": category_name,
+                    "To_Account_ID": account_ids[to_account],
+                    "To_Account": to_account,
+                    "Note": note,
+                }
+            ]
+        )
+        transfers_out_df = pd.DataFrame(
+            {
+                "Type": "Transfer Out",
+                "Date": [date] * count,
+                "Amount": -allocations_df["Amount"].to_numpy(),
+                "Category": "Transfer",
+                "From_Account_ID": account_ids[to_account],
+                "From_Account": to_account,
+                "Note": transfer_note,
+            }
+        )
+        transfers_in_df = pd.DataFrame(
+            {
+                "Type": "Transfer In",
+                "Date": [date] * count,
+                "Amount": allocations_df["Amount"].to_numpy(),
+                "Category": "Transfer",
+                "To_Account_ID": allocations_df["To_Account"].map(account_ids).to_numpy(),
+                "To_Account": allocations_df["To_Account"].to_numpy(),
+                "Note": transfer_note,
+            }
+        )
+        # Each transfer pair stays together, with the transfer in on top like a manual transfer.
+        transfers_df = pd.concat([transfers_out_df, transfers_in_df]).sort_index(kind="stable")
+
+        balance_changes = allocations_df.groupby("To_Account")["Amount"].sum().to_dict()
+        balance_changes[to_account] = (
+            balance_changes.get(to_account, 0) + amount - allocations_df["Amount"].sum()
+        )
+        with self.transaction_service.lock.write():
+            added_df = self.transaction_service.add_transactions(
+                pd.concat([income_df, transfers_df], ignore_index=True)
+            )
+            self.account_service.update_account_balances(balance_changes)
+        return added_df
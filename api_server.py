@@ -0,0 +1,355 @@
+import argparse
+import json
+import threading
+import time
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from cli import REPORT_TYPES, parse_amount, parse_date, record_transaction
+from money import convert_amounts_to_units, to_units
+from telemetry import telemetry_log
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Request bodies above this size are rejected.
+MAX_BODY_BYTES = 64 * 1024
+
+TRANSACTION_COLUMNS = ["Transaction_ID", "Date", "Type", "Amount", "Category", "From_Account", "To_Account", "Note"]
+
+
+class ApiService:
+    """
+    Answers the API requests from one in-memory copy of a profile's data.
+    Every GET response is tagged with the data version (today's date, since reports
+    default to it, and the versions of the ledger, accounts, categories and budgets),
+    kept until the data changes or the day ends and served again without recomputing it. Reports are computed under the read lock of the data directory,
+    so several of them run at the same time, while a posted transaction takes the
+    write lock and waits until they finished.
+    """
+
+    def __init__(self, data_dir: str) -> None:
+        """
+        Initializes the class with the services of the data directory.
+        """
+        from transactions import TransactionService
+        from accounts import AccountService
+        from categories import CategoryService
+        from budgets import BudgetService
+        from goals import GoalService
+        from reports import ReportService
+
+        self.transaction_service = TransactionService(data_dir)
+        self.account_service = AccountService(data_dir)
+        self.category_service = CategoryService(data_dir)
+        self.budget_service = BudgetService(self.transaction_service)
+        self.report_service = ReportService(self.transaction_service, self.category_service, self.account_service)
+        self.goal_service = GoalService(self.transaction_service, self.account_service)
+        self.lock = self.transaction_service.lock
+        self._responses_lock = threading.Lock()
+        self.instance = format(time.time_ns(), "x")
+        self._responses = {}
+        self.routes = {
+            "/accounts": self.get_accounts,
+            "/categories": self.get_categories,
+            "/transactions": self.get_transactions,
+            "/goals": self.get_goals,
+            "/reports/balance": self.get_balance_sheet,
+            "/reports/comparison": self.get_period_comparison,
+            "/reports/pivot": self.get_category_pivot,
+            "/reports/budgets": self.get_budget_report,
+        }
+        # Loading a store may write its file, which cannot happen under a read lock.
+        self.transaction_service.df
+        self.account_service.df
+        self.category_service.categories
+        self.budget_service.df
+
+    def get_etag(self) -> str:
+        """
+        Returns the ETag of the current data version. It starts with a tag of this
+        server instance, since the versions start over when the server is restarted.
+        """
+        versions = [
+            self.transaction_service.version,
+            self.account_service.version,
+            self.category_service.version,
+            self.budget_service.version,
+        ]
+        return f'"{self.instance}-{date.today().strftime("%Y%m%d")}-{"-".join(map(str, versions))}"'
+
+    def get(self, path: str, query: dict) -> tuple:
+        """
+        Returns the ETag and the JSON body of a GET request, computing the body only
+        if it was not computed for the current data version yet.
+        Raises LookupError for an unknown path and ValueError for invalid parameters.
+        """
+        if path not in self.routes:
+            raise LookupError(f"unknown endpoint '{path}'")
+        cache_key = (path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        with self.lock.read():
+            etag = self.get_etag()
+            cached = self._responses.get(cache_key)
+            if cached is not None and cached[0] == etag:
+                return cached
+            cached = (etag, json.dumps(self.routes[path](query)).encode("utf-8"))
+        with self._responses_lock:
+            if self._responses and next(iter(self._responses.values()))[0] != etag:
+                self._responses.clear()
+            self._responses[cache_key] = cached
+        return cached
+
+    def post_transaction(self, payload: dict) -> tuple:
+        """
+        Records an income, expense or transfer given as a JSON object with the fields
+        of the add command (type, amount, account, to_account, category, date, note,
+        allow_negative). Returns the new ETag and the confirmation message.
+        """
+        transaction_type = str(payload.get("type", "")).lower()
+        if transaction_type not in REPORT_TYPES:
+            raise ValueError("type must be income, expense or transfer")
+        args = argparse.Namespace(
+            transaction_type=transaction_type,
+            amount=parse_amount(str(payload.get("amount", ""))),
+            account=payload.get("account", "Main"),
+            to_account=payload.get("to_account"),
+            category=payload.get("category", "Uncategorized"),
+            date=parse_date(payload["date"]) if payload.get("date") else None,
+            note=payload.get("note", ""),
+            allow_negative=bool(payload.get("allow_negative", False)),
+        )
+        with self.lock.write():
+            message = record_transaction(
+                self.transaction_service, self.account_service, self.category_service, args
+            )
+            return self.get_etag(), message
+
+    def get_accounts(self, query: dict) -> list:
+        """
+        Returns all accounts with their balances.
+        """
+        accounts_df = convert_amounts_to_units(self.account_service.df, ["Balance", "Goal_Amount"])
+        return to_records(accounts_df)
+
+    def get_categories(self, query: dict) -> dict:
+        """
+        Returns the income and expense categories by ID.
+        """
+        return self.category_service.categories
+
+    def get_transactions(self, query: dict) -> list:
+        """
+        Returns the transactions of a period, optionally of one type and limited to the newest N.
+        """
+        start_date, end_date = get_period(query)
+        period_df = self.report_service.get_transactions_in_period(start_date, end_date)
+        transaction_type = get_parameter(query, "type")
+        if transaction_type:
+            if transaction_type not in REPORT_TYPES:
+                raise ValueError("type must be income, expense or transfer")
+            period_df = period_df[period_df["Type"].isin(REPORT_TYPES[transaction_type])]
+        limit = get_parameter(query, "limit")
+        if limit:
+            if not limit.isdigit():
+                raise ValueError("limit must be a whole number")
+            period_df = period_df.head(int(limit))
+        return to_records(convert_amounts_to_units(period_df[TRANSACTION_COLUMNS], ["Amount"]))
+
+    def get_goals(self, query: dict) -> list:
+        """
+        Returns the progress, contributions and ETA of every financial goal.
+        """
+        dashboard_df = self.goal_service.compute_goal_dashboard()
+        amount_columns = ["Balance", "Goal_Amount", "Remaining", "Last_30d", "Last_90d", "Last_365d"]
+        return to_records(convert_amounts_to_units(dashboard_df, [column for column in amount_columns if column in dashboard_df]))
+
+    def get_balance_sheet(self, query: dict) -> dict:
+        """
+        Returns the income, expense and net totals of a period and their monthly breakdown.
+        """
+        start_date, end_date = get_period(query)
+        balance_sheet = self.report_service.compute_balance_sheet(start_date, end_date)
+        monthly = balance_sheet["monthly"].reset_index()
+        monthly["Month"] = monthly["Month"].astype(str)
+        return {
+            "total_income": to_units(float(balance_sheet["total_income"])),
+            "total_expenses": to_units(float(balance_sheet["total_expenses"])),
+            "total_balance": to_units(float(balance_sheet["total_balance"])),
+            "monthly": to_records(convert_amounts_to_units(monthly, ["Income", "Expense", "Net"])),
+        }
+
+    def get_period_comparison(self, query: dict) -> dict:
+        """
+        Returns the per-category and total comparison of the last N weeks, months, quarters or years.
+        """
+        frequency = (get_parameter(query, "frequency") or "M").upper()
+        if frequency not in ["W", "M", "Q", "Y"]:
+            raise ValueError("frequency must be W, M, Q or Y")
+        periods = get_parameter(query, "periods") or "3"
+        if not periods.isdigit() or int(periods) < 1:
+            raise ValueError("periods must be a positive whole number")
+        by_category, totals = self.report_service.compute_period_comparison(
+            frequency, int(periods), datetime.today().date()
+        )
+        by_category = by_category.reset_index()
+        totals = totals.rename_axis("Period").reset_index()
+        for report_df in [by_category, totals]:
+            report_df["Period"] = report_df["Period"].astype(str)
+        return {
+            "by_category": to_records(convert_amounts_to_units(by_category, ["Income", "Expense", "Net"])),
+            "totals": to_records(convert_amounts_to_units(totals, ["Income", "Expense", "Net"])),
+        }
+
+    def get_category_pivot(self, query: dict) -> list:
+        """
+        Returns the category-by-month or category-by-account matrix of a period.
+        """
+        start_date, end_date = get_period(query)
+        columns = get_parameter(query, "columns") or "month"
+        if columns not in ["month", "account"]:
+            raise ValueError("columns must be month or account")
+        pivot_df = self.report_service.compute_category_pivot(start_date, end_date, columns)
+        pivot_df = pivot_df.rename(columns=str).reset_index()
+        value_columns = [column for column in pivot_df.columns if column not in ["Type", "Category"]]
+        return to_records(convert_amounts_to_units(pivot_df, value_columns))
+
+    def get_budget_report(self, query: dict) -> list:
+        """
+        Returns every budget with the spending of its period containing the given date.
+        """
+        reference_date = get_date(query, "date", datetime.today().date())
+        report_df = self.budget_service.compute_budget_report(reference_date)
+        return to_records(convert_amounts_to_units(report_df, ["Limit", "Spent", "Remaining"]))
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles one HTTP request of the API server. The handlers run in the server's
+    threads and share the server's ApiService.
+    """
+
+    def do_GET(self) -> None:
+        """
+        Answers a GET request, or 304 Not Modified if the client's ETag is still current.
+        """
+        url = urlsplit(self.path)
+        api_service = self.server.api_service
+        if self.headers.get("If-None-Match") == api_service.get_etag():
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", api_service.get_etag())
+            self.end_headers()
+            return
+        try:
+            etag, body = api_service.get(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except LookupError as error:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": str(error)})
+        except (ValueError, argparse.ArgumentTypeError) as error:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        else:
+            self.send_body(HTTPStatus.OK, body, etag)
+
+    def do_POST(self) -> None:
+        """
+        Records a transaction posted to /transactions.
+        """
+        if urlsplit(self.path).path.rstrip("/") != "/transactions":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"cannot post to '{self.path}'"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body is too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("the request body must be a JSON object")
+            etag, message = self.server.api_service.post_transaction(payload)
+        except (ValueError, argparse.ArgumentTypeError) as error:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        else:
+            self.send_json(HTTPStatus.CREATED, {"message": message}, etag)
+
+    def send_json(self, status: HTTPStatus, payload: any, etag: str = None) -> None:
+        """
+        Sends a JSON response.
+        """
+        self.send_body(status, json.dumps(payload).encode("utf-8"), etag)
+
+    def send_body(self, status: HTTPStatus, body: bytes, etag: str = None) -> None:
+        """
+        Sends an encoded JSON body with its headers.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    Serves the API requests, one thread per request.
+    """
+
+    def service_actions(self) -> None:
+        """
+        Writes out the buffered telemetry when it is due, also while no requests come in.
+        """
+        telemetry_log.flush_if_due()
+
+
+def run_server(data_dir: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """
+    Serves the API for a data directory until interrupted with ctrl + c.
+    """
+    server = ApiServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    server.api_service = ApiService(data_dir)
+    print(f"Serving the API for {data_dir} on http://{host}:{server.server_port} (press ctrl + c to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping the server...")
+    finally:
+        server.server_close()
+        telemetry_log.flush()
+
+
+def to_records(records_df: pd.DataFrame) -> list:
+    """
+    Converts a DataFrame to a list of JSON-ready records, with missing values as null.
+    """
+    return json.loads(records_df.to_json(orient="records", date_format="iso"))
+
+
+def get_parameter(query: dict, name: str) -> str:
+    """
+    Returns the last value of a query parameter, or None if it is missing.
+    """
+    values = query.get(name)
+    return values[-1].strip() if values else None
+
+
+def get_date(query: dict, name: str, default: any) -> any:
+    """
+    Returns a dd-mm-yyyy date query parameter, or the default if it is missing.
+    """
+    value = get_parameter(query, name)
+    return parse_date(value) if value else default
+
+
+def get_period(query: dict) -> tuple:
+    """
+    Returns the period given by the 'from' and 'to' query parameters, which default
+    to the start of this month and today, like the report command.
+    """
+    end_date = get_date(query, "to", datetime.today().date())
+    start_date = get_date(query, "from", end_date.replace(day=1))
+    if start_date > end_date:
+        raise ValueError("start date must be before end date")
+    return start_date, end_date
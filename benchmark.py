@@ -0,0 +1,285 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from ledger_generator import generate_ledger
+
+DEFAULT_SIZES = [10_000, 100_000]
+BULK_SIZE = 20
+
+
+def run_with_inputs(function: any, inputs: list, *args) -> any:
+    """
+    Calls a function while feeding scripted answers to input() and discarding its output.
+    """
+    answers = iter(inputs)
+    original_input = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(*args)
+    finally:
+        builtins.input = original_input
+
+
+def time_operation(function: any, repeat: int, setup: any = None) -> dict:
+    """
+    Times a function over several runs and returns summary statistics in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "runs": repeat,
+    }
+
+
+def benchmark_ledger_size(n_transactions: int, repeat: int) -> dict:
+    """
+    Generates a ledger of the given size in a temporary directory and times the hot paths.
+    """
+    from transactions import TransactionBuffer, TransactionService
+    from budgets import BUDGET_PERIODS
+    from accounts import AccountService
+    from categories import CategoryService
+    from overview_mode import OverviewMode
+    from financials_goals_mode import FinancialGoalsMode
+    import pandas as pd
+
+    results = {}
+    original_directory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            generate_ledger(n_transactions, "data")
+
+            def remove_snapshots() -> None:
+                for name in os.listdir("data"):
+                    if name.endswith(".snapshot"):
+                        os.remove(os.path.join("data", name))
+
+            results["load_csv"] = time_operation(
+                lambda: len(TransactionService().df), repeat, remove_snapshots
+            )
+            results["load_snapshot"] = time_operation(
+                lambda: len(TransactionService().df), repeat
+            )
+
+            transaction_service = TransactionService()
+            account_service = AccountService()
+            category_service = CategoryService()
+            overview_mode = OverviewMode(
+                transaction_service, category_service, account_service
+            )
+            goals_mode = FinancialGoalsMode(
+                transaction_service, category_service, account_service
+            )
+            today = datetime.today().strftime("%d-%m-%Y")
+
+            def add_expense() -> None:
+                transaction_service.add_transaction(
+                    transaction_type="Expense",
+                    date=today,
+                    amount=-1250,
+                    category_name="Groceries",
+                    from_account_id=1,
+                    from_account="Main",
+                    to_account_id="",
+                    to_account="",
+                    note="Benchmark",
+                )
+                account_service.update_account_balance("Main", -1250)
+
+            def add_expenses_in_bulk() -> None:
+                transaction_service.add_transactions(
+                    pd.DataFrame(
+                        {
+                            "Type": "Expense",
+                            "Date": [today] * BULK_SIZE,
+                            "Amount": -1250,
+                            "Category": "Groceries",
+                            "From_Account_ID": 1,
+                            "From_Account": "Main",
+                            "Note": "Benchmark",
+                        }
+                    )
+                )
+                account_service.update_account_balances({"Main": -1250 * BULK_SIZE})
+
+            def add_expenses_buffered() -> None:
+                with TransactionBuffer(transaction_service) as buffer:
+                    for _ in range(BULK_SIZE):
+                        buffer.append(
+                            transaction_type="Expense",
+                            date=today,
+                            amount=-1250,
+                            category_name="Groceries",
+                            from_account_id=1,
+                            from_account="Main",
+                            to_account_id="",
+                            to_account="",
+                            note="Benchmark",
+                        )
+                account_service.update_account_balances({"Main": -1250 * BULK_SIZE})
+
+            results["add_transaction"] = time_operation(add_expense, repeat)
+            results[f"add_transaction_bulk_{BULK_SIZE}"] = time_operation(
+                add_expenses_in_bulk, repeat
+            )
+            results[f"add_transaction_buffered_{BULK_SIZE}"] = time_operation(
+                add_expenses_buffered, repeat
+            )
+
+            category_names = iter([("Groceries", "Food"), ("Food", "Groceries")] * repeat)
+            results["rename_category"] = time_operation(
+                lambda: transaction_service.update_transactions_category(
+                    *next(category_names)
+                ),
+                repeat,
+            )
+            account_names = iter(["Current", "Account 2"] * repeat)
+
+            def rename_account() -> None:
+                new_name = next(account_names)
+                account_service.edit_account_name(2, new_name)
+                transaction_service.update_account_name_in_transactions(2, new_name)
+
+            results["rename_account"] = time_operation(rename_account, repeat)
+
+            period = ["5", "01-01-2021", "31-12-2025"]
+            reports = {
+                "overview_accounts": (
+                    overview_mode.display_accounts_overview,
+                    ["1", "1", *period, "2"],
+                ),
+                "overview_income": (overview_mode.display_income_overview, period),
+                "overview_expenses": (overview_mode.display_expense_overview, period),
+                "overview_transfers": (overview_mode.display_transfer_overview, period),
+                "overview_category": (
+                    overview_mode.display_category_overview,
+                    ["2", "1", *period, "3"],
+                ),
+                "overview_balance_sheet": (
+                    overview_mode.display_balance_sheet_overview,
+                    period,
+                ),
+                "overview_period_comparison": (
+                    overview_mode.display_period_comparison,
+                    ["2", "12"],
+                ),
+                "overview_category_matrix": (
+                    overview_mode.display_category_matrix,
+                    [*period, "1"],
+                ),
+            }
+            for name, (function, inputs) in reports.items():
+                results[name] = time_operation(
+                    lambda: run_with_inputs(function, inputs), repeat
+                )
+
+            # A budget of every period for each expense category. The spending counters
+            # are dropped before each run, so the report includes building them.
+            budget_service = overview_mode.budget_service
+            for category_name in category_service.categories["Expense"].values():
+                for budget_period in BUDGET_PERIODS:
+                    budget_service.set_budget(category_name, budget_period, 50_000)
+
+            def drop_spending_counters() -> None:
+                budget_service._counters = None
+
+            results["overview_budgets"] = time_operation(
+                lambda: run_with_inputs(overview_mode.display_budget_report, ["31-12-2025"]),
+                repeat,
+                drop_spending_counters,
+            )
+
+            goal_id = int(
+                account_service.df.loc[
+                    account_service.df["Is_Goal"] == "Yes", "Account_ID"
+                ].iloc[0]
+            )
+            results["goal_progress"] = time_operation(
+                lambda: run_with_inputs(goals_mode.describe_goal_progress, [], goal_id),
+                repeat,
+            )
+        finally:
+            os.chdir(original_directory)
+
+    return results
+
+
+def compare_results(results: dict, baseline: dict) -> None:
+    """
+    Prints the median timing of each operation against a baseline results file.
+    """
+    print(f"\n{'Operation':<45}{'Baseline':>12}{'Current':>12}{'Ratio':>8}")
+    for size, operations in results["results"].items():
+        for name, timing in operations.items():
+            baseline_timing = baseline["results"].get(size, {}).get(name)
+            if baseline_timing is None:
+                continue
+            ratio = timing["median"] / baseline_timing["median"]
+            print(
+                f"{size + ' ' + name:<45}{baseline_timing['median']:>12.4f}{timing['median']:>12.4f}{ratio:>8.2f}"
+            )
+
+
+def main() -> None:
+    """
+    Runs the benchmark suite from the command line and writes a JSON results file.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark services and reports.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="ledger sizes to benchmark, e.g. 10000 100000 1000000 5000000",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="results file of a previous run to compare against")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    results = {
+        "metadata": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking a ledger of {size} transactions...")
+        results["results"][str(size)] = benchmark_ledger_size(size, args.repeat)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results were written to {args.output}.")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare_results(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
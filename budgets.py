@@ -0,0 +1,271 @@
+import os
+
+import pandas as pd
+from datetime import date
+from locking import get_data_lock, write_locked
+from money import read_csv_with_amounts
+from snapshots import save_csv
+from telemetry import track_operation
+
+BUDGETS_FILENAME = "budgets.csv"
+
+# Budget period name: pandas period frequency.
+BUDGET_PERIODS = {
+    "weekly": "W",
+    "monthly": "M",
+    "quarterly": "Q",
+    "yearly": "Y",
+}
+
+# Share of the limit from which the user is warned.
+WARNING_THRESHOLD = 0.9
+
+AMOUNT_COLUMNS = ["Limit"]
+
+
+class Budget:
+    """
+    Represents a spending limit (in cents) for an expense category and period.
+    """
+
+    def __init__(
+        self, budget_id: int, category_name: str, period: str, limit: int
+    ) -> None:
+        """
+        Initializes a new budget.
+        """
+        self.budget_id = budget_id
+        self.category_name = category_name
+        self.period = period
+        self.limit = limit
+
+    def convert_to_dict(self) -> dict:
+        """
+        Converts the budget instance to a dictionary suitable for DataFrame.
+        """
+        return {
+            "Budget_ID": self.budget_id,
+            "Category": self.category_name,
+            "Period": self.period,
+            "Limit": self.limit,
+        }
+
+
+class BudgetService:
+    """
+    Manages spending limits in a CSV file and checks expenses against them.
+    Spending per category and period is kept in running counters, so checks and
+    budget-vs-actual reports do not scan the ledger.
+    """
+
+    def __init__(self, transaction_service: any) -> None:
+        """
+        Initializes the class with the path to the CSV file next to the ledger and the transaction service.
+        The file is loaded on first access to the budgets.
+        """
+        self.filepath = os.path.join(os.path.dirname(transaction_service.filepath), BUDGETS_FILENAME)
+        self.transaction_service = transaction_service
+        self.lock = get_data_lock(os.path.dirname(self.filepath))
+        self.columns = ["Budget_ID", "Category", "Period", "Limit"]
+        self.version = 0
+        self._df = None
+        self._counters = None
+        self._counters_version = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Returns the budgets DataFrame, loading the CSV file on first access.
+        The file is loaded under the write lock, so two threads never both load it.
+        """
+        if self._df is None:
+            with self.lock.write():
+                if self._df is None:
+                    self.load_or_initialize_budgets_file()
+        return self._df
+
+    @df.setter
+    def df(self, budgets_df: pd.DataFrame) -> None:
+        """
+        Replaces the budgets DataFrame.
+        """
+        self._df = budgets_df
+
+    def copy_on_write(self) -> None:
+        """
+        Replaces the DataFrame with a shallow copy before a change, so a DataFrame
+        handed out to a reader earlier keeps its data.
+        """
+        if self._df is not None:
+            self._df = self._df.copy(deep=False)
+
+    def load_or_initialize_budgets_file(self) -> None:
+        """
+        Loads the budgets CSV file or creates a new one if it doesn't exist.
+        """
+        try:
+            self.df = read_csv_with_amounts(self.filepath, AMOUNT_COLUMNS)
+        except FileNotFoundError:
+            self.df = pd.DataFrame(columns=self.columns)
+            self.save_budgets_to_file()
+
+    @write_locked
+    def save_budgets_to_file(self) -> None:
+        """
+        Saves the DataFrame of budgets to the CSV file, with the limits in decimal units.
+        """
+        save_csv(self.filepath, self.df, AMOUNT_COLUMNS)
+        self.version += 1
+
+    def get_new_budget_id(self) -> int:
+        """
+        Generates a new budget ID.
+        """
+        if self.df.empty:
+            return 1
+        else:
+            return int(self.df["Budget_ID"].max()) + 1
+
+    @write_locked
+    def set_budget(self, category_name: str, period: str, limit: int) -> Budget:
+        """
+        Sets the limit (in cents) of a category for a period, replacing an existing limit for the same period.
+        """
+        existing = (self.df["Category"] == category_name) & (self.df["Period"] == period)
+        if existing.any():
+            self.df.loc[existing, "Limit"] = limit
+            budget = Budget(int(self.df.loc[existing, "Budget_ID"].iloc[0]), category_name, period, limit)
+        else:
+            budget = Budget(self.get_new_budget_id(), category_name, period, limit)
+            self.df = pd.concat(
+                [self.df, pd.DataFrame([budget.convert_to_dict()])], ignore_index=True
+            )
+        self.save_budgets_to_file()
+        return budget
+
+    @write_locked
+    def delete_budget(self, budget_id: int) -> None:
+        """
+        Deletes a budget.
+        """
+        self.df = self.df[self.df["Budget_ID"] != budget_id].reset_index(drop=True)
+        self.save_budgets_to_file()
+
+    @write_locked
+    def rename_category(self, old_category_name: str, new_category_name: str) -> None:
+        """
+        Moves the budgets of a renamed category to its new name.
+        """
+        if self.df["Category"].eq(old_category_name).any():
+            self.df.loc[self.df["Category"] == old_category_name, "Category"] = new_category_name
+            self.save_budgets_to_file()
+
+    @write_locked
+    def delete_category_budgets(self, category_name: str) -> None:
+        """
+        Deletes the budgets of a deleted category.
+        """
+        if self.df["Category"].eq(category_name).any():
+            self.df = self.df[self.df["Category"] != category_name].reset_index(drop=True)
+            self.save_budgets_to_file()
+
+    @write_locked
+    def restore_budgets(self, budget_records: list) -> None:
+        """
+        Puts back deleted budgets (rows as returned by DataFrame.to_dict("records")).
+        """
+        if not budget_records:
+            return
+        self.df = (
+            pd.concat([self.df, pd.DataFrame(budget_records)], ignore_index=True)
+            .sort_values("Budget_ID", kind="stable")
+            .reset_index(drop=True)
+        )
+        self.save_budgets_to_file()
+
+    def get_spending_counters(self) -> dict:
+        """
+        Returns the spent amount in cents per (period frequency, category, period).
+        The counters are built with one grouped sum per frequency and rebuilt only
+        when the ledger changed without going through record_expense.
+        """
+        if self._counters is None or self._counters_version != self.transaction_service.version:
+            version, transactions_df, dates = self.transaction_service.snapshot()
+            is_expense = (transactions_df["Type"] == "Expense").to_numpy()
+            expenses = -transactions_df.loc[is_expense, "Amount"].reset_index(drop=True)
+            categories = transactions_df.loc[is_expense, "Category"].reset_index(drop=True)
+            dates = dates[is_expense].reset_index(drop=True)
+
+            counters = {}
+            for frequency in BUDGET_PERIODS.values():
+                spent = expenses.groupby([categories, dates.dt.to_period(frequency)]).sum()
+                counters.update(
+                    {
+                        (frequency, category, period): amount
+                        for (category, period), amount in spent.items()
+                    }
+                )
+            self._counters = counters
+            self._counters_version = version
+        return self._counters
+
+    @write_locked
+    def record_expense(self, category_name: str, expense_date: str, amount: int) -> None:
+        """
+        Adds an expense that was just saved to the counters of every period it falls into.
+        If the ledger changed in other ways since the counters were built, they are
+        rebuilt on the next check instead. The counters are replaced by an updated
+        copy, so a reader holding the previous ones never sees a half-made update.
+        """
+        if self._counters is None or self._counters_version != self.transaction_service.version - 1:
+            return
+        expense_date = pd.to_datetime(expense_date, format="%d-%m-%Y")
+        counters = dict(self._counters)
+        for frequency in BUDGET_PERIODS.values():
+            key = (frequency, category_name, expense_date.to_period(frequency))
+            counters[key] = counters.get(key, 0) + abs(amount)
+        self._counters = counters
+        self._counters_version = self.transaction_service.version
+
+    def get_spent(self, category_name: str, period: str, reference_date: date) -> int:
+        """
+        Returns the amount in cents spent in a category during the period (e.g. "monthly")
+        containing the reference date.
+        """
+        frequency = BUDGET_PERIODS[period]
+        return self.get_spending_counters().get(
+            (frequency, category_name, pd.Period(reference_date, frequency)), 0
+        )
+
+    def check_budgets(self, category_name: str, reference_date: date) -> list:
+        """
+        Returns the budgets of a category that reached the warning threshold
+        in the periods containing the reference date.
+        """
+        warnings = []
+        for budget in self.df[self.df["Category"] == category_name].to_dict("records"):
+            spent = self.get_spent(category_name, budget["Period"], reference_date)
+            if budget["Limit"] > 0 and spent >= budget["Limit"] * WARNING_THRESHOLD:
+                warnings.append({**budget, "Spent": spent, "Used_%": spent / budget["Limit"] * 100})
+        return warnings
+
+    @track_operation
+    def compute_budget_report(self, reference_date: date) -> pd.DataFrame:
+        """
+        Compares every budget with the spending in its period containing the reference date.
+        """
+        report_df = self.df.copy()
+        report_df["Limit"] = report_df["Limit"].astype("int64")
+        report_df["Period_Label"] = [
+            str(pd.Period(reference_date, BUDGET_PERIODS[period]))
+            for period in report_df["Period"]
+        ]
+        report_df["Spent"] = [
+            self.get_spent(category, period, reference_date)
+            for category, period in zip(report_df["Category"], report_df["Period"])
+        ]
+        report_df["Remaining"] = report_df["Limit"] - report_df["Spent"]
+        report_df["Used_%"] = (
+            report_df["Spent"] / report_df["Limit"].where(report_df["Limit"] > 0) * 100
+        )
+        return report_df
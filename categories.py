@@ -1,6 +1,9 @@
 import json
+import os
+from locking import get_data_lock, write_locked
+from profiles import DATA_DIR
 
-CATEGORIES_FILE = "data/categories.json"
+CATEGORIES_FILENAME = "categories.json"
 
 
 class Category:
@@ -8,6 +11,8 @@ class Category:
     Represents one income or expense category.
     """
 
+    __slots__ = ("category_id", "category_name", "category_type")
+
     def __init__(
         self, category_id: int, category_name: str, category_type: str
     ) -> None:
@@ -34,20 +39,52 @@ class CategoryService:
     Manages categories and their manipulation in a JSON file.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, data_dir: str = DATA_DIR) -> None:
+        """
+        Initializes the class with the path to the JSON file in the profile's data directory.
+        The file is loaded on first access to the categories.
+        """
+        self.filepath = os.path.join(data_dir, CATEGORIES_FILENAME)
+        self.lock = get_data_lock(data_dir)
+        self.version = 0
+        self._categories = None
+
+    @property
+    def categories(self) -> dict:
+        """
+        Returns the categories, loading the JSON file on first access.
+        The file is loaded under the write lock, so two threads never both load it.
+        """
+        if self._categories is None:
+            with self.lock.write():
+                if self._categories is None:
+                    self.load_or_initialize_categories_file()
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories: dict) -> None:
+        """
+        Replaces the categories.
+        """
+        self._categories = categories
+
+    def copy_on_write(self) -> None:
         """
-        Initializes the class with a path to the JSON file.
+        Replaces the categories with a copy before a change, so a dictionary handed
+        out to a reader earlier keeps its content.
         """
-        self.filepath = CATEGORIES_FILE
-        self.categories = {"Expense": {}, "Income": {}}
-        self.load_or_initialize_categories_file()
+        if self._categories is not None:
+            self._categories = {
+                category_type: dict(categories)
+                for category_type, categories in self._categories.items()
+            }
 
     def load_or_initialize_categories_file(self) -> None:
         """
         Loads or initializes categories JSON file.
         """
         try:
-            with open(CATEGORIES_FILE, "r") as file:
+            with open(self.filepath, "r") as file:
                 self.categories = json.load(file)
         except FileNotFoundError:
             self.categories = {
@@ -56,12 +93,17 @@ class CategoryService:
             }
             self.save_categories_to_file()
 
+    @write_locked
     def save_categories_to_file(self) -> None:
         """
-        Saves the categories to the JSON file.
+        Saves the categories to the JSON file, writing a temporary file first and
+        moving it into place.
         """
-        with open(CATEGORIES_FILE, "w") as file:
+        temporary_path = self.filepath + ".tmp"
+        with open(temporary_path, "w") as file:
             json.dump(self.categories, file, indent=4)
+        os.replace(temporary_path, self.filepath)
+        self.version += 1
 
     def get_new_category_id(self, category_type: str) -> int:
         """
@@ -71,6 +113,7 @@ class CategoryService:
             return max(map(int, self.categories[category_type].keys())) + 1
         return 1
 
+    @write_locked
     def add_category(self, category_type: str, category_name: str) -> None:
         """
         Adds a new category with a unique ID.
@@ -81,6 +124,7 @@ class CategoryService:
         self.save_categories_to_file()
         return category
 
+    @write_locked
     def edit_category(
         self, category_type: str, category_id: int, new_category_name: str
     ) -> None:
@@ -91,6 +135,20 @@ class CategoryService:
             self.categories[category_type][str(category_id)] = new_category_name
             self.save_categories_to_file()
 
+    @write_locked
+    def restore_category(
+        self, category_type: str, category_id: int, category_name: str
+    ) -> None:
+        """
+        Puts back a deleted category under its previous ID.
+        """
+        categories = {**self.categories[category_type], str(category_id): category_name}
+        self.categories[category_type] = dict(
+            sorted(categories.items(), key=lambda item: int(item[0]))
+        )
+        self.save_categories_to_file()
+
+    @write_locked
     def delete_category(self, category_type: str, category_id: int) -> None:
         """
         Deletes a category.
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from profiles import DATA_DIR
+from snapshots import SNAPSHOT_SUFFIX
+
+MANIFEST_FILE = "checkpoint.json"
+
+# The stores captured by a checkpoint. Each CSV store is taken together with its
+# binary snapshot, so a rollback does not have to parse the CSV files again.
+STORE_FILES = [
+    "transactions.csv",
+    "accounts.csv",
+    "categories.json",
+    "budgets.csv",
+    "allocations.csv",
+    "presets.csv",
+]
+
+
+class CheckpointService:
+    """
+    Takes named checkpoints of the data stores and rolls the data back to them.
+    The stores are always saved by writing a new file and moving it into place,
+    so a checkpoint is a set of hard links to the current files and costs no copy;
+    the files are only copied on file systems without hard links.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR) -> None:
+        """
+        Initializes the class with the data directory.
+        """
+        self.data_dir = data_dir
+        self.checkpoints_dir = os.path.join(data_dir, "checkpoints")
+
+    def get_store_files(self) -> list:
+        """
+        Returns the names of the store files and snapshots that can be part of a checkpoint.
+        """
+        return [
+            file_name
+            for store_file in STORE_FILES
+            for file_name in [store_file, store_file + SNAPSHOT_SUFFIX]
+        ]
+
+    def list_checkpoints(self) -> list:
+        """
+        Returns the manifests of the checkpoints, newest first.
+        """
+        if not os.path.isdir(self.checkpoints_dir):
+            return []
+        checkpoints = []
+        for name in os.listdir(self.checkpoints_dir):
+            try:
+                with open(os.path.join(self.checkpoints_dir, name, MANIFEST_FILE)) as file:
+                    checkpoints.append(json.load(file))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return sorted(checkpoints, key=lambda checkpoint: checkpoint["Created"], reverse=True)
+
+    def create_checkpoint(self, name: str = "") -> dict:
+        """
+        Takes a checkpoint of the stores under the given name, or a name made from the
+        current time. Raises ValueError for an invalid or already used name.
+        """
+        created = datetime.now()
+        name = name or created.strftime("checkpoint-%Y%m%d-%H%M%S")
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", name) or name.startswith("."):
+            raise ValueError("a checkpoint name may only contain letters, digits, '.', '-' and '_'")
+        checkpoint_dir = os.path.join(self.checkpoints_dir, name)
+        if os.path.exists(checkpoint_dir):
+            raise ValueError(f"a checkpoint named '{name}' already exists")
+
+        os.makedirs(checkpoint_dir)
+        files = []
+        size = 0
+        for file_name in self.get_store_files():
+            source = os.path.join(self.data_dir, file_name)
+            if os.path.exists(source):
+                self.link_or_copy(source, os.path.join(checkpoint_dir, file_name))
+                files.append(file_name)
+                size += os.path.getsize(source)
+
+        manifest = {
+            "Name": name,
+            "Created": created.isoformat(timespec="seconds"),
+            "Files": files,
+            "Size": size,
+        }
+        with open(os.path.join(checkpoint_dir, MANIFEST_FILE), "w") as file:
+            json.dump(manifest, file, indent=4)
+        return manifest
+
+    def rollback(self, name: str) -> None:
+        """
+        Puts the stores back as they were when the checkpoint was taken. Stores that
+        did not exist then are removed. Raises ValueError for an unknown checkpoint.
+        """
+        manifest = self.get_manifest(name)
+        checkpoint_dir = os.path.join(self.checkpoints_dir, name)
+        for file_name in self.get_store_files():
+            target = os.path.join(self.data_dir, file_name)
+            if file_name in manifest["Files"]:
+                temporary_path = target + ".tmp"
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                self.link_or_copy(os.path.join(checkpoint_dir, file_name), temporary_path)
+                os.replace(temporary_path, target)
+            elif os.path.exists(target):
+                os.remove(target)
+
+    def delete_checkpoint(self, name: str) -> None:
+        """
+        Deletes a checkpoint. Raises ValueError for an unknown checkpoint.
+        """
+        self.get_manifest(name)
+        shutil.rmtree(os.path.join(self.checkpoints_dir, name))
+
+    def prune_checkpoints(self, keep: int) -> list:
+        """
+        Deletes all but the newest checkpoints and returns the names of the deleted ones.
+        """
+        pruned = [checkpoint["Name"] for checkpoint in self.list_checkpoints()[keep:]]
+        for name in pruned:
+            self.delete_checkpoint(name)
+        return pruned
+
+    def get_manifest(self, name: str) -> dict:
+        """
+        Returns the manifest of a checkpoint. Raises ValueError for an unknown checkpoint.
+        """
+        try:
+            with open(os.path.join(self.checkpoints_dir, name, MANIFEST_FILE)) as file:
+                return json.load(file)
+        except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+            raise ValueError(f"there is no checkpoint named '{name}'")
+
+    def link_or_copy(self, source: str, target: str) -> None:
+        """
+        Hard-links the file, or copies it where the file system does not support hard links.
+        """
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
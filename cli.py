@@ -0,0 +1,446 @@
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+
+REPORT_TYPES = {
+    "income": ["Income"],
+    "expense": ["Expense"],
+    "transfer": ["Transfer Out", "Transfer In", "Transfer"],
+}
+
+
+def run_command(argv: list) -> int:
+    """
+    Runs one non-interactive command and returns the exit code.
+    Only the data stores needed by the command are loaded.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        sys.stdout = open(os.devnull, "w")
+        return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser with all supported subcommands.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Personal finance planning and tracking app. Run without arguments for the interactive menus.",
+    )
+    parser.add_argument(
+        "--ledger",
+        dest="data_dir",
+        metavar="PROFILE",
+        type=parse_profile,
+        default="default",
+        help="ledger profile to use, defaults to the one in data/",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser(
+        "report", help="print income, expense, transfer or balance sheet reports"
+    )
+    report_parser.add_argument(
+        "report_type", choices=[*REPORT_TYPES.keys(), "balance"]
+    )
+    report_parser.add_argument(
+        "--from", dest="start_date", type=parse_date, help="start date (dd-mm-yyyy), defaults to the start of this month"
+    )
+    report_parser.add_argument(
+        "--to", dest="end_date", type=parse_date, help="end date (dd-mm-yyyy), defaults to today"
+    )
+    add_format_argument(report_parser)
+    report_parser.set_defaults(handler=handle_report)
+
+    balance_parser = subparsers.add_parser("balance", help="print account balances")
+    add_format_argument(balance_parser)
+    balance_parser.set_defaults(handler=handle_balance)
+
+    goals_parser = subparsers.add_parser("goals", help="print financial goal progress")
+    add_format_argument(goals_parser)
+    goals_parser.set_defaults(handler=handle_goals)
+
+    add_parser = subparsers.add_parser("add", help="record an income, expense or transfer")
+    add_parser.add_argument("transaction_type", choices=["income", "expense", "transfer"])
+    add_parser.add_argument("amount", type=parse_amount)
+    add_parser.add_argument("--account", default="Main", help="account name, defaults to Main")
+    add_parser.add_argument("--to-account", help="destination account name for transfers")
+    add_parser.add_argument("--category", default="Uncategorized", help="category name")
+    add_parser.add_argument("--date", type=parse_date, help="transaction date (dd-mm-yyyy), defaults to today")
+    add_parser.add_argument("--note", default="", help="optional note")
+    add_parser.add_argument(
+        "--allow-negative", action="store_true", help="allow the account balance to become negative"
+    )
+    add_parser.set_defaults(handler=handle_add)
+
+    presets_parser = subparsers.add_parser(
+        "presets", help="add the recurring transactions that are due"
+    )
+    presets_parser.add_argument(
+        "--date", type=parse_date, help="add occurrences up to this date (dd-mm-yyyy), defaults to today"
+    )
+    presets_parser.set_defaults(handler=handle_presets)
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="check that transactions, accounts and categories are consistent"
+    )
+    verify_parser.add_argument(
+        "--repair", action="store_true", help="fix the repairable issues in one write of the ledger"
+    )
+    add_format_argument(verify_parser)
+    verify_parser.set_defaults(handler=handle_verify)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="serve balances, transactions and reports as a local HTTP/JSON API"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on, defaults to 127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765, help="port to listen on, defaults to 8765")
+    serve_parser.set_defaults(handler=handle_serve)
+
+    return parser
+
+
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the shared --format option to a subcommand parser.
+    """
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table")
+
+
+def parse_profile(profile_name: str) -> str:
+    """
+    Returns the data directory of an existing ledger profile.
+    """
+    from profiles import DEFAULT_PROFILE, get_profile_dir
+
+    try:
+        data_dir = get_profile_dir(profile_name.strip())
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+    if profile_name.strip() != DEFAULT_PROFILE and not os.path.isdir(data_dir):
+        raise argparse.ArgumentTypeError(
+            f"profile '{profile_name.strip()}' does not exist, create it from the main menu first"
+        )
+    return data_dir
+
+
+def parse_date(date_str: str) -> datetime.date:
+    """
+    Parses a dd-mm-yyyy date, accepting '/', '.' and ' ' as separators.
+    """
+    try:
+        return datetime.strptime(re.sub(r"[\./\s]", "-", date_str.strip()), "%d-%m-%Y").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{date_str}', use dd-mm-yyyy")
+
+
+def parse_amount(amount_str: str) -> int:
+    """
+    Parses a positive amount with up to two decimal places into cents.
+    """
+    from money import parse_cents
+
+    try:
+        amount = parse_cents(amount_str)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid amount '{amount_str.strip()}'")
+    if amount <= 0:
+        raise argparse.ArgumentTypeError(
+            "amount must be positive with up to two decimal places"
+        )
+    return amount
+
+
+def write_output(records_df: any, output_format: str, summary: dict = None) -> None:
+    """
+    Writes a DataFrame (and optional summary values) to stdout as a table, CSV or JSON.
+    """
+    from tabulate import tabulate
+
+    if output_format == "json":
+        payload = json.loads(records_df.to_json(orient="records"))
+        if summary is not None:
+            payload = {**summary, "transactions": payload}
+        print(json.dumps(payload, indent=2))
+    elif output_format == "csv":
+        records_df.to_csv(sys.stdout, index=False)
+    else:
+        if summary is not None:
+            for key, value in summary.items():
+                if not isinstance(value, list):
+                    print(f"{key.replace('_', ' ').capitalize()}: {value:.2f}")
+        print(tabulate(records_df, headers="keys", tablefmt="psql", showindex=False))
+
+
+# Command handlers:
+
+def handle_report(args: argparse.Namespace) -> int:
+    """
+    Prints a transactions report for the given period.
+    """
+    from transactions import TransactionService
+    from reports import ReportService
+    from money import convert_amounts_to_units, to_units
+
+    end_date = args.end_date or datetime.today().date()
+    start_date = args.start_date or end_date.replace(day=1)
+    if start_date > end_date:
+        raise ValueError("start date must be before end date")
+
+    report_service = ReportService(TransactionService(args.data_dir), None, None)
+    columns = ["Date", "Type", "Amount", "Category", "From_Account", "To_Account", "Note"]
+
+    if args.report_type == "balance":
+        balance_sheet = report_service.compute_balance_sheet(start_date, end_date)
+        monthly = balance_sheet["monthly"].reset_index()
+        monthly["Month"] = monthly["Month"].astype(str)
+        monthly = convert_amounts_to_units(monthly, ["Income", "Expense", "Net"])
+        summary = {
+            "total_income": to_units(float(balance_sheet["total_income"])),
+            "total_expenses": to_units(float(balance_sheet["total_expenses"])),
+            "total_balance": to_units(float(balance_sheet["total_balance"])),
+        }
+        if args.format == "json":
+            summary["monthly"] = json.loads(monthly.to_json(orient="records"))
+        transactions_df = convert_amounts_to_units(balance_sheet["transactions"], ["Amount"])
+        write_output(transactions_df[columns].astype(object).fillna(""), args.format, summary)
+        return 0
+
+    period_df = report_service.get_transactions_in_period(start_date, end_date)
+    period_df = period_df[period_df["Type"].isin(REPORT_TYPES[args.report_type])]
+    period_df = period_df.sort_values(by="Date_Parsed", kind="mergesort")
+    period_df = convert_amounts_to_units(period_df, ["Amount"])
+    write_output(period_df[columns].astype(object).fillna(""), args.format)
+    return 0
+
+
+def handle_balance(args: argparse.Namespace) -> int:
+    """
+    Prints the balances of all accounts.
+    """
+    from accounts import AccountService
+    from money import convert_amounts_to_units
+
+    accounts_df = convert_amounts_to_units(AccountService(args.data_dir).df, ["Balance"])
+    write_output(
+        accounts_df[["Account_ID", "Name", "Balance", "Is_Goal"]], args.format
+    )
+    return 0
+
+
+def handle_goals(args: argparse.Namespace) -> int:
+    """
+    Prints the progress of all financial goals.
+    """
+    from accounts import AccountService
+    from money import convert_amounts_to_units
+
+    accounts_df = AccountService(args.data_dir).df
+    goals_df = accounts_df[accounts_df["Is_Goal"].str.lower() == "yes"][
+        ["Account_ID", "Name", "Balance", "Goal_Amount"]
+    ]
+    goals_df = convert_amounts_to_units(goals_df, ["Balance", "Goal_Amount"])
+    goal_amounts = goals_df["Goal_Amount"].astype(float)
+    goals_df["Progress_%"] = (
+        (goals_df["Balance"] / goal_amounts * 100).where(goal_amounts > 0, 0).round(1)
+    )
+    write_output(goals_df, args.format)
+    return 0
+
+
+def handle_add(args: argparse.Namespace) -> int:
+    """
+    Records an income, expense or transfer and updates the account balances.
+    """
+    from transactions import TransactionService
+    from accounts import AccountService
+    from categories import CategoryService
+
+    print(
+        record_transaction(
+            TransactionService(args.data_dir), AccountService(args.data_dir), CategoryService(args.data_dir), args
+        )
+    )
+    return 0
+
+
+def record_transaction(
+    transaction_service: any, account_service: any, category_service: any, args: argparse.Namespace
+) -> str:
+    """
+    Records the income, expense or transfer described by the arguments of the add
+    command, updates the account balances and returns the confirmation message.
+    Raises ValueError when the accounts or the category do not exist.
+    """
+    from money import format_cents
+
+    date = (args.date or datetime.today().date()).strftime("%d-%m-%Y")
+    amount = args.amount
+
+    account_id = account_service.get_account_id_by_name(args.account)
+    if account_id is None:
+        raise ValueError(f"account '{args.account}' does not exist")
+    account_name = account_service.df.loc[
+        account_service.df["Account_ID"] == account_id, "Name"
+    ].values[0]
+
+    if args.transaction_type != "income" and not args.allow_negative:
+        if account_service.check_if_balance_negative(account_name, -amount):
+            raise ValueError(
+                f"this would make the {account_name} account balance negative, use --allow-negative to proceed"
+            )
+
+    if args.transaction_type == "transfer":
+        if not args.to_account:
+            raise ValueError("transfers require --to-account")
+        to_account_id = account_service.get_account_id_by_name(args.to_account)
+        if to_account_id is None:
+            raise ValueError(f"account '{args.to_account}' does not exist")
+        if to_account_id == account_id:
+            raise ValueError("cannot transfer to the same account")
+        to_account_name = account_service.df.loc[
+            account_service.df["Account_ID"] == to_account_id, "Name"
+        ].values[0]
+
+        transaction_service.add_transaction(
+            transaction_type="Transfer Out",
+            date=date,
+            amount=-amount,
+            category_name="Transfer",
+            from_account_id=account_id,
+            from_account=account_name,
+            to_account_id="",
+            to_account="",
+            note=args.note,
+        )
+        transaction_service.add_transaction(
+            transaction_type="Transfer In",
+            date=date,
+            amount=amount,
+            category_name="Transfer",
+            from_account_id="",
+            from_account="",
+            to_account_id=to_account_id,
+            to_account=to_account_name,
+            note=args.note,
+        )
+        account_service.update_account_balance(account_name, -amount)
+        account_service.update_account_balance(to_account_name, amount)
+        return f"Transferred {format_cents(amount)} from {account_name} to {to_account_name} on {date}."
+
+    category_type = args.transaction_type.capitalize()
+    categories = category_service.categories[category_type]
+    category = next(
+        (name for name in categories.values() if name.lower() == args.category.lower()),
+        None,
+    )
+    if category is None:
+        raise ValueError(f"{category_type} category '{args.category}' does not exist")
+
+    if category_type == "Income":
+        transaction_service.add_transaction(
+            transaction_type="Income",
+            date=date,
+            amount=amount,
+            category_name=category,
+            from_account_id="",
+            from_account="",
+            to_account_id=account_id,
+            to_account=account_name,
+            note=args.note,
+        )
+        account_service.update_account_balance(account_name, amount)
+    else:
+        transaction_service.add_transaction(
+            transaction_type="Expense",
+            date=date,
+            amount=-amount,
+            category_name=category,
+            from_account_id=account_id,
+            from_account=account_name,
+            to_account_id="",
+            to_account="",
+            note=args.note,
+        )
+        account_service.update_account_balance(account_name, -amount)
+
+    return f"Added {category_type.lower()} of {format_cents(amount)} on {date} to {account_name} under '{category}'."
+
+
+def handle_presets(args: argparse.Namespace) -> int:
+    """
+    Adds the due occurrences of all recurring transaction presets.
+    """
+    from transactions import TransactionService
+    from accounts import AccountService
+    from presets import PresetService
+
+    preset_service = PresetService(TransactionService(args.data_dir), AccountService(args.data_dir))
+    added = preset_service.materialize_due_presets(args.date)
+    print(f"Added {added} recurring transaction(s).")
+    return 0
+
+
+def handle_verify(args: argparse.Namespace) -> int:
+    """
+    Prints the integrity issues of the data files and optionally repairs them.
+    Returns 1 when issues remain.
+    """
+    from transactions import TransactionService
+    from accounts import AccountService
+    from categories import CategoryService
+    from integrity import CHECKS, REPAIRABLE_CHECKS, IntegrityService
+    from money import convert_amounts_to_units
+
+    integrity_service = IntegrityService(
+        TransactionService(args.data_dir), AccountService(args.data_dir), CategoryService(args.data_dir)
+    )
+    issues = integrity_service.verify()
+    amount_columns = ["Amount", "Balance", "Ledger_Balance", "Difference"]
+    issues_in_units = {
+        check: convert_amounts_to_units(
+            issues_df, [column for column in amount_columns if column in issues_df]
+        )
+        for check, issues_df in issues.items()
+    }
+
+    if args.format == "json":
+        print(json.dumps(
+            {check: json.loads(issues_df.to_json(orient="records")) for check, issues_df in issues_in_units.items()},
+            indent=2,
+        ))
+    else:
+        for check, issues_df in issues_in_units.items():
+            print(f"{CHECKS[check]}: {len(issues_df)}")
+            if not issues_df.empty:
+                write_output(issues_df.astype(object).fillna(""), args.format)
+
+    remaining = sum(len(issues_df) for issues_df in issues.values())
+    if args.repair and remaining:
+        fixed = integrity_service.repair(issues)
+        for check, count in fixed.items():
+            if count:
+                print(f"Repaired: {CHECKS[check]}: {count}", file=sys.stderr)
+        remaining -= sum(len(issues[check]) for check in REPAIRABLE_CHECKS)
+    return 1 if remaining else 0
+
+
+def handle_serve(args: argparse.Namespace) -> int:
+    """
+    Runs the local API server until it is interrupted.
+    """
+    from api_server import run_server
+
+    run_server(args.data_dir, args.host, args.port)
+    return 0
@@ -1,6 +1,7 @@
 import pandas as pd
 from tabulate import tabulate
-from rich.progress import Progress
+from goals import GoalService
+from money import CENTS_PER_UNIT, format_cents, to_units
 
 
 class FinancialGoalsMode:
@@ -15,6 +16,7 @@ class FinancialGoalsMode:
         self.category_service = category_service
         self.account_service = account_service
         self.transaction_service = transaction_service 
+        self.goal_service = GoalService(transaction_service, account_service)
 
     def display_financial_goals_mode_menu(self) -> None:
         """
@@ -27,6 +29,7 @@ class FinancialGoalsMode:
         print("Would you like to see details of one of your financial goals?")
         print("1. Yes")
         print("2. No")
+        print("3. Show the dashboard of all goals")
 
         while True:
             choice = input("Enter your choice: ").strip()
@@ -37,6 +40,9 @@ class FinancialGoalsMode:
                 return
             elif choice == "2":
                 return
+            elif choice == "3":
+                self.display_goals_dashboard()
+                return
             else:
                 print("\n⚠️  Invalid input. Please enter a valid option.\n")
 
@@ -51,9 +57,13 @@ class FinancialGoalsMode:
         if accounts_df.empty:
             print("\nYou currently have no financial goals. Set some by going to Settings.😉")
         else:
+            accounts_df = accounts_df.assign(
+                Balance=to_units(accounts_df["Balance"]),
+                Goal_Amount=to_units(accounts_df["Goal_Amount"]),
+            )
             accounts = accounts_df[columns_to_display].values.tolist()
             print("\nFinancial Goals:")
-            print(tabulate(accounts, headers=headers, tablefmt="grid"))
+            print(tabulate(accounts, headers=headers, tablefmt="grid", floatfmt=",.2f"))
 
     def get_valid_id(self) -> int:
         """
@@ -86,17 +96,33 @@ class FinancialGoalsMode:
         goal_balance = account_details["Balance"].values[0]
         
         print(f"\nYour current progress towards the {account_name} goal:")
-        print(f"Goal Amount: ${goal_amount:,.2f}")
-        print(f"Current Balance: ${goal_balance:,.2f}")
+        print(f"Goal Amount: ${format_cents(goal_amount)}")
+        print(f"Current Balance: ${format_cents(goal_balance)}")
 
         self.display_progress_bar(goal_amount, goal_balance)
 
+        self.display_goal_forecast(account_id)
+
         self.display_account_related_transactions(account_id, account_name)
 
+    def display_goal_forecast(self, account_id: int) -> None:
+        """
+        Displays the projected completion date and the required monthly contribution of a goal.
+        """
+        forecasts_df = self.goal_service.compute_goal_forecasts()
+        forecast = forecasts_df[forecasts_df["Account_ID"] == account_id].iloc[0]
+
+        print(f"Average monthly contribution (last 3 months): ${forecast['Rolling_Average'] / CENTS_PER_UNIT:,.2f}")
+        print(f"Projected completion: {self.format_eta(forecast['Projected_Date'], forecast['Remaining'])}")
+        if forecast["Remaining"] > 0:
+            print(f"Required monthly contribution to reach the goal in 12 months: ${format_cents(forecast['Required_Monthly'])}")
+
     def display_progress_bar(self, goal_amount, goal_balance) -> None:
         """
         Displays the progress bar using the rich library
         """
+        from rich.progress import Progress
+
         progress_percentage = (goal_balance / goal_amount) * 100 if goal_amount else 0
 
         with Progress() as progress:
@@ -104,12 +130,68 @@ class FinancialGoalsMode:
             progress.update(task1, completed=progress_percentage)
             progress.stop()
 
+    def display_goals_dashboard(self) -> None:
+        """
+        Displays the progress, contributions and ETA of all goals,
+        followed by the progress bars of all goals rendered together.
+        """
+        dashboard_df = self.goal_service.compute_goal_dashboard()
+
+        if dashboard_df.empty:
+            print("\nYou currently have no financial goals. Set some by going to Settings.😉")
+            return
+
+        rows = [
+            [
+                goal["Account_ID"],
+                goal["Name"],
+                goal["Balance"] / CENTS_PER_UNIT,
+                goal["Goal_Amount"] / CENTS_PER_UNIT,
+                goal["Progress_%"],
+                goal["Remaining"] / CENTS_PER_UNIT,
+                goal["Last_30d"] / CENTS_PER_UNIT,
+                goal["Last_90d"] / CENTS_PER_UNIT,
+                goal["Last_365d"] / CENTS_PER_UNIT,
+                self.format_eta(goal["ETA"], goal["Remaining"]),
+            ]
+            for goal in dashboard_df.to_dict("records")
+        ]
+        print("\nFinancial Goals Dashboard:")
+        print(tabulate(
+            rows,
+            headers=["ID", "Name", "Saved", "Goal", "Progress %", "Remaining", "Last 30 days", "Last 90 days", "Last 365 days", "ETA"],
+            tablefmt="psql",
+            floatfmt=",.2f",
+        ))
+
+        self.display_progress_bars(dashboard_df)
+
+    def display_progress_bars(self, dashboard_df: pd.DataFrame) -> None:
+        """
+        Displays one progress bar per goal in a single rich display.
+        """
+        from rich.progress import Progress
+
+        with Progress() as progress:
+            for goal in dashboard_df[["Name", "Progress_%"]].itertuples(index=False):
+                progress.add_task(f"[green]{goal[0]}", total=100, completed=min(goal[1], 100))
+            progress.stop()
+
+    def format_eta(self, eta: pd.Timestamp, remaining: float) -> str:
+        """
+        Formats the estimated date of reaching a goal.
+        """
+        if pd.isna(eta):
+            return "-"
+        if remaining <= 0:
+            return "Reached"
+        return eta.strftime("%d-%m-%Y")
+
     def display_account_related_transactions(self, account_id: int, account_name: str) -> None:
         """
         Displays all transactions relating to the financial goal account.
         """
-        transactions_df = self.transaction_service.df.copy()
-        transactions_df = transactions_df[((transactions_df["From_Account_ID"] == account_id) | (transactions_df["To_Account_ID"] == account_id))]
+        transactions_df = self.transaction_service.get_account_transactions(account_id).copy()
         self.format_transactions(transactions_df)
 
         if not transactions_df.empty:
@@ -124,9 +206,10 @@ class FinancialGoalsMode:
 
     def format_transactions(self, transactions_df: pd.DataFrame) -> None:
         """
-        Formats the transactions by handling empty notes.
+        Formats the transactions by handling empty notes and converting the amounts from cents.
         """
-        transactions_df["Note"] = transactions_df["Note"].fillna("")
+        transactions_df["Amount"] = to_units(transactions_df["Amount"])
+        transactions_df["Note"] = transactions_df["Note"].astype(object).fillna("")
 
     
 
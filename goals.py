@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from telemetry import track_operation
+from transactions import OPENING_BALANCE
+
+CONTRIBUTION_WINDOWS = [30, 90, 365]
+
+# The contributions of this window set the pace used for the ETA.
+ETA_WINDOW = 90
+
+# ETAs further away than this are left empty.
+MAX_ETA_DAYS = 100 * 365
+
+# Months of contribution history used by the forecasts.
+FORECAST_LOOKBACK_MONTHS = 12
+ROLLING_WINDOW_MONTHS = 3
+AVERAGE_DAYS_PER_MONTH = 365.25 / 12
+
+
+class GoalService:
+    """
+    Computes the progress of the financial goal accounts from the ledger.
+    Amounts in the results are in cents.
+    """
+
+    def __init__(self, transaction_service: any, account_service: any) -> None:
+        """
+        Initializes the class with service instances.
+        """
+        self.transaction_service = transaction_service
+        self.account_service = account_service
+        self._forecast_cache = {}
+
+    def get_goal_accounts(self) -> pd.DataFrame:
+        """
+        Returns the accounts marked as financial goals.
+        """
+        accounts_df = self.account_service.df
+        return accounts_df[accounts_df["Is_Goal"].str.lower() == "yes"]
+
+    def get_goal_transactions(self, goal_ids: list) -> pd.DataFrame:
+        """
+        Returns the transactions of the goal accounts with their account ID and parsed date.
+        Rows are gathered from the per-account posting lists, so only goal rows are touched.
+        Opening balances are not contributions and are left out.
+        """
+        _, transactions_df, dates, account_index = self.transaction_service.snapshot(with_account_index=True)
+        positions = np.sort(
+            np.concatenate(
+                [np.array([], dtype=np.intp)]
+                + [account_index.get(int(goal_id), np.array([], dtype=np.intp)) for goal_id in goal_ids]
+            )
+        )
+        goal_rows = transactions_df.iloc[positions]
+        is_contribution = (goal_rows["Type"] != OPENING_BALANCE).to_numpy()
+        positions = positions[is_contribution]
+        goal_rows = goal_rows[is_contribution]
+        return pd.DataFrame(
+            {
+                "Account_ID": goal_rows["From_Account_ID"]
+                .fillna(goal_rows["To_Account_ID"])
+                .to_numpy(dtype=np.int64),
+                "Amount": goal_rows["Amount"].to_numpy(dtype=float),
+                "Date": dates.to_numpy()[positions],
+            }
+        )
+
+    @track_operation
+    def compute_goal_dashboard(self, as_of: date = None) -> pd.DataFrame:
+        """
+        Computes progress, remaining amount, net contributions over the last
+        30/90/365 days and the ETA of every goal with one grouped aggregation.
+        The ETA assumes the goal keeps receiving its average of the last 90 days.
+        """
+        as_of = pd.Timestamp(as_of or date.today())
+        goals_df = self.get_goal_accounts()[
+            ["Account_ID", "Name", "Balance", "Goal_Amount"]
+        ].set_index("Account_ID")
+
+        goal_transactions_df = self.get_goal_transactions(goals_df.index.tolist())
+        age_days = (as_of - goal_transactions_df["Date"]).dt.days
+        window_columns = [f"Last_{days}d" for days in CONTRIBUTION_WINDOWS]
+        for days, column in zip(CONTRIBUTION_WINDOWS, window_columns):
+            goal_transactions_df[column] = goal_transactions_df["Amount"].where(
+                (age_days >= 0) & (age_days < days), 0.0
+            )
+        contributions = goal_transactions_df.groupby("Account_ID")[window_columns].sum()
+
+        dashboard_df = goals_df.join(contributions).fillna(
+            {column: 0.0 for column in window_columns}
+        )
+        goal_amounts = dashboard_df["Goal_Amount"].astype(float).where(dashboard_df["Goal_Amount"] > 0)
+        dashboard_df["Progress_%"] = (
+            dashboard_df["Balance"] / goal_amounts * 100
+        ).clip(lower=0).fillna(0)
+        dashboard_df["Remaining"] = (
+            dashboard_df["Goal_Amount"] - dashboard_df["Balance"]
+        ).clip(lower=0).fillna(0)
+
+        daily_pace = dashboard_df[f"Last_{ETA_WINDOW}d"] / ETA_WINDOW
+        days_left = np.ceil(dashboard_df["Remaining"] / daily_pace.where(daily_pace > 0))
+        days_left = days_left.where(dashboard_df["Remaining"] > 0, 0)
+        days_left = days_left.where(goal_amounts.notna() & (days_left <= MAX_ETA_DAYS))
+        dashboard_df["ETA"] = as_of + pd.to_timedelta(days_left, unit="D")
+
+        return dashboard_df.reset_index()
+
+    @track_operation
+    def compute_goal_forecasts(
+        self, as_of: date = None, target_months: int = 12
+    ) -> pd.DataFrame:
+        """
+        Forecasts the completion date of every goal and the monthly contribution
+        needed to finish it within target_months.
+        The monthly contributions of the last 12 months get a 3-month rolling average
+        and a linear trend fitted for all goals at once; the projection assumes the
+        contributions keep following the trend, or stay at the rolling average when
+        the trend never reaches the goal. Results are cached until the transactions
+        or accounts change.
+        """
+        as_of = pd.Timestamp(as_of or date.today()).normalize()
+        version = (self.transaction_service.version, self.account_service.version)
+        if self._forecast_cache and next(iter(self._forecast_cache))[0] != version:
+            self._forecast_cache.clear()
+
+        cache_key = (version, as_of, target_months)
+        if cache_key not in self._forecast_cache:
+            self._forecast_cache[cache_key] = self.build_goal_forecasts(
+                as_of, target_months
+            )
+        return self._forecast_cache[cache_key]
+
+    def build_goal_forecasts(
+        self, as_of: pd.Timestamp, target_months: int
+    ) -> pd.DataFrame:
+        """
+        Computes the forecasts returned by compute_goal_forecasts.
+        """
+        goals_df = self.get_goal_accounts()[
+            ["Account_ID", "Name", "Balance", "Goal_Amount"]
+        ].set_index("Account_ID")
+
+        months = pd.period_range(
+            end=as_of.to_period("M"), periods=FORECAST_LOOKBACK_MONTHS, freq="M"
+        )
+        goal_transactions_df = self.get_goal_transactions(goals_df.index.tolist())
+        goal_transactions_df = goal_transactions_df[
+            (goal_transactions_df["Date"] >= months[0].start_time)
+            & (goal_transactions_df["Date"] <= as_of)
+        ]
+        monthly = (
+            goal_transactions_df.groupby(
+                ["Account_ID", goal_transactions_df["Date"].dt.to_period("M")]
+            )["Amount"]
+            .sum()
+            .unstack("Date")
+            .reindex(index=goals_df.index, columns=months)
+            .fillna(0.0)
+        )
+
+        # Least-squares line through each goal's monthly contributions.
+        x = np.arange(len(months), dtype=float)
+        x_centered = x - x.mean()
+        y = monthly.to_numpy()
+        slope = (y - y.mean(axis=1, keepdims=True)) @ x_centered / (x_centered**2).sum()
+        trend_pace = y.mean(axis=1) + slope * x_centered[-1]
+
+        forecasts_df = goals_df.copy()
+        forecasts_df["Monthly_Average"] = y.mean(axis=1)
+        forecasts_df["Rolling_Average"] = (
+            monthly.T.rolling(ROLLING_WINDOW_MONTHS, min_periods=1).mean().iloc[-1]
+        )
+        forecasts_df["Trend_Slope"] = slope
+        forecasts_df["Trend_Pace"] = trend_pace
+
+        remaining = (forecasts_df["Goal_Amount"] - forecasts_df["Balance"]).clip(lower=0)
+        forecasts_df["Remaining"] = remaining
+        forecasts_df["Required_Monthly"] = np.ceil(remaining / target_months)
+
+        months_left = self.solve_months_to_goal(
+            trend_pace, slope, remaining.to_numpy(dtype=float)
+        )
+        months_left = np.where(
+            np.isnan(months_left),
+            self.solve_months_to_goal(
+                forecasts_df["Rolling_Average"].to_numpy(dtype=float),
+                np.zeros(len(forecasts_df)),
+                remaining.to_numpy(dtype=float),
+            ),
+            months_left,
+        )
+        days_left = np.ceil(months_left * AVERAGE_DAYS_PER_MONTH)
+        days_left = np.where(remaining.to_numpy(dtype=float) > 0, days_left, 0)
+        days_left = pd.Series(days_left, index=forecasts_df.index).where(
+            forecasts_df["Goal_Amount"].notna() & (days_left <= MAX_ETA_DAYS)
+        )
+        forecasts_df["Projected_Date"] = as_of + pd.to_timedelta(days_left, unit="D")
+
+        return forecasts_df.reset_index()
+
+    def solve_months_to_goal(
+        self, pace: np.ndarray, slope: np.ndarray, remaining: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the months m after which contributions of pace + slope * t per month
+        add up to the remaining amount: slope / 2 * m^2 + pace * m = remaining.
+        Goals that the trend never reaches get NaN.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            linear = np.where(pace > 0, remaining / pace, np.nan)
+            discriminant = pace**2 + 2 * slope * remaining
+            quadratic = (-pace + np.sqrt(discriminant)) / slope
+            months_left = np.where(np.abs(slope) > 1e-9, quadratic, linear)
+        return np.where(np.isfinite(months_left) & (months_left >= 0), months_left, np.nan)
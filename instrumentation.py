@@ -0,0 +1,303 @@
+import argparse
+import atexit
+import functools
+import importlib
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+PROFILE_ENV = "FINANCE_APP_PROFILE"
+PROFILE_OUTPUT_ENV = "FINANCE_APP_PROFILE_OUTPUT"
+PROFILE_STATS_ENV = "FINANCE_APP_PROFILE_STATS"
+
+# Every public method of the services is timed.
+INSTRUMENTED_SERVICES = [
+    ("transactions", "TransactionService"),
+    ("accounts", "AccountService"),
+    ("categories", "CategoryService"),
+    ("reports", "ReportService"),
+    ("goals", "GoalService"),
+    ("presets", "PresetService"),
+    ("budgets", "BudgetService"),
+    ("allocations", "AllocationService"),
+]
+
+# Mode methods that filter or render without waiting for user input, by name prefix.
+INSTRUMENTED_MODES = [
+    ("overview_mode", "OverviewMode", ("get_filtered_", "format_", "print_", "plot_")),
+    (
+        "financials_goals_mode",
+        "FinancialGoalsMode",
+        ("display_progress_bar", "display_account_related_", "display_financial_goals_table", "display_goals_dashboard", "format_"),
+    ),
+    ("transactions_mode", "TransactionsMode", ("display_categories", "display_accounts")),
+    ("settings_mode", "SettingsMode", ("display_categories", "display_accounts")),
+]
+
+# Functions imported by name into other modules: (defining module, function, importing modules).
+INSTRUMENTED_FUNCTIONS = [
+    ("snapshots", "load_snapshot", ["transactions", "accounts"]),
+    ("snapshots", "write_snapshot", ["transactions", "accounts"]),
+    ("snapshots", "save_csv_with_snapshot", ["transactions", "accounts"]),
+    (
+        "tabulate",
+        "tabulate",
+        ["overview_mode", "financials_goals_mode", "transactions_mode", "settings_mode"],
+    ),
+]
+
+# Upper bounds of the latency histogram buckets in seconds.
+HISTOGRAM_BOUNDS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10]
+
+
+class OperationStats:
+    """
+    Collects the latencies of one operation.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        """
+        self.durations = []
+
+    def add(self, seconds: float) -> None:
+        """
+        Records one call.
+        """
+        self.durations.append(seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the given percentile of the recorded latencies (nearest rank).
+        """
+        ordered = sorted(self.durations)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def histogram(self) -> dict:
+        """
+        Counts the calls per latency bucket.
+        """
+        counts = {f"<={bound}s": 0 for bound in HISTOGRAM_BOUNDS}
+        counts[f">{HISTOGRAM_BOUNDS[-1]}s"] = 0
+        for seconds in self.durations:
+            for bound in HISTOGRAM_BOUNDS:
+                if seconds <= bound:
+                    counts[f"<={bound}s"] += 1
+                    break
+            else:
+                counts[f">{HISTOGRAM_BOUNDS[-1]}s"] += 1
+        return counts
+
+    def summary(self) -> dict:
+        """
+        Returns call count, total, mean, p50, p95 and max latency.
+        """
+        total = sum(self.durations)
+        return {
+            "calls": len(self.durations),
+            "total": total,
+            "mean": total / len(self.durations),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self.durations),
+        }
+
+
+class Instrumentation:
+    """
+    Times service methods and rendering calls, and reports the latencies at exit.
+    """
+
+    def __init__(self, output_path: str = None, stats_path: str = None) -> None:
+        """
+        Initializes the instrumentation with optional JSON export and pstats paths.
+        """
+        self.operations = {}
+        self.listeners = []
+        self.output_path = output_path
+        self.stats_path = stats_path
+        self.profiler = None
+
+    def record(self, operation: str, seconds: float, instance: any = None) -> None:
+        """
+        Records one call of an operation and notifies the listeners.
+        """
+        self.operations.setdefault(operation, OperationStats()).add(seconds)
+        for listener in self.listeners:
+            listener(operation, seconds, instance)
+
+    def timed(self, operation: str, function: any, is_method: bool = False) -> any:
+        """
+        Wraps a function so that every call is timed under the operation name.
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(
+                    operation,
+                    time.perf_counter() - start,
+                    args[0] if is_method and args else None,
+                )
+
+        wrapper.__wrapped_operation__ = operation
+        return wrapper
+
+    def instrument_class(self, cls: type, prefixes: tuple = None) -> None:
+        """
+        Wraps the public methods of a class, or only those starting with one of the prefixes.
+        """
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_") or not callable(attribute):
+                continue
+            if hasattr(attribute, "__wrapped_operation__"):
+                continue
+            if prefixes is not None and not name.startswith(prefixes):
+                continue
+            setattr(
+                cls,
+                name,
+                self.timed(f"{cls.__name__}.{name}", attribute, is_method=True),
+            )
+
+    def instrument_function(
+        self, module_name: str, function_name: str, importing_modules: list
+    ) -> None:
+        """
+        Wraps a module-level function in its module and in the modules that imported it by name.
+        """
+        module = importlib.import_module(module_name)
+        function = getattr(module, function_name)
+        if hasattr(function, "__wrapped_operation__"):
+            return
+        wrapper = self.timed(f"{module_name}.{function_name}", function)
+        setattr(module, function_name, wrapper)
+        for importing_module in importing_modules:
+            setattr(importlib.import_module(importing_module), function_name, wrapper)
+
+    def install(self) -> None:
+        """
+        Instruments the services, modes and rendering functions.
+        """
+        for module_name, class_name in INSTRUMENTED_SERVICES:
+            self.instrument_class(getattr(importlib.import_module(module_name), class_name))
+        for module_name, class_name, prefixes in INSTRUMENTED_MODES:
+            self.instrument_class(
+                getattr(importlib.import_module(module_name), class_name), prefixes
+            )
+        for module_name, function_name, importing_modules in INSTRUMENTED_FUNCTIONS:
+            self.instrument_function(module_name, function_name, importing_modules)
+
+    def start_profiler(self) -> None:
+        """
+        Starts a cProfile profiler for the whole session.
+        """
+        import cProfile
+
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def summary(self) -> dict:
+        """
+        Returns the summary and histogram of every recorded operation.
+        """
+        return {
+            operation: {**stats.summary(), "histogram": stats.histogram()}
+            for operation, stats in sorted(self.operations.items())
+        }
+
+    def report(self) -> None:
+        """
+        Prints the latency summary, exports it and dumps the profiler statistics.
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.stats_path)
+            print(f"Profiler statistics were written to {self.stats_path}.", file=sys.stderr)
+
+        summary = self.summary()
+        if self.output_path:
+            with open(self.output_path, "w") as file:
+                json.dump(summary, file, indent=2)
+            print(f"Latency summary was written to {self.output_path}.", file=sys.stderr)
+
+        if not summary:
+            return
+        print("\nOperation latencies (ms):", file=sys.stderr)
+        print(
+            f"{'Operation':<58}{'Calls':>7}{'Total':>10}{'Mean':>9}{'p50':>9}{'p95':>9}{'Max':>9}",
+            file=sys.stderr,
+        )
+        for operation, stats in sorted(
+            summary.items(), key=lambda item: item[1]["total"], reverse=True
+        ):
+            print(
+                f"{operation:<58}{stats['calls']:>7}"
+                + "".join(
+                    f"{stats[key] * 1000:>{width}.1f}"
+                    for key, width in [("total", 10), ("mean", 9), ("p50", 9), ("p95", 9), ("max", 9)]
+                ),
+                file=sys.stderr,
+            )
+
+
+_instrumentation = None
+
+
+def enable_instrumentation(output_path: str = None, stats_path: str = None) -> Instrumentation:
+    """
+    Enables timing for the session and registers the report at exit.
+    Returns the already active instrumentation when called again.
+    """
+    global _instrumentation
+    if _instrumentation is None:
+        _instrumentation = Instrumentation(output_path, stats_path)
+        _instrumentation.install()
+        if stats_path:
+            _instrumentation.start_profiler()
+        atexit.register(_instrumentation.report)
+    return _instrumentation
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Returns the active instrumentation, or None if timing is disabled.
+    """
+    return _instrumentation
+
+
+def configure_from_arguments(argv: list) -> list:
+    """
+    Enables instrumentation when requested by the --profile options or the environment.
+    A directory given for the profiler statistics gets one timestamped file per session.
+    Returns the remaining arguments.
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile-output")
+    parser.add_argument("--profile-stats")
+    options, remaining = parser.parse_known_args(argv)
+
+    stats_path = options.profile_stats or os.environ.get(PROFILE_STATS_ENV)
+    if stats_path and os.path.isdir(stats_path):
+        stats_path = os.path.join(
+            stats_path, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.pstats"
+        )
+    output_path = options.profile_output or os.environ.get(PROFILE_OUTPUT_ENV)
+
+    if (
+        options.profile
+        or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+        or output_path
+        or stats_path
+    ):
+        enable_instrumentation(output_path, stats_path)
+    return remaining
@@ -0,0 +1,249 @@
+import pandas as pd
+from datetime import date
+from telemetry import track_operation
+from transactions import OPENING_BALANCE
+
+# Check name: description printed in the verification summary.
+CHECKS = {
+    "unknown_account": "Transactions pointing at an account that does not exist",
+    "account_name": "Transactions whose account name differs from the account's current name",
+    "unpaired_transfer": "Transfer legs without a matching transfer on the other side",
+    "unknown_category": "Transactions whose category is not in the categories file",
+    "balance": "Accounts whose balance differs from the sum of their transactions",
+}
+
+# Checks that --repair can fix. Unknown accounts and unpaired transfers are
+# only reported, since the missing side cannot be reconstructed.
+REPAIRABLE_CHECKS = ["account_name", "unknown_category", "balance"]
+
+ADJUSTMENT_NOTE = "Balance adjustment"
+
+
+class IntegrityService:
+    """
+    Checks that the ledger, the accounts and the categories agree with each other.
+    Every check is a vectorized join or grouped sum over the whole ledger.
+    """
+
+    def __init__(
+        self, transaction_service: any, account_service: any, category_service: any
+    ) -> None:
+        """
+        Initializes the class with the service instances.
+        """
+        self.transaction_service = transaction_service
+        self.account_service = account_service
+        self.category_service = category_service
+
+    @track_operation
+    def verify(self) -> dict:
+        """
+        Runs all checks and returns the offending rows of each one. The ledger and the
+        accounts are taken as one snapshot under the read lock they share, so all checks
+        see the same data even while another thread writes.
+        """
+        # Loading takes the write lock, so it cannot happen under the read lock.
+        self.category_service.categories
+        self.account_service.df
+        self.transaction_service.df
+        with self.transaction_service.lock.read():
+            _, transactions_df, _ = self.transaction_service.snapshot()
+            _, accounts_df = self.account_service.snapshot()
+            categories = self.category_service.categories
+        return {
+            "unknown_account": self.find_unknown_accounts(transactions_df, accounts_df),
+            "account_name": self.find_account_name_mismatches(transactions_df, accounts_df),
+            "unpaired_transfer": self.find_unpaired_transfers(transactions_df),
+            "unknown_category": self.find_unknown_categories(transactions_df, categories),
+            "balance": self.find_balance_differences(transactions_df, accounts_df),
+        }
+
+    def find_unknown_accounts(self, transactions_df: pd.DataFrame, accounts_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the transactions whose from or to account ID is not an existing account.
+        """
+        account_ids = accounts_df["Account_ID"]
+        rows = []
+        for side in ["From", "To"]:
+            ids = transactions_df[f"{side}_Account_ID"]
+            unknown = (ids.notna() & ~ids.isin(account_ids)).to_numpy()
+            rows.append(
+                pd.DataFrame(
+                    {
+                        "Transaction_ID": transactions_df["Transaction_ID"].to_numpy()[unknown],
+                        "Side": side,
+                        "Account_ID": ids.to_numpy()[unknown],
+                        "Account": transactions_df[f"{side}_Account"].to_numpy()[unknown],
+                    }
+                )
+            )
+        return pd.concat(rows, ignore_index=True)
+
+    def find_account_name_mismatches(self, transactions_df: pd.DataFrame, accounts_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the transactions whose account name is not the current name of their account ID.
+        """
+        names = accounts_df.set_index("Account_ID")["Name"]
+        rows = []
+        for side in ["From", "To"]:
+            ids = transactions_df[f"{side}_Account_ID"]
+            current = ids.map(names)
+            recorded = transactions_df[f"{side}_Account"].astype(object)
+            mismatch = (current.notna() & (recorded != current)).to_numpy()
+            rows.append(
+                pd.DataFrame(
+                    {
+                        "Transaction_ID": transactions_df["Transaction_ID"].to_numpy()[mismatch],
+                        "Side": side,
+                        "Account_ID": ids.to_numpy()[mismatch],
+                        "Recorded": recorded.to_numpy()[mismatch],
+                        "Expected": current.to_numpy()[mismatch],
+                    }
+                )
+            )
+        return pd.concat(rows, ignore_index=True)
+
+    def find_unpaired_transfers(self, transactions_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the transfer legs without a counterpart. A transfer out is paired with
+        the transfer in that has the next transaction ID, the same date and the opposite amount.
+        """
+        columns = ["Transaction_ID", "Date", "Amount"]
+        outflows = transactions_df.loc[transactions_df["Type"] == "Transfer Out", columns]
+        inflows = transactions_df.loc[transactions_df["Type"] == "Transfer In", columns]
+
+        pairs = outflows.assign(Pair_ID=outflows["Transaction_ID"] + 1).merge(
+            inflows,
+            left_on="Pair_ID",
+            right_on="Transaction_ID",
+            how="outer",
+            suffixes=("_Out", "_In"),
+        )
+        paired = (
+            pairs["Transaction_ID_Out"].notna()
+            & pairs["Transaction_ID_In"].notna()
+            & (pairs["Date_Out"] == pairs["Date_In"])
+            & (pairs["Amount_Out"] == -pairs["Amount_In"])
+        )
+        unpaired = pairs[~paired]
+        return pd.concat(
+            [
+                pd.DataFrame(
+                    {
+                        "Transaction_ID": unpaired[f"Transaction_ID_{side}"],
+                        "Type": f"Transfer {side}",
+                        "Date": unpaired[f"Date_{side}"],
+                        "Amount": unpaired[f"Amount_{side}"],
+                    }
+                ).dropna(subset=["Transaction_ID"])
+                for side in ["Out", "In"]
+            ],
+            ignore_index=True,
+        ).astype({"Transaction_ID": "int64"})
+
+    def find_unknown_categories(self, transactions_df: pd.DataFrame, categories: dict) -> pd.DataFrame:
+        """
+        Returns the income and expense transactions whose category is not a category
+        of their type, and the transfers not filed under 'Transfer'.
+        """
+        allowed = pd.DataFrame(
+            [
+                (category_type, name)
+                for category_type, names in categories.items()
+                for name in [*names.values(), "Uncategorized"]
+            ]
+            + [(transfer_type, "Transfer") for transfer_type in ["Transfer Out", "Transfer In", "Transfer"]]
+            + [(OPENING_BALANCE, OPENING_BALANCE)],
+            columns=["Type", "Category"],
+        )
+        known = pd.MultiIndex.from_arrays(
+            [transactions_df["Type"].astype(object), transactions_df["Category"].astype(object)]
+        ).isin(pd.MultiIndex.from_frame(allowed))
+        return transactions_df.loc[~known, ["Transaction_ID", "Type", "Date", "Category"]].reset_index(drop=True)
+
+    def compute_ledger_balances(self, transactions_df: pd.DataFrame) -> pd.Series:
+        """
+        Returns the sum of the transactions of every account. A single-row 'Transfer'
+        holds a positive amount that leaves its from account.
+        """
+        amounts = transactions_df["Amount"]
+        outgoing = amounts.where(transactions_df["Type"] != "Transfer", -amounts)
+        return (
+            pd.concat(
+                [
+                    outgoing.groupby(transactions_df["From_Account_ID"]).sum(),
+                    amounts.groupby(transactions_df["To_Account_ID"]).sum(),
+                ]
+            )
+            .groupby(level=0)
+            .sum()
+        )
+
+    def find_balance_differences(self, transactions_df: pd.DataFrame, accounts_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the accounts whose balance is not the sum of their transactions,
+        with the difference in cents.
+        """
+        accounts_df = accounts_df[["Account_ID", "Name", "Balance"]]
+        ledger_balances = self.compute_ledger_balances(transactions_df)
+        balances_df = accounts_df.assign(
+            Ledger_Balance=accounts_df["Account_ID"].map(ledger_balances).fillna(0).astype("int64")
+        )
+        balances_df["Difference"] = balances_df["Balance"] - balances_df["Ledger_Balance"]
+        return balances_df[balances_df["Difference"] != 0].reset_index(drop=True)
+
+    @track_operation
+    def repair(self, issues: dict) -> dict:
+        """
+        Fixes the repairable issues with one write of the ledger: account names are
+        set to the current names, unknown categories become 'Uncategorized' (or
+        'Transfer' for transfers), and balance differences are recorded as dated
+        opening balance adjustments, so the balances themselves stay as they are
+        and the reports do not count the differences as income or expenses.
+        The fixes are made under the write lock, so readers see none or all of them.
+        Returns the number of fixed rows per check.
+        """
+        with self.transaction_service.lock.write():
+            return self.apply_repairs(issues)
+
+    def apply_repairs(self, issues: dict) -> dict:
+        """
+        Makes the fixes of repair() while the caller holds the write lock.
+        """
+        transactions_df = self.transaction_service.df
+        fixed = {check: 0 for check in REPAIRABLE_CHECKS}
+
+        mismatches = issues["account_name"]
+        for side in ["From", "To"]:
+            side_df = mismatches[mismatches["Side"] == side]
+            for name, ids in side_df.groupby("Expected")["Transaction_ID"]:
+                self.transaction_service.set_label(
+                    f"{side}_Account", transactions_df["Transaction_ID"].isin(ids), name
+                )
+        fixed["account_name"] = len(mismatches)
+
+        unknown = transactions_df["Transaction_ID"].isin(issues["unknown_category"]["Transaction_ID"])
+        is_transfer = transactions_df["Type"].astype(object).str.startswith("Transfer")
+        self.transaction_service.set_label("Category", unknown & ~is_transfer, "Uncategorized")
+        self.transaction_service.set_label("Category", unknown & is_transfer, "Transfer")
+        fixed["unknown_category"] = int(unknown.sum())
+
+        differences = issues["balance"]
+        if not differences.empty:
+            self.transaction_service.add_transactions(
+                pd.DataFrame(
+                    {
+                        "Type": OPENING_BALANCE,
+                        "Date": date.today().strftime("%d-%m-%Y"),
+                        "Amount": differences["Difference"].to_numpy(),
+                        "Category": OPENING_BALANCE,
+                        "To_Account_ID": differences["Account_ID"].to_numpy(),
+                        "To_Account": differences["Name"].to_numpy(),
+                        "Note": ADJUSTMENT_NOTE,
+                    }
+                )
+            )
+            fixed["balance"] = len(differences)
+        elif fixed["account_name"] or fixed["unknown_category"]:
+            self.transaction_service.save_transaction_to_file()
+        return fixed
@@ -0,0 +1,222 @@
+import pandas as pd
+from telemetry import track_operation
+
+# Oldest changes are forgotten beyond this many undo steps.
+MAX_UNDO_STEPS = 50
+
+
+class Journal:
+    """
+    Keeps undo and redo stacks of the changes made in this session.
+    Each entry is a compact delta (the IDs of the touched rows, the previous names,
+    or the removed rows themselves) instead of a copy of the DataFrames, and
+    undoing it only relabels, removes or puts back those rows.
+    """
+
+    def __init__(
+        self,
+        transaction_service: any,
+        account_service: any,
+        category_service: any,
+        budget_service: any,
+        allocation_service: any,
+        preset_service: any,
+    ) -> None:
+        """
+        Initializes the class with the service instances and empty stacks.
+        """
+        self.transaction_service = transaction_service
+        self.account_service = account_service
+        self.category_service = category_service
+        self.budget_service = budget_service
+        self.allocation_service = allocation_service
+        self.preset_service = preset_service
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def record(self, kind: str, description: str, **delta: any) -> None:
+        """
+        Records a change that was just made. A new change clears the redo stack.
+        """
+        self.undo_stack.append({"kind": kind, "description": description, **delta})
+        del self.undo_stack[:-MAX_UNDO_STEPS]
+        self.redo_stack.clear()
+
+    def clear(self) -> None:
+        """
+        Forgets all recorded changes, e.g. after the data was rolled back to a checkpoint.
+        """
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    @track_operation
+    def undo(self) -> str:
+        """
+        Reverts the last recorded change and returns its description, or None if there is none.
+        """
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        with self.transaction_service.lock.write():
+            getattr(self, f"undo_{entry['kind']}")(entry)
+        self.redo_stack.append(entry)
+        return entry["description"]
+
+    @track_operation
+    def redo(self) -> str:
+        """
+        Applies the last undone change again and returns its description, or None if there is none.
+        """
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        with self.transaction_service.lock.write():
+            getattr(self, f"redo_{entry['kind']}")(entry)
+        self.undo_stack.append(entry)
+        return entry["description"]
+
+    # Added transactions: {"transaction_ids": [...]}, plus the removed rows while undone.
+
+    def undo_add_transactions(self, entry: dict) -> None:
+        """
+        Removes the added transactions and takes their amounts off the account balances.
+        """
+        entry["rows"] = self.transaction_service.delete_transactions(entry["transaction_ids"])
+        changes = self.compute_balance_changes(entry["rows"])
+        self.account_service.update_account_balances({name: -amount for name, amount in changes.items()})
+
+    def redo_add_transactions(self, entry: dict) -> None:
+        """
+        Puts the removed transactions back with their IDs and reapplies their amounts.
+        """
+        rows_df = entry.pop("rows")
+        self.transaction_service.restore_transactions(rows_df)
+        self.account_service.update_account_balances(self.compute_balance_changes(rows_df))
+
+    def compute_balance_changes(self, rows_df: pd.DataFrame) -> dict:
+        """
+        Returns the balance change in cents the rows made to each account, by current
+        account name. A single-row 'Transfer' holds a positive amount that leaves its
+        from account.
+        """
+        amounts = rows_df["Amount"]
+        outgoing = amounts.where(rows_df["Type"] != "Transfer", -amounts)
+        by_id = (
+            pd.concat(
+                [
+                    outgoing.groupby(rows_df["From_Account_ID"]).sum(),
+                    amounts.groupby(rows_df["To_Account_ID"]).sum(),
+                ]
+            )
+            .groupby(level=0)
+            .sum()
+        )
+        names = self.account_service.df.set_index("Account_ID")["Name"]
+        return {
+            names[account_id]: int(amount)
+            for account_id, amount in by_id.items()
+            if amount and account_id in names.index
+        }
+
+    # Renamed category: {"category_type", "category_id", "old_name", "new_name", "transaction_ids"}.
+
+    def undo_rename_category(self, entry: dict) -> None:
+        """
+        Gives the category and its transactions, budgets, allocation rules and presets the previous name back.
+        """
+        self.apply_category_name(entry, entry["old_name"], entry["new_name"])
+
+    def redo_rename_category(self, entry: dict) -> None:
+        """
+        Renames the category and its transactions, budgets, allocation rules and presets again.
+        """
+        self.apply_category_name(entry, entry["new_name"], entry["old_name"])
+
+    def apply_category_name(self, entry: dict, name: str, current_name: str) -> None:
+        """
+        Sets the name of a renamed category on the category, the recorded transactions,
+        the budgets, the presets and, for an income category, the allocation rules.
+        """
+        self.category_service.edit_category(entry["category_type"], entry["category_id"], name)
+        self.relabel_transactions("Category", entry["transaction_ids"], name)
+        self.budget_service.rename_category(current_name, name)
+        self.preset_service.rename_category(entry["category_type"], current_name, name)
+        if entry["category_type"] == "Income":
+            self.allocation_service.rename_category(current_name, name)
+
+    # Deleted category: {"category_type", "category_id", "name", "transaction_ids", "budgets", "rules", "preset_ids"}.
+
+    def undo_delete_category(self, entry: dict) -> None:
+        """
+        Puts back the category, the category of its former transactions and presets, its budgets and allocation rules.
+        """
+        self.category_service.restore_category(entry["category_type"], entry["category_id"], entry["name"])
+        self.relabel_transactions("Category", entry["transaction_ids"], entry["name"])
+        self.budget_service.restore_budgets(entry["budgets"])
+        self.allocation_service.restore_rules(entry["rules"])
+        self.preset_service.relabel_presets(entry["preset_ids"], entry["name"])
+
+    def redo_delete_category(self, entry: dict) -> None:
+        """
+        Deletes the category again and uncategorizes its transactions and presets.
+        """
+        self.category_service.delete_category(entry["category_type"], entry["category_id"])
+        self.relabel_transactions("Category", entry["transaction_ids"], "Uncategorized")
+        self.budget_service.delete_category_budgets(entry["name"])
+        if entry["rules"]:
+            self.allocation_service.delete_rules("Category", entry["name"])
+        self.preset_service.relabel_presets(entry["preset_ids"], "Uncategorized")
+
+    def relabel_transactions(self, column: str, transaction_ids: list, label: str) -> None:
+        """
+        Sets a label on the transactions with the given IDs only and saves the ledger.
+        """
+        if not len(transaction_ids):
+            return
+        rows = self.transaction_service.df["Transaction_ID"].isin(transaction_ids)
+        self.transaction_service.set_label(column, rows, label)
+        self.transaction_service.save_transaction_to_file()
+
+    # Renamed account: {"account_id", "old_name", "new_name"}.
+
+    def undo_rename_account(self, entry: dict) -> None:
+        """
+        Gives the account, its transactions, the allocation rules and the presets the previous name back.
+        """
+        self.account_service.edit_account_name(entry["account_id"], entry["old_name"])
+        self.transaction_service.update_account_name_in_transactions(entry["account_id"], entry["old_name"])
+        self.allocation_service.rename_account(entry["new_name"], entry["old_name"])
+        self.preset_service.rename_account(entry["new_name"], entry["old_name"])
+
+    def redo_rename_account(self, entry: dict) -> None:
+        """
+        Renames the account, its transactions, the allocation rules and the presets again.
+        """
+        self.account_service.edit_account_name(entry["account_id"], entry["new_name"])
+        self.transaction_service.update_account_name_in_transactions(entry["account_id"], entry["new_name"])
+        self.allocation_service.rename_account(entry["old_name"], entry["new_name"])
+        self.preset_service.rename_account(entry["old_name"], entry["new_name"])
+
+    # Deleted account: {"account", "transaction_ids", "rules"}, the account row, the IDs of the
+    # transfer to Main made by the deletion and the allocation rules to the account,
+    # plus the removed transfer while undone.
+
+    def undo_delete_account(self, entry: dict) -> None:
+        """
+        Puts back the account with its balance, removes the transfer to Main
+        and takes the balance off Main again.
+        """
+        account = entry["account"]
+        entry["rows"] = self.transaction_service.delete_transactions(entry["transaction_ids"])
+        self.account_service.restore_account(account)
+        self.account_service.update_account_balance("Main", -int(account["Balance"]))
+        self.allocation_service.restore_rules(entry["rules"])
+
+    def redo_delete_account(self, entry: dict) -> None:
+        """
+        Puts back the transfer to Main and deletes the account again.
+        """
+        self.transaction_service.restore_transactions(entry.pop("rows"))
+        self.account_service.delete_account(int(entry["account"]["Account_ID"]))
+        if entry["rules"]:
+            self.allocation_service.delete_rules("To_Account", entry["account"]["Name"])
@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+INCOME_CATEGORIES = ["Salary", "Freelance", "Interest", "Gifts"]
+EXPENSE_CATEGORIES = [
+    "Groceries",
+    "Rent",
+    "Utilities",
+    "Transport",
+    "Dining",
+    "Entertainment",
+    "Health",
+    "Shopping",
+    "Travel",
+    "Subscriptions",
+]
+NOTES = ["Weekly shopping", "Card payment", "Monthly", "Shared with family", "Refundable"]
+
+
+def generate_ledger(
+    n_transactions: int,
+    data_dir: str = "data",
+    seed: int = 42,
+    n_accounts: int = 8,
+    n_goals: int = 3,
+    years: int = 5,
+) -> None:
+    """
+    Generates a deterministic, realistic ledger and writes the transactions,
+    accounts and categories files into the data directory.
+    Account balances are set to the ledger sums so the data is consistent.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+
+    account_ids = np.arange(1, n_accounts + 1)
+    account_names = np.array(
+        ["Main"]
+        + [f"Account {i}" for i in range(2, n_accounts - n_goals + 1)]
+        + [f"Goal {i}" for i in range(1, n_goals + 1)],
+        dtype=object,
+    )
+
+    # Transfers are generated as events that expand into an out/in pair of rows.
+    n_transfers = n_transactions // 20
+    n_events = n_transactions - n_transfers
+    n_income = n_events // 5
+    kinds = rng.permutation(
+        np.repeat(
+            np.array(["Income", "Expense", "Transfer"], dtype=object),
+            [n_income, n_events - n_income - n_transfers, n_transfers],
+        )
+    )
+
+    end_date = pd.Timestamp("2025-12-31")
+    days_back = rng.integers(0, 365 * years, size=n_events)
+    order = np.argsort(-days_back, kind="stable")
+    kinds = kinds[order]
+    event_dates = (end_date - pd.to_timedelta(days_back[order], unit="D")).strftime(
+        "%d-%m-%Y"
+    ).to_numpy(dtype=object)
+
+    is_transfer_event = kinds == "Transfer"
+    rows_per_event = np.where(is_transfer_event, 2, 1)
+    event_index = np.repeat(np.arange(n_events), rows_per_event)
+    row_offset = np.arange(len(event_index)) - np.repeat(
+        np.cumsum(rows_per_event) - rows_per_event, rows_per_event
+    )
+    n_rows = len(event_index)
+
+    row_kinds = kinds[event_index]
+    is_income = row_kinds == "Income"
+    is_expense = row_kinds == "Expense"
+    is_transfer_out = (row_kinds == "Transfer") & (row_offset == 0)
+    is_transfer_in = (row_kinds == "Transfer") & (row_offset == 1)
+    is_outflow = is_expense | is_transfer_out
+
+    event_amounts = np.round(rng.lognormal(mean=3.5, sigma=1.0, size=n_events), 2)
+    event_amounts[kinds == "Income"] = np.round(
+        event_amounts[kinds == "Income"] * 8, 2
+    )
+    amounts = event_amounts[event_index]
+    amounts = np.where(is_outflow, -amounts, amounts)
+
+    # Most activity happens on the Main account.
+    weights = np.full(n_accounts, 0.5 / (n_accounts - 1))
+    weights[0] = 0.5
+    event_from = rng.choice(account_ids, size=n_events, p=weights)
+    event_to = (event_from + rng.integers(1, n_accounts, size=n_events) - 1) % n_accounts + 1
+    row_account_ids = np.where(
+        is_transfer_in, event_to[event_index], event_from[event_index]
+    )
+
+    types = np.select(
+        [is_income, is_expense, is_transfer_out],
+        ["Income", "Expense", "Transfer Out"],
+        "Transfer In",
+    ).astype(object)
+    categories = np.select(
+        [is_income, is_expense],
+        [
+            rng.choice(np.array(INCOME_CATEGORIES, dtype=object), size=n_rows),
+            rng.choice(np.array(EXPENSE_CATEGORIES, dtype=object), size=n_rows),
+        ],
+        "Transfer",
+    ).astype(object)
+
+    from_account_ids = pd.array(row_account_ids, dtype="Int64")
+    from_account_ids[~is_outflow] = pd.NA
+    to_account_ids = pd.array(row_account_ids, dtype="Int64")
+    to_account_ids[is_outflow] = pd.NA
+
+    notes = rng.choice(np.array(NOTES, dtype=object), size=n_rows)
+    notes[rng.random(n_rows) > 0.1] = np.nan
+
+    transactions_df = pd.DataFrame(
+        {
+            "Transaction_ID": np.arange(1, n_rows + 1),
+            "Type": types,
+            "Date": event_dates[event_index],
+            "Amount": amounts,
+            "Category": categories,
+            "From_Account_ID": from_account_ids,
+            "From_Account": pd.Series(account_names).reindex(
+                np.asarray(from_account_ids.fillna(0), dtype=int) - 1
+            ).to_numpy(),
+            "To_Account_ID": to_account_ids,
+            "To_Account": pd.Series(account_names).reindex(
+                np.asarray(to_account_ids.fillna(0), dtype=int) - 1
+            ).to_numpy(),
+            "Note": notes,
+        }
+    )
+    transactions_df = transactions_df.iloc[::-1]
+    transactions_df.to_csv(os.path.join(data_dir, "transactions.csv"), index=False)
+
+    balances = (
+        pd.Series(amounts)
+        .groupby(row_account_ids)
+        .sum()
+        .reindex(account_ids, fill_value=0)
+        .round(2)
+    )
+    is_goal = np.arange(n_accounts) >= n_accounts - n_goals
+    accounts_df = pd.DataFrame(
+        {
+            "Account_ID": account_ids,
+            "Name": account_names,
+            "Balance": balances.to_numpy(),
+            "Is_Goal": np.where(is_goal, "Yes", "No"),
+            "Goal_Amount": np.where(
+                is_goal, np.round(np.abs(balances.to_numpy()) * 1.5 + 1000, 2), np.nan
+            ),
+            "Note": np.nan,
+        }
+    )
+    accounts_df.to_csv(os.path.join(data_dir, "accounts.csv"), index=False)
+
+    categories = {
+        "Expense": {"0": "Uncategorized"}
+        | {str(i): name for i, name in enumerate(EXPENSE_CATEGORIES, start=1)},
+        "Income": {"0": "Uncategorized"}
+        | {str(i): name for i, name in enumerate(INCOME_CATEGORIES, start=1)},
+    }
+    with open(os.path.join(data_dir, "categories.json"), "w") as file:
+        json.dump(categories, file, indent=4)
+
+
+def main() -> None:
+    """
+    Generates a ledger from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic ledger.")
+    parser.add_argument("transactions", type=int, help="number of transactions, e.g. 10000, 100000, 1000000 or 5000000")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--accounts", type=int, default=8)
+    parser.add_argument("--goals", type=int, default=3)
+    args = parser.parse_args()
+
+    generate_ledger(
+        args.transactions, args.data_dir, args.seed, args.accounts, args.goals
+    )
+
+
+if __name__ == "__main__":
+    main()
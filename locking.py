@@ -0,0 +1,150 @@
+import functools
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Writers change a shallow copy of the data (see write_locked), which leaves the
+# DataFrames held by readers untouched only with copy-on-write. It is always on
+# from pandas 3 and has to be turned on in earlier versions.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# One lock per data directory, shared by all services of the directory's stores.
+_data_locks = {}
+_data_locks_guard = threading.Lock()
+
+
+class ReadWriteLock:
+    """
+    Lets many threads read at the same time while a writer gets exclusive access.
+    Waiting writers go first, so a steady stream of readers cannot starve them.
+    Both sides are reentrant and the writing thread may also read, but a thread
+    that reads cannot start writing (upgrading would deadlock with another reader).
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an unlocked lock.
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def get_held_reads(self) -> list:
+        """
+        Returns the read acquisitions of the current thread, True for those that count as a reader.
+        """
+        if not hasattr(self._local, "reads"):
+            self._local.reads = []
+        return self._local.reads
+
+    def acquire_read(self) -> None:
+        """
+        Waits until no writer holds or waits for the lock, then registers a reader.
+        """
+        held_reads = self.get_held_reads()
+        with self._condition:
+            if self._writer == threading.get_ident():
+                held_reads.append(False)
+                return
+            if not held_reads:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers += 1
+            held_reads.append(True)
+
+    def release_read(self) -> None:
+        """
+        Unregisters a reader and wakes the waiting writer after the last one.
+        """
+        if self.get_held_reads().pop():
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Waits until no other thread reads or writes, then takes exclusive access.
+        Raises RuntimeError if the current thread holds a read lock.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if any(self.get_held_reads()):
+                raise RuntimeError("a read lock cannot be upgraded to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """
+        Releases one level of exclusive access and wakes the waiting threads after the last one.
+        """
+        with self._condition:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read(self) -> any:
+        """
+        Holds a read lock for the duration of a with block.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> any:
+        """
+        Holds the write lock for the duration of a with block.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def get_data_lock(data_dir: str) -> ReadWriteLock:
+    """
+    Returns the lock shared by all services of a data directory.
+    """
+    key = os.path.abspath(data_dir)
+    with _data_locks_guard:
+        if key not in _data_locks:
+            _data_locks[key] = ReadWriteLock()
+        return _data_locks[key]
+
+
+def write_locked(function: any) -> any:
+    """
+    Decorator for service methods that change data. The method runs under the write
+    lock of the service's data directory, after the service replaced its data with
+    a copy-on-write copy (copy_on_write), so snapshots handed out to readers earlier
+    never change.
+    """
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            self.copy_on_write()
+            return function(self, *args, **kwargs)
+
+    return wrapper
@@ -1,12 +1,29 @@
-from tool_manager import ToolManager
-from rich.console import Console
-from art import text2art
+import os
+import shutil
+import sys
 
 
 def main():
     """
     Acts like an entry point for the entire application.
+    Runs a single non-interactive command when arguments are given.
     """
+    argv = sys.argv[1:]
+    if any(argument.startswith("--profile") for argument in argv) or any(
+        name.startswith("FINANCE_APP_PROFILE") for name in os.environ
+    ):
+        from instrumentation import configure_from_arguments
+
+        argv = configure_from_arguments(argv)
+
+    if argv:
+        from cli import run_command
+
+        sys.exit(run_command(argv))
+
+    from art import text2art
+    from tool_manager import ToolManager
+
     welcome_art = text2art("Welcome", font="small")
     print(welcome_art)
 
@@ -21,14 +38,20 @@ def print_welcome_message_and_instructions() -> None:
     Prints out short welcome message.
     Informs user how to use the app.
     """
-    console = Console()
-    console.rule()
+    print_rule()
     print("This is your personal finance planning and tracking app.")
     print("Navigate the application using integer inputs.")
     print(
         "If you ever need to exit an operation without completing it, press ctrl + d."
     )
-    console.rule()
+    print_rule()
+
+
+def print_rule() -> None:
+    """
+    Prints a horizontal line across the terminal.
+    """
+    print("─" * shutil.get_terminal_size().columns)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,66 @@
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+
+CENTS_PER_UNIT = 100
+
+
+def parse_cents(amount_str: str) -> int:
+    """
+    Parses an amount typed by the user (e.g. "12.5" or "12,50") into whole cents.
+    Raises ValueError for anything that is not a number with up to two decimal places.
+    """
+    try:
+        amount = Decimal(amount_str.strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{amount_str}'")
+    if not amount.is_finite() or amount.as_tuple().exponent < -2:
+        raise ValueError("amount must not have more than two decimal places")
+    return int(amount * CENTS_PER_UNIT)
+
+
+def to_cents(amounts: any) -> any:
+    """
+    Converts decimal amounts (a number or a Series read from a CSV file) to integer cents.
+    Missing values stay missing, so a Series with gaps becomes nullable Int64.
+    """
+    if isinstance(amounts, pd.Series):
+        cents = np.round(pd.to_numeric(amounts, errors="coerce") * CENTS_PER_UNIT)
+        return cents.astype("Int64" if cents.isna().any() else "int64")
+    return int(round(float(amounts) * CENTS_PER_UNIT))
+
+
+def to_units(cents: any) -> any:
+    """
+    Converts integer cents (a number or a Series) to decimal amounts for display and CSV files.
+    """
+    if isinstance(cents, pd.Series):
+        return cents.astype("Float64" if cents.isna().any() else "float64") / CENTS_PER_UNIT
+    return cents / CENTS_PER_UNIT
+
+
+def format_cents(cents: int) -> str:
+    """
+    Formats integer cents as an amount with a thousands separator and two decimals.
+    """
+    sign = "-" if cents < 0 else ""
+    units, remainder = divmod(abs(int(cents)), CENTS_PER_UNIT)
+    return f"{sign}{units:,}.{remainder:02d}"
+
+
+def read_csv_with_amounts(filepath: str, amount_columns: list, **kwargs) -> pd.DataFrame:
+    """
+    Reads a CSV file whose amount columns hold decimal amounts, converting them to cents.
+    """
+    df = pd.read_csv(filepath, **kwargs)
+    for column in amount_columns:
+        df[column] = to_cents(df[column])
+    return df
+
+
+def convert_amounts_to_units(df: pd.DataFrame, amount_columns: list) -> pd.DataFrame:
+    """
+    Returns a copy of the DataFrame with the amount columns in decimal units, as written to CSV files.
+    """
+    return df.assign(**{column: to_units(df[column]) for column in amount_columns})
@@ -1,7 +1,9 @@
 import pandas as pd
-import plotext as plt
 from tabulate import tabulate
 from datetime import datetime, timedelta
+from reports import ReportService
+from budgets import BudgetService
+from money import CENTS_PER_UNIT, format_cents, to_units
 
 
 class OverviewMode:
@@ -10,7 +12,11 @@ class OverviewMode:
     """
 
     def __init__(
-        self, transaction_service: any, category_service: any, account_service: any
+        self,
+        transaction_service: any,
+        category_service: any,
+        account_service: any,
+        budget_service: any = None,
     ) -> None:
         """
         Initializes OverviewMode class.
@@ -18,6 +24,10 @@ class OverviewMode:
         self.transaction_service = transaction_service
         self.category_service = category_service
         self.account_service = account_service
+        self.budget_service = budget_service or BudgetService(transaction_service)
+        self.report_service = ReportService(
+            transaction_service, category_service, account_service
+        )
 
     def display_overview_mode_menu(self) -> None:
         """
@@ -31,7 +41,10 @@ class OverviewMode:
             print("4. Transfers")
             print("5. Categories")
             print("6. Total balance sheet")
-            print("7. Go back to main menu")
+            print("7. Period comparison")
+            print("8. Category matrix")
+            print("9. Budgets vs actual")
+            print("10. Go back to main menu")
 
             choice = input("Enter your choice: ").strip()
 
@@ -48,6 +61,12 @@ class OverviewMode:
             elif choice == "6":
                 self.display_balance_sheet_overview()
             elif choice == "7":
+                self.display_period_comparison()
+            elif choice == "8":
+                self.display_category_matrix()
+            elif choice == "9":
+                self.display_budget_report()
+            elif choice == "10":
                 return
             else:
                 print("\n⚠️  Invalid input. Please enter a valid option.\n")
@@ -61,6 +80,7 @@ class OverviewMode:
         try:
             accounts_df = self.account_service.df.copy()
             accounts_df = accounts_df.drop(columns=["Goal_Amount"])
+            accounts_df["Balance"] = to_units(accounts_df["Balance"])
             accounts_df["Note"] = accounts_df["Note"].fillna("")
             accounts_df.rename(
                 columns={"Is_Goal": "Set as financial goal"}, inplace=True
@@ -106,8 +126,8 @@ class OverviewMode:
         filtered_transactions = self.get_filtered_transactions_by_account(
             account_id, start_date, end_date
         )
-        self.format_transactions(filtered_transactions)
         balance = filtered_transactions["Amount"].sum()
+        self.format_transactions(filtered_transactions)
         self.print_transactions_for_single_account(
             account_name, filtered_transactions, start_date, end_date, balance
         )
@@ -128,6 +148,7 @@ class OverviewMode:
                 self.account_service.df.set_index("Account_ID")["Name"]
             )
 
+            total_income = income_transactions["Amount"].sum()
             self.format_transactions(income_transactions)
 
             if not income_transactions.empty:
@@ -151,8 +172,7 @@ class OverviewMode:
                         showindex="always",
                     )
                 )
-                total_income = income_transactions["Amount"].sum()
-                print(f"\nTotal income for the selected period: {total_income:.2f}")
+                print(f"\nTotal income for the selected period: {format_cents(total_income)}")
                 self.plot_category_distribution(income_transactions)
             else:
                 print("\n⚠️  No income transactions found for the selected period.")
@@ -178,6 +198,7 @@ class OverviewMode:
                 "From_Account_ID"
             ].map(self.account_service.df.set_index("Account_ID")["Name"])
 
+            total_expenses = expense_transactions["Amount"].sum()
             self.format_transactions(expense_transactions)
 
             if not expense_transactions.empty:
@@ -201,8 +222,7 @@ class OverviewMode:
                         showindex="always",
                     )
                 )
-                total_expenses = expense_transactions["Amount"].sum()
-                print(f"\nTotal expenses for the selected period: {total_expenses:.2f}")
+                print(f"\nTotal expenses for the selected period: {format_cents(total_expenses)}")
                 self.plot_category_distribution(expense_transactions)
             else:
                 print("\n⚠️  No expense transactions found for the selected period.")
@@ -222,6 +242,9 @@ class OverviewMode:
             transfer_transactions.reset_index(drop=True, inplace=True)
             transfer_transactions.index += 1
 
+            total_transfers = transfer_transactions[
+                transfer_transactions["Amount"] > 0
+            ]["Amount"].sum()
             self.format_transactions(transfer_transactions)
 
             if not transfer_transactions.empty:
@@ -245,11 +268,8 @@ class OverviewMode:
                         showindex="always",
                     )
                 )
-                total_transfers = transfer_transactions[
-                    transfer_transactions["Amount"] > 0
-                ]["Amount"].sum()
                 print(
-                    f"\nTotal transfers for the selected period: {total_transfers:.2f}"
+                    f"\nTotal transfers for the selected period: {format_cents(total_transfers)}"
                 )
             else:
                 print("\n⚠️  No transfer transactions found for the selected period.")
@@ -290,29 +310,18 @@ class OverviewMode:
         try:
             start_date, end_date = self.select_period()
 
-            income_transactions = self.get_filtered_transactions_by_type(
-                "Income", start_date, end_date
+            balance_sheet = self.report_service.compute_balance_sheet(
+                start_date, end_date
             )
-            expense_transactions = self.get_filtered_transactions_by_type(
-                "Expense", start_date, end_date
-            )
-
-            total_income = income_transactions["Amount"].sum()
-            total_expenses = expense_transactions["Amount"].sum()
-
-            total_balance = total_income + total_expenses
 
             print(
                 f"\nBalance Sheet Overview from {start_date.strftime('%d-%m-%Y')} to {end_date.strftime('%d-%m-%Y')}:"
             )
-            print(f"Total Income: {total_income:.2f}")
-            print(f"Total Expenses: {total_expenses:.2f}")
-            print(f"Total Balance: {total_balance:.2f}")
+            print(f"Total Income: {format_cents(balance_sheet['total_income'])}")
+            print(f"Total Expenses: {format_cents(balance_sheet['total_expenses'])}")
+            print(f"Total Balance: {format_cents(balance_sheet['total_balance'])}")
 
-            all_transactions = pd.concat(
-                [income_transactions, expense_transactions], ignore_index=True
-            )
-            all_transactions.sort_values(by="Date", inplace=True)
+            all_transactions = balance_sheet["transactions"]
             all_transactions.reset_index(drop=True, inplace=True)
             all_transactions.index += 1
 
@@ -336,6 +345,7 @@ class OverviewMode:
                         showindex="always",
                     )
                 )
+                self.print_monthly_breakdown(balance_sheet["monthly"])
             else:
                 print("\n⚠️  No transactions found for the selected period.")
 
@@ -343,6 +353,139 @@ class OverviewMode:
             print("\n\nOperation was cancelled. Returning to previous menu...")
             return
 
+    def display_period_comparison(self) -> None:
+        """
+        Displays income, expenses, balance and percentage change per category
+        across several weeks, months, quarters or years up to today.
+        """
+        try:
+            frequency, period_name = self.select_comparison_frequency()
+            periods = self.get_number_of_periods()
+
+            by_category, totals = self.report_service.compute_period_comparison(
+                frequency, periods, datetime.today().date()
+            )
+
+            if by_category.empty:
+                print("\n⚠️  No transactions found for the selected periods.")
+                return
+
+            print(f"\nComparison of the last {periods} {period_name} periods by category:")
+            print(
+                tabulate(
+                    [
+                        [category, str(period), *self.format_comparison_row(row)]
+                        for (category, period), row in by_category.iterrows()
+                    ],
+                    headers=["Category", "Period", "Income", "Expenses", "Balance", "Change"],
+                    tablefmt="psql",
+                    floatfmt=".2f",
+                )
+            )
+
+            print(f"\nTotals of the last {periods} {period_name} periods:")
+            print(
+                tabulate(
+                    [
+                        [str(period), *self.format_comparison_row(row)]
+                        for period, row in totals.iterrows()
+                    ],
+                    headers=["Period", "Income", "Expenses", "Balance", "Change"],
+                    tablefmt="psql",
+                    floatfmt=".2f",
+                )
+            )
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def display_category_matrix(self) -> None:
+        """
+        Displays category totals per month or per account for a selected period,
+        with row and column totals.
+        """
+        try:
+            start_date, end_date = self.select_period()
+
+            while True:
+                print("\nShow categories against:")
+                print("1. Months")
+                print("2. Accounts")
+
+                choice = input("Enter your choice: ").strip()
+
+                if choice in ["1", "2"]:
+                    break
+                else:
+                    print("\n⚠️  Invalid choice. Please select a valid option.")
+
+            columns = "month" if choice == "1" else "account"
+            pivot_df = self.report_service.compute_category_pivot(
+                start_date, end_date, columns
+            )
+
+            if pivot_df.empty:
+                print("\n⚠️  No transactions found for the selected period.")
+                return
+
+            print(
+                f"\nCategories by {columns} from {start_date.strftime('%d-%m-%Y')} to {end_date.strftime('%d-%m-%Y')}:"
+            )
+            print(
+                tabulate(
+                    [
+                        [transaction_type, category, *(row.values / CENTS_PER_UNIT)]
+                        for (transaction_type, category), row in pivot_df.iterrows()
+                    ],
+                    headers=["Type", "Category", *[str(column) for column in pivot_df.columns]],
+                    tablefmt="psql",
+                    floatfmt=".2f",
+                )
+            )
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def display_budget_report(self) -> None:
+        """
+        Displays every budget next to the spending in its week, month, quarter
+        or year containing the selected date.
+        """
+        try:
+            if self.budget_service.df.empty:
+                print("\nYou have no budgets yet. Set some by going to Settings.")
+                return
+
+            date_input = self.convert_date(
+                input("\nEnter a date within the period to report (dd-mm-yyyy) or press 'enter' for today: ").strip()
+            )
+            try:
+                reference_date = (
+                    datetime.strptime(date_input, "%d-%m-%Y").date()
+                    if date_input
+                    else datetime.today().date()
+                )
+            except ValueError:
+                print("\n⚠️  Invalid date format. Please use dd-mm-yyyy.")
+                return
+
+            report_df = self.budget_service.compute_budget_report(reference_date)
+            report_df[["Limit", "Spent", "Remaining"]] = (
+                report_df[["Limit", "Spent", "Remaining"]] / CENTS_PER_UNIT
+            )
+            print(f"\nBudgets vs actual spending for the periods containing {reference_date.strftime('%d-%m-%Y')}:")
+            print(
+                tabulate(
+                    report_df[["Category", "Period", "Period_Label", "Limit", "Spent", "Remaining", "Used_%"]].values.tolist(),
+                    headers=["Category", "Budget", "Period", "Limit", "Spent", "Remaining", "Used %"],
+                    tablefmt="psql",
+                    floatfmt=",.2f",
+                )
+            )
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
     # Helper methods - most-commonly used:
 
     def select_period(self) -> tuple:
@@ -402,11 +545,88 @@ class OverviewMode:
 
     def format_transactions(self, transactions_df: pd.DataFrame) -> None:
         """
-        Formats the transactions DataFrame by handling empty notes and account cells.
+        Formats the transactions DataFrame by handling empty notes and account cells
+        and converting the amounts from cents.
         """
-        transactions_df["Note"] = transactions_df["Note"].fillna("")
-        transactions_df["From_Account"] = transactions_df["From_Account"].fillna("")
-        transactions_df["To_Account"] = transactions_df["To_Account"].fillna("")
+        transactions_df["Amount"] = to_units(transactions_df["Amount"])
+        for col in ["Note", "From_Account", "To_Account"]:
+            transactions_df[col] = transactions_df[col].astype(object).fillna("")
+
+    # Helper methods - balance-sheet specific:
+
+    def print_monthly_breakdown(self, monthly_df: pd.DataFrame) -> None:
+        """
+        Prints month-by-month income, expense and net totals when the period spans several months.
+        """
+        if len(monthly_df) < 2:
+            return
+
+        print("\nMonth-by-month breakdown:")
+        print(
+            tabulate(
+                [
+                    [str(month), *(row[["Income", "Expense", "Net"]].to_numpy() / CENTS_PER_UNIT)]
+                    for month, row in monthly_df.iterrows()
+                ],
+                headers=["Month", "Income", "Expenses", "Balance"],
+                tablefmt="psql",
+                floatfmt=".2f",
+            )
+        )
+
+    # Helper methods - period-comparison specific:
+
+    def select_comparison_frequency(self) -> tuple:
+        """
+        Allows the user to select the length of the compared periods.
+        """
+        frequencies = {
+            "1": ("W", "weekly"),
+            "2": ("M", "monthly"),
+            "3": ("Q", "quarterly"),
+            "4": ("Y", "yearly"),
+        }
+
+        while True:
+            print("\nSelect the periods to compare:")
+            print("1. Weeks")
+            print("2. Months")
+            print("3. Quarters")
+            print("4. Years")
+
+            choice = input("Enter your choice: ").strip()
+
+            if choice in frequencies:
+                return frequencies[choice]
+            else:
+                print("\n⚠️  Invalid choice. Please select a valid option.")
+
+    def get_number_of_periods(self) -> int:
+        """
+        Gets the number of periods to compare. Defaults to 3 when 'enter' is pressed.
+        """
+        while True:
+            periods = input(
+                "\nEnter the number of periods to compare or press 'enter' for 3: "
+            ).strip()
+            if periods == "":
+                return 3
+            elif periods.isdigit() and int(periods) >= 2:
+                return int(periods)
+            else:
+                print("\n⚠️  Please enter a whole number of at least 2.")
+
+    def format_comparison_row(self, row: pd.Series) -> list:
+        """
+        Formats income, expense, balance and change values of a comparison row.
+        """
+        change = row["Change_%"]
+        return [
+            row["Income"] / CENTS_PER_UNIT,
+            row["Expense"] / CENTS_PER_UNIT,
+            row["Net"] / CENTS_PER_UNIT,
+            "" if pd.isna(change) else f"{change:+.1f}%",
+        ]
 
     # Helper methods - account-overview specific:
 
@@ -424,7 +644,7 @@ class OverviewMode:
         transactions_df: pd.DataFrame,
         start_date: datetime.date,
         end_date: datetime.date,
-        balance: float,
+        balance: int,
     ) -> None:
         """
         Prints the transactions for a specific account and date range.
@@ -444,7 +664,7 @@ class OverviewMode:
                     showindex=False,
                 )
             )
-            print(f"\nAccount balance for the period: {balance:.2f}")
+            print(f"\nAccount balance for the period: {format_cents(balance)}")
         else:
             print("\n⚠️  No transactions found for the selected period.")
 
@@ -488,6 +708,7 @@ class OverviewMode:
         transactions_df.reset_index(drop=True, inplace=True)
         transactions_df.index += 1
 
+        total_amount = transactions_df["Amount"].sum()
         self.format_transactions(transactions_df)
 
         if not transactions_df.empty:
@@ -502,9 +723,8 @@ class OverviewMode:
                     showindex="always",
                 )
             )
-            total_amount = transactions_df["Amount"].sum()
             print(
-                f"\nTotal {category_type.lower()} for the selected period: {total_amount:.2f}"
+                f"\nTotal {category_type.lower()} for the selected period: {format_cents(total_amount)}"
             )
         else:
             print(
@@ -534,18 +754,17 @@ class OverviewMode:
     ) -> pd.DataFrame:
         """
         Filters transactions for a specific account and date range.
+        Only the account's own transactions are copied and parsed.
         """
-        transactions_df = self.transaction_service.df.copy()
+        transactions_df = self.transaction_service.get_account_transactions(
+            account_id
+        ).copy()
         transactions_df["Date"] = pd.to_datetime(
             transactions_df["Date"], format="%d-%m-%Y"
         ).dt.date
 
         return transactions_df[
-            (
-                (transactions_df["From_Account_ID"] == account_id)
-                | (transactions_df["To_Account_ID"] == account_id)
-            )
-            & (transactions_df["Date"] >= start_date)
+            (transactions_df["Date"] >= start_date)
             & (transactions_df["Date"] <= end_date)
         ]
 
@@ -554,15 +773,16 @@ class OverviewMode:
     ) -> pd.DataFrame:
         """
         Filters transactions for a specific category and date range.
+        Only the category's transactions are copied and parsed.
         """
-        transactions_df = self.transaction_service.df.copy()
+        category_mask = self.transaction_service.get_label_mask("Category", category_name)
+        transactions_df = self.transaction_service.df[category_mask.to_numpy()].copy()
         transactions_df["Date"] = pd.to_datetime(
             transactions_df["Date"], format="%d-%m-%Y"
         ).dt.date
 
         return transactions_df[
-            (transactions_df["Category"].str.lower() == category_name.lower())
-            & (transactions_df["Date"] >= start_date)
+            (transactions_df["Date"] >= start_date)
             & (transactions_df["Date"] <= end_date)
         ]
 
@@ -571,15 +791,16 @@ class OverviewMode:
     ) -> pd.DataFrame:
         """
         Filters transactions for a specific transaction type and date range.
+        Only the transactions of that type are copied and parsed.
         """
-        transactions_df = self.transaction_service.df.copy()
+        type_mask = self.transaction_service.get_label_mask("Type", transaction_type)
+        transactions_df = self.transaction_service.df[type_mask.to_numpy()].copy()
         transactions_df["Date"] = pd.to_datetime(
             transactions_df["Date"], format="%d-%m-%Y"
         ).dt.date
 
         return transactions_df[
-            (transactions_df["Type"].str.lower() == transaction_type.lower())
-            & (transactions_df["Date"] >= start_date)
+            (transactions_df["Date"] >= start_date)
             & (transactions_df["Date"] <= end_date)
         ]
 
@@ -589,6 +810,7 @@ class OverviewMode:
         """
         Plots the distribution of transaction categories as a pie chart.
         """
+        import plotext as plt
 
         category_sum = transactions_df.groupby("Category")["Amount"].sum()
         category_sum = category_sum.sort_values()
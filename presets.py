@@ -0,0 +1,367 @@
+import os
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from money import read_csv_with_amounts
+from snapshots import save_csv
+from telemetry import track_operation
+
+PRESETS_FILENAME = "presets.csv"
+
+# Frequency name: (unit, step). Day-based presets repeat every step days,
+# month-based presets every step months on the start date's day of the month
+# (or the last day of shorter months).
+FREQUENCIES = {
+    "daily": ("D", 1),
+    "weekly": ("D", 7),
+    "biweekly": ("D", 14),
+    "monthly": ("M", 1),
+    "quarterly": ("M", 3),
+    "yearly": ("M", 12),
+}
+
+PRESET_TYPES = ["Income", "Expense", "Transfer"]
+
+AMOUNT_COLUMNS = ["Amount"]
+
+
+class Preset:
+    """
+    Represents one recurring transaction.
+    """
+
+    def __init__(
+        self,
+        preset_id: int,
+        name: str,
+        transaction_type: str,
+        amount: int,
+        category_name: str,
+        from_account: str,
+        to_account: str,
+        frequency: str,
+        start_date: str,
+        last_run: str = "",
+        note: str = "",
+    ) -> None:
+        """
+        Initializes a new preset.
+        """
+        self.preset_id = preset_id
+        self.name = name
+        self.transaction_type = transaction_type
+        self.amount = amount
+        self.category_name = category_name
+        self.from_account = from_account
+        self.to_account = to_account
+        self.frequency = frequency
+        self.start_date = start_date
+        self.last_run = last_run
+        self.note = note
+
+    def convert_to_dict(self) -> dict:
+        """
+        Converts the preset instance to a dictionary suitable for DataFrame.
+        """
+        return {
+            "Preset_ID": self.preset_id,
+            "Name": self.name,
+            "Type": self.transaction_type,
+            "Amount": self.amount,
+            "Category": self.category_name,
+            "From_Account": self.from_account,
+            "To_Account": self.to_account,
+            "Frequency": self.frequency,
+            "Start_Date": self.start_date,
+            "Last_Run": self.last_run,
+            "Note": self.note,
+        }
+
+
+class PresetService:
+    """
+    Manages recurring transaction presets in a CSV file and adds their due occurrences to the ledger.
+    """
+
+    def __init__(self, transaction_service: any, account_service: any) -> None:
+        """
+        Initializes the class with the path to the CSV file next to the ledger and the service instances.
+        The file is loaded on first access to the presets.
+        """
+        self.filepath = os.path.join(os.path.dirname(transaction_service.filepath), PRESETS_FILENAME)
+        self.transaction_service = transaction_service
+        self.account_service = account_service
+        self.columns = [
+            "Preset_ID",
+            "Name",
+            "Type",
+            "Amount",
+            "Category",
+            "From_Account",
+            "To_Account",
+            "Frequency",
+            "Start_Date",
+            "Last_Run",
+            "Note",
+        ]
+        self._df = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Returns the presets DataFrame, loading the CSV file on first access.
+        """
+        if self._df is None:
+            self.load_or_initialize_presets_file()
+        return self._df
+
+    @df.setter
+    def df(self, presets_df: pd.DataFrame) -> None:
+        """
+        Replaces the presets DataFrame.
+        """
+        self._df = presets_df
+
+    def load_or_initialize_presets_file(self) -> None:
+        """
+        Loads the presets CSV file or creates a new one if it doesn't exist.
+        """
+        try:
+            self.df = read_csv_with_amounts(
+                self.filepath, AMOUNT_COLUMNS, dtype={"Last_Run": str, "Note": str}
+            )
+        except FileNotFoundError:
+            self.df = pd.DataFrame(columns=self.columns)
+            self.save_presets_to_file()
+
+    def save_presets_to_file(self) -> None:
+        """
+        Saves the DataFrame of presets to the CSV file, with the amounts in decimal units.
+        """
+        save_csv(self.filepath, self.df, AMOUNT_COLUMNS)
+
+    def get_new_preset_id(self) -> int:
+        """
+        Generates a new preset ID.
+        """
+        if self.df.empty:
+            return 1
+        else:
+            return int(self.df["Preset_ID"].max()) + 1
+
+    def add_preset(
+        self,
+        name: str,
+        transaction_type: str,
+        amount: int,
+        frequency: str,
+        start_date: str,
+        category_name: str = "Uncategorized",
+        from_account: str = "",
+        to_account: str = "",
+        note: str = "",
+    ) -> Preset:
+        """
+        Adds a new preset with an amount in cents. Its first occurrence is on the start date.
+        """
+        preset = Preset(
+            preset_id=self.get_new_preset_id(),
+            name=name,
+            transaction_type=transaction_type,
+            amount=amount,
+            category_name=category_name or "Uncategorized",
+            from_account=from_account,
+            to_account=to_account,
+            frequency=frequency,
+            start_date=start_date,
+            note=note,
+        )
+        self.df = pd.concat(
+            [self.df, pd.DataFrame([preset.convert_to_dict()])], ignore_index=True
+        )
+        self.save_presets_to_file()
+        return preset
+
+    def delete_preset(self, preset_id: int) -> None:
+        """
+        Deletes a preset. Transactions it already added stay in the ledger.
+        """
+        self.df = self.df[self.df["Preset_ID"] != preset_id].reset_index(drop=True)
+        self.save_presets_to_file()
+
+    def rename_category(self, category_type: str, old_category_name: str, new_category_name: str) -> None:
+        """
+        Moves the presets of a renamed income or expense category to its new name.
+        """
+        renamed = (self.df["Type"] == category_type) & (self.df["Category"] == old_category_name)
+        if renamed.any():
+            self.df.loc[renamed, "Category"] = new_category_name
+            self.save_presets_to_file()
+
+    def uncategorize_presets(self, category_type: str, category_name: str) -> list:
+        """
+        Files the presets of a deleted category under 'Uncategorized', like its transactions.
+        Returns the IDs of the changed presets.
+        """
+        changed = (self.df["Type"] == category_type) & (self.df["Category"] == category_name)
+        preset_ids = self.df.loc[changed, "Preset_ID"].astype(int).tolist()
+        self.relabel_presets(preset_ids, "Uncategorized")
+        return preset_ids
+
+    def relabel_presets(self, preset_ids: list, category_name: str) -> None:
+        """
+        Sets the category of the presets with the given IDs, e.g. when a deletion is undone.
+        """
+        if preset_ids:
+            self.df.loc[self.df["Preset_ID"].isin(preset_ids), "Category"] = category_name
+            self.save_presets_to_file()
+
+    def rename_account(self, old_account_name: str, new_account_name: str) -> None:
+        """
+        Points the presets moving money from or to a renamed account at its new name.
+        """
+        renamed = False
+        for column in ["From_Account", "To_Account"]:
+            matches = self.df[column] == old_account_name
+            if matches.any():
+                self.df.loc[matches, column] = new_account_name
+                renamed = True
+        if renamed:
+            self.save_presets_to_file()
+
+    def get_due_occurrences(self, as_of: date) -> pd.DataFrame:
+        """
+        Returns one row per due occurrence: the preset's row position and the occurrence date.
+        An occurrence is due when it falls after the preset's last run (or on/after its
+        start date) and on or before as_of. The dates of all presets are generated at once.
+        """
+        presets_df = self.df
+        as_of = np.datetime64(pd.Timestamp(as_of).date(), "D")
+        start = pd.to_datetime(presets_df["Start_Date"], format="%d-%m-%Y").to_numpy().astype("datetime64[D]")
+        last_run = pd.to_datetime(presets_df["Last_Run"], format="%d-%m-%Y", errors="coerce").to_numpy().astype("datetime64[D]")
+        # Occurrences are due strictly after this date.
+        after = np.where(np.isnat(last_run), start - 1, last_run)
+
+        frequencies = presets_df["Frequency"].str.lower()
+        is_monthly = (
+            frequencies.map({name: unit for name, (unit, _) in FREQUENCIES.items()}) == "M"
+        ).to_numpy()
+        steps = frequencies.map(
+            {name: step for name, (_, step) in FREQUENCIES.items()}
+        ).to_numpy(dtype=np.int64)
+
+        start_month = start.astype("datetime64[M]")
+        # Occurrence numbers around the due range; the exact dates are filtered below.
+        day_first = (after - start).astype(np.int64) // steps + 1
+        day_last = (as_of - start).astype(np.int64) // steps
+        month_first = (after.astype("datetime64[M]") - start_month).astype(np.int64) // steps
+        month_last = (as_of.astype("datetime64[M]") - start_month).astype(np.int64) // steps
+        first = np.maximum(np.where(is_monthly, month_first, day_first), 0)
+        last = np.where(is_monthly, month_last, day_last)
+
+        counts = np.clip(last - first + 1, 0, None)
+        positions = np.repeat(np.arange(len(presets_df)), counts)
+        occurrence = (
+            np.arange(counts.sum())
+            - np.repeat(np.cumsum(counts) - counts, counts)
+            + np.repeat(first, counts)
+        )
+        step = steps[positions] * occurrence
+
+        day_dates = start[positions] + step
+        months = start_month[positions] + step
+        days_in_month = (
+            (months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")
+        ).astype(np.int64)
+        start_day = (start - start_month.astype("datetime64[D]")).astype(np.int64)[positions]
+        month_dates = months.astype("datetime64[D]") + np.minimum(start_day, days_in_month - 1)
+        dates = np.where(is_monthly[positions], month_dates, day_dates)
+
+        is_due = (dates > after[positions]) & (dates <= as_of)
+        return pd.DataFrame({"Position": positions[is_due], "Date": dates[is_due]})
+
+    def build_preset_transactions(self, occurrences_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Expands the due occurrences into ledger rows; transfers become an out/in pair.
+        """
+        rows_df = self.df.iloc[occurrences_df["Position"]].reset_index(drop=True)
+        rows_df["Date"] = pd.Series(occurrences_df["Date"].to_numpy()).dt.strftime("%d-%m-%Y")
+        rows_df["Amount"] = rows_df["Amount"].astype("int64")
+        rows_df["Note"] = rows_df["Note"].where(rows_df["Note"].fillna("") != "", rows_df["Name"])
+
+        account_ids = dict(zip(self.account_service.df["Name"], self.account_service.df["Account_ID"]))
+        is_income = rows_df["Type"] == "Income"
+        is_expense = rows_df["Type"] == "Expense"
+        is_transfer = rows_df["Type"] == "Transfer"
+
+        outflows = rows_df[is_expense | is_transfer].assign(
+            Type=np.where(rows_df.loc[is_expense | is_transfer, "Type"] == "Transfer", "Transfer Out", "Expense"),
+            Amount=-rows_df.loc[is_expense | is_transfer, "Amount"],
+            To_Account=None,
+        )
+        inflows = rows_df[is_income | is_transfer].assign(
+            Type=np.where(rows_df.loc[is_income | is_transfer, "Type"] == "Transfer", "Transfer In", "Income"),
+            From_Account=None,
+        )
+        for flows in (outflows, inflows):
+            flows.loc[flows["Type"].str.startswith("Transfer"), "Category"] = "Transfer"
+
+        transactions_df = pd.concat([outflows, inflows]).sort_index(kind="stable")
+        transactions_df["From_Account_ID"] = transactions_df["From_Account"].map(account_ids)
+        transactions_df["To_Account_ID"] = transactions_df["To_Account"].map(account_ids)
+        return transactions_df.reset_index(drop=True)
+
+    def find_missing_accounts(self) -> pd.Series:
+        """
+        Returns, for every preset, the name of its source or destination account
+        that no longer exists, or a missing value if both exist.
+        """
+        account_names = self.account_service.df["Name"]
+        presets_df = self.df
+        from_missing = (presets_df["Type"] != "Income") & ~presets_df["From_Account"].isin(account_names)
+        to_missing = (presets_df["Type"] != "Expense") & ~presets_df["To_Account"].isin(account_names)
+        return (
+            presets_df["From_Account"].where(from_missing)
+            .fillna(presets_df["To_Account"].where(to_missing))
+            .where(from_missing | to_missing)
+        )
+
+    @track_operation
+    def materialize_due_presets(self, as_of: date = None) -> int:
+        """
+        Adds every occurrence due since the last run to the ledger with one batched insert
+        and one balance update per account, then records the run date.
+        Presets whose accounts no longer exist are skipped and keep their last run,
+        so their occurrences are added once the account exists again.
+        Returns the number of added occurrences.
+        """
+        as_of = as_of or date.today()
+        if self.df.empty:
+            return 0
+
+        occurrences_df = self.get_due_occurrences(as_of)
+        missing_accounts = self.find_missing_accounts()
+        is_missing = missing_accounts.notna()
+        is_skipped = is_missing.to_numpy()[occurrences_df["Position"].to_numpy()]
+        for position in occurrences_df.loc[is_skipped, "Position"].unique():
+            print(
+                f"\n⚠️  The '{self.df['Name'].iloc[position]}' preset was skipped: its account "
+                f"'{missing_accounts.iloc[position]}' does not exist. Its occurrences will be added "
+                "once an account with that name exists again, or delete the preset."
+            )
+        transactions_df = self.build_preset_transactions(occurrences_df[~is_skipped])
+        if not transactions_df.empty:
+            account_names = transactions_df["From_Account"].fillna(transactions_df["To_Account"])
+            with self.transaction_service.lock.write():
+                self.transaction_service.add_transactions(transactions_df)
+                self.account_service.update_account_balances(
+                    transactions_df.groupby(account_names)["Amount"].sum().to_dict()
+                )
+
+        # A run for an earlier date never moves the last run back.
+        last_run = pd.to_datetime(self.df["Last_Run"], format="%d-%m-%Y", errors="coerce")
+        last_run = last_run.where(last_run > pd.Timestamp(as_of), pd.Timestamp(as_of))
+        self.df.loc[~is_missing, "Last_Run"] = last_run[~is_missing].dt.strftime("%d-%m-%Y")
+        self.save_presets_to_file()
+        return int((transactions_df["Type"] != "Transfer In").sum())
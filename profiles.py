@@ -0,0 +1,222 @@
+import os
+import re
+from collections import OrderedDict
+from functools import cached_property
+
+DATA_DIR = "data"
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+DEFAULT_PROFILE = "default"
+
+# Profiles kept loaded at once; the least recently used one is dropped beyond this.
+MAX_LOADED_PROFILES = 3
+
+
+def get_profile_dir(name: str) -> str:
+    """
+    Returns the data directory of a profile. The default profile uses data/ itself,
+    the others a folder under data/profiles/.
+    Raises ValueError for a name that cannot be a folder name.
+    """
+    if name == DEFAULT_PROFILE:
+        return DATA_DIR
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+        raise ValueError("a profile name may only contain letters, digits, '-' and '_'")
+    return os.path.join(PROFILES_DIR, name)
+
+
+def list_profiles() -> list:
+    """
+    Returns the names of the existing profiles, the default one first.
+    """
+    if not os.path.isdir(PROFILES_DIR):
+        return [DEFAULT_PROFILE]
+    return [
+        DEFAULT_PROFILE,
+        *sorted(
+            name
+            for name in os.listdir(PROFILES_DIR)
+            if os.path.isdir(os.path.join(PROFILES_DIR, name))
+        ),
+    ]
+
+
+class Profile:
+    """
+    Holds the services and modes of one ledger profile, all reading and writing
+    the files of the profile's data directory. They are created on first use.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes the profile, creating its data directory if it is new.
+        """
+        self.name = name
+        self.data_dir = get_profile_dir(name)
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    @cached_property
+    def transaction_service(self) -> any:
+        """
+        Creates the transaction service on first use.
+        """
+        from transactions import TransactionService
+
+        return TransactionService(self.data_dir)
+
+    @cached_property
+    def category_service(self) -> any:
+        """
+        Creates the category service on first use.
+        """
+        from categories import CategoryService
+
+        return CategoryService(self.data_dir)
+
+    @cached_property
+    def account_service(self) -> any:
+        """
+        Creates the account service on first use.
+        """
+        from accounts import AccountService
+
+        return AccountService(self.data_dir)
+
+    @cached_property
+    def budget_service(self) -> any:
+        """
+        Creates the budget service on first use. It is shared by the modes so they see the same limits.
+        """
+        from budgets import BudgetService
+
+        return BudgetService(self.transaction_service)
+
+    @cached_property
+    def allocation_service(self) -> any:
+        """
+        Creates the income allocation service on first use. It is shared by the modes so they see the same rules.
+        """
+        from allocations import AllocationService
+
+        return AllocationService(self.transaction_service, self.account_service)
+
+    @cached_property
+    def preset_service(self) -> any:
+        """
+        Creates the recurring transactions service on first use. It is shared by the modes so a rollback resets it for all of them.
+        """
+        from presets import PresetService
+
+        return PresetService(self.transaction_service, self.account_service)
+
+    @cached_property
+    def journal(self) -> any:
+        """
+        Creates the undo/redo journal on first use. It is shared by the modes so undo reverts the latest change of any of them.
+        """
+        from journal import Journal
+
+        return Journal(
+            self.transaction_service,
+            self.account_service,
+            self.category_service,
+            self.budget_service,
+            self.allocation_service,
+            self.preset_service,
+        )
+
+    @cached_property
+    def transactions_mode(self) -> any:
+        """
+        Creates the transactions mode on first use.
+        """
+        from transactions_mode import TransactionsMode
+
+        return TransactionsMode(
+            self.transaction_service,
+            self.category_service,
+            self.account_service,
+            self.budget_service,
+            self.journal,
+            self.allocation_service,
+            self.preset_service,
+        )
+
+    @cached_property
+    def overview_mode(self) -> any:
+        """
+        Creates the overview mode on first use.
+        """
+        from overview_mode import OverviewMode
+
+        return OverviewMode(
+            self.transaction_service, self.category_service, self.account_service, self.budget_service
+        )
+
+    @cached_property
+    def settings_mode(self) -> any:
+        """
+        Creates the settings mode on first use.
+        """
+        from settings_mode import SettingsMode
+
+        return SettingsMode(
+            self.transaction_service,
+            self.category_service,
+            self.account_service,
+            self.budget_service,
+            self.journal,
+            self.allocation_service,
+            self.preset_service,
+        )
+
+    @cached_property
+    def financial_goals_mode(self) -> any:
+        """
+        Creates the financial goals mode on first use.
+        """
+        from financials_goals_mode import FinancialGoalsMode
+
+        return FinancialGoalsMode(self.transaction_service, self.category_service, self.account_service)
+
+    @cached_property
+    def statistics_mode(self) -> any:
+        """
+        Creates the statistics mode on first use.
+        """
+        from statistics_mode import StatisticsMode
+
+        return StatisticsMode(self.transaction_service, self.category_service, self.account_service)
+
+
+class ProfileCache:
+    """
+    Keeps the most recently used profiles loaded, so switching back to one of them
+    reuses its services and loaded data. Beyond the limit the least recently used
+    profile is dropped, and reloads from its snapshots when it is used again.
+    """
+
+    def __init__(self, max_profiles: int = MAX_LOADED_PROFILES) -> None:
+        """
+        Initializes the cache with the number of profiles to keep loaded.
+        """
+        self.max_profiles = max_profiles
+        self.profiles = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of loaded profiles.
+        """
+        return len(self.profiles)
+
+    def get(self, name: str) -> Profile:
+        """
+        Returns the profile with the given name, loading it if it is not in the cache.
+        """
+        if name in self.profiles:
+            self.profiles.move_to_end(name)
+            return self.profiles[name]
+        profile = Profile(name)
+        self.profiles[name] = profile
+        while len(self.profiles) > self.max_profiles:
+            self.profiles.popitem(last=False)
+        return profile
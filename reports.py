@@ -0,0 +1,179 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from datetime import date
+from telemetry import track_operation
+
+# Number of category pivots kept for the current ledger version.
+MAX_CACHED_PIVOTS = 16
+
+
+class ReportService:
+    """
+    Computes period-based reports over the transactions ledger.
+    Amounts in the results are in cents, like in the ledger.
+    """
+
+    def __init__(
+        self, transaction_service: any, category_service: any, account_service: any
+    ) -> None:
+        """
+        Initializes the class with service instances.
+        """
+        self.transaction_service = transaction_service
+        self.category_service = category_service
+        self.account_service = account_service
+        self._pivot_cache = OrderedDict()
+        self._pivot_cache_lock = threading.Lock()
+
+    def get_transactions_in_period(
+        self, start_date: date, end_date: date
+    ) -> pd.DataFrame:
+        """
+        Returns the transactions within the date range with an extra parsed "Date_Parsed" column.
+        Dates are parsed once per ledger version and sliced with a single mask.
+        """
+        _, transactions_df, dates = self.transaction_service.snapshot()
+        in_period = (dates >= pd.Timestamp(start_date)) & (
+            dates <= pd.Timestamp(end_date)
+        )
+        period_df = transactions_df[in_period.values].copy()
+        period_df["Date_Parsed"] = dates[in_period.values].values
+        return period_df
+
+    @track_operation
+    def compute_balance_sheet(self, start_date: date, end_date: date) -> dict:
+        """
+        Computes income, expense and net totals for the period together with the row listing.
+        Monthly totals come from the same grouped aggregation as the period totals.
+        """
+        period_df = self.get_transactions_in_period(start_date, end_date)
+        rows = period_df[period_df["Type"].isin(["Income", "Expense"])]
+        rows = rows.sort_values(by="Date_Parsed", kind="mergesort")
+
+        monthly = (
+            rows.groupby([rows["Date_Parsed"].dt.to_period("M"), "Type"])["Amount"]
+            .sum()
+            .unstack("Type")
+            .reindex(columns=["Income", "Expense"])
+            .fillna(0)
+        )
+        monthly.index.name = "Month"
+        monthly["Net"] = monthly["Income"] + monthly["Expense"]
+
+        total_income = monthly["Income"].sum()
+        total_expenses = monthly["Expense"].sum()
+
+        return {
+            "transactions": rows.drop(columns=["Date_Parsed"]),
+            "monthly": monthly,
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "total_balance": total_income + total_expenses,
+        }
+
+    @track_operation
+    def compute_period_comparison(
+        self, frequency: str, periods: int, end_date: date
+    ) -> tuple:
+        """
+        Compares income, expense and net totals per category across the last N periods.
+        The frequency is "W", "M", "Q" or "Y". Returns the per-category and total DataFrames.
+        Category changes compare the size of the category's amount, total changes the net balance.
+        """
+        period_range = pd.period_range(
+            end=pd.Period(end_date, freq=frequency), periods=periods
+        )
+        period_df = self.get_transactions_in_period(
+            period_range[0].start_time.date(), end_date
+        )
+        period_df = period_df[period_df["Type"].isin(["Income", "Expense"])]
+
+        grouped = (
+            period_df.groupby(
+                [
+                    "Category",
+                    period_df["Date_Parsed"].dt.to_period(frequency).rename("Period"),
+                    "Type",
+                ]
+            )["Amount"]
+            .sum()
+            .unstack("Type")
+            .reindex(columns=["Income", "Expense"])
+        )
+
+        categories = grouped.index.get_level_values("Category").unique()
+        full_index = pd.MultiIndex.from_product(
+            [categories, period_range], names=["Category", "Period"]
+        )
+        by_category = grouped.reindex(full_index).fillna(0)
+        by_category["Net"] = by_category["Income"] + by_category["Expense"]
+        category_amounts = by_category["Net"].abs()
+        by_category["Change_%"] = self.calculate_percent_change(
+            category_amounts,
+            category_amounts.groupby(level="Category").shift(1),
+        )
+
+        totals = by_category.groupby(level="Period")[["Income", "Expense", "Net"]].sum()
+        totals = totals.reindex(period_range).fillna(0)
+        totals["Change_%"] = self.calculate_percent_change(
+            totals["Net"], totals["Net"].shift(1)
+        )
+
+        return by_category, totals
+
+    @track_operation
+    def compute_category_pivot(
+        self, start_date: date, end_date: date, columns: str = "month"
+    ) -> pd.DataFrame:
+        """
+        Builds a category-by-month or category-by-account matrix of amounts with row and column totals.
+        The most recently used results are cached until the transactions change;
+        callers get a copy, so changing it leaves the cached one intact.
+        """
+        version = self.transaction_service.version
+        cache_key = (version, start_date, end_date, columns)
+        with self._pivot_cache_lock:
+            if self._pivot_cache and next(iter(self._pivot_cache))[0] != version:
+                self._pivot_cache.clear()
+            pivot_df = self._pivot_cache.get(cache_key)
+            if pivot_df is not None:
+                self._pivot_cache.move_to_end(cache_key)
+
+        if pivot_df is None:
+            period_df = self.get_transactions_in_period(start_date, end_date)
+            period_df = period_df[period_df["Type"].isin(["Income", "Expense"])]
+
+            if columns == "account":
+                column_values = period_df["From_Account"].fillna(
+                    period_df["To_Account"]
+                )
+            else:
+                column_values = period_df["Date_Parsed"].dt.to_period("M")
+
+            pivot_df = pd.pivot_table(
+                period_df.assign(Column=column_values),
+                index=["Type", "Category"],
+                columns="Column",
+                values="Amount",
+                aggfunc="sum",
+                fill_value=0,
+                margins=True,
+                margins_name="Total",
+            )
+            with self._pivot_cache_lock:
+                self._pivot_cache[cache_key] = pivot_df
+                while len(self._pivot_cache) > MAX_CACHED_PIVOTS:
+                    self._pivot_cache.popitem(last=False)
+        return pivot_df.copy()
+
+    def calculate_percent_change(
+        self, current: pd.Series, previous: pd.Series
+    ) -> pd.Series:
+        """
+        Calculates the percentage change against the previous period.
+        Changes from a zero or missing amount are left empty.
+        """
+        change = (current - previous) / previous.abs() * 100
+        return change.where(previous.fillna(0) != 0)
@@ -0,0 +1,154 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from ledger_generator import generate_ledger
+
+
+class SessionReplay:
+    """
+    Replays a recorded script of menu choices against the interactive application
+    and records the wall time of every prompt-to-prompt step.
+    """
+
+    def __init__(self, answers: list) -> None:
+        """
+        Initializes the replay with the answers to feed to the prompts.
+        """
+        self.answers = answers
+        self.steps = []
+        self.output = io.StringIO()
+        self._next_answer = 0
+        self._step_started = None
+        self._last_prompt = None
+
+    def scripted_input(self, prompt: str = "") -> str:
+        """
+        Replaces input(): closes the timing of the previous step and returns the next answer.
+        Raises EOFError when the script is exhausted, like ctrl + d would.
+        """
+        now = time.perf_counter()
+        self.output.write(prompt)
+        if self._step_started is not None:
+            self.record_step(now)
+
+        if self._next_answer >= len(self.answers):
+            raise EOFError
+        answer = self.answers[self._next_answer]
+        self._next_answer += 1
+        self.output.write(answer + "\n")
+
+        self._last_prompt = prompt.strip()
+        self._step_started = time.perf_counter()
+        return answer
+
+    def record_step(self, end: float) -> None:
+        """
+        Records the time between answering a prompt and the next prompt (or the end of the session).
+        """
+        self.steps.append(
+            {
+                "step": len(self.steps) + 1,
+                "prompt": self._last_prompt,
+                "answer": self.answers[self._next_answer - 1],
+                "seconds": end - self._step_started,
+            }
+        )
+        self._step_started = None
+
+    def run(self, data_dir: str) -> dict:
+        """
+        Runs the main menu loop in a working directory whose data/ folder is a copy of data_dir.
+        """
+        from tool_manager import ToolManager
+
+        original_directory = os.getcwd()
+        original_input = builtins.input
+
+        with tempfile.TemporaryDirectory() as directory:
+            shutil.copytree(data_dir, os.path.join(directory, "data"))
+            os.chdir(directory)
+            builtins.input = self.scripted_input
+            session_start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(self.output):
+                    ToolManager().handle_navigation_of_main_menu()
+            except EOFError:
+                pass
+            finally:
+                session_end = time.perf_counter()
+                if self._step_started is not None:
+                    self.record_step(session_end)
+                builtins.input = original_input
+                os.chdir(original_directory)
+
+        return {
+            "answers_used": self._next_answer,
+            "answers_total": len(self.answers),
+            "total_seconds": session_end - session_start,
+            "steps": self.steps,
+        }
+
+
+def load_script(filepath: str) -> list:
+    """
+    Loads the answers of a session script.
+    JSON files hold a list of answers, other files one answer per line ('#' starts a comment line).
+    """
+    with open(filepath) as file:
+        if filepath.endswith(".json"):
+            return [str(answer) for answer in json.load(file)]
+        return [
+            line.rstrip("\n")
+            for line in file
+            if not line.startswith("#")
+        ]
+
+
+def main() -> None:
+    """
+    Replays a session script from the command line and writes the step timings as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay a scripted session of the interactive menus and time each step."
+    )
+    parser.add_argument("script", help="answers file (.json list or one answer per line)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--data-dir", default="data", help="data directory to copy for the session")
+    source.add_argument("--generate", type=int, help="generate a ledger of this many transactions instead")
+    parser.add_argument("--output", default="session_results.json")
+    parser.add_argument("--transcript", help="file to write the captured session output to")
+    args = parser.parse_args()
+
+    answers = load_script(args.script)
+
+    with tempfile.TemporaryDirectory() as generated_directory:
+        data_dir = args.data_dir
+        if args.generate is not None:
+            data_dir = os.path.join(generated_directory, "data")
+            generate_ledger(args.generate, data_dir)
+
+        replay = SessionReplay(answers)
+        results = replay.run(data_dir)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    if args.transcript:
+        with open(args.transcript, "w") as file:
+            file.write(replay.output.getvalue())
+
+    slowest = sorted(results["steps"], key=lambda step: step["seconds"], reverse=True)[:5]
+    print(f"Replayed {results['answers_used']} of {results['answers_total']} answers in {results['total_seconds']:.3f}s.")
+    for step in slowest:
+        print(f"  step {step['step']:>3}: {step['seconds']:.3f}s after answering '{step['answer']}' to '{step['prompt']}'")
+    print(f"Results were written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
+import os
 from tabulate import tabulate
 from datetime import datetime
+from budgets import BUDGET_PERIODS, BudgetService
+from allocations import ALLOCATION_KINDS, AllocationService
+from checkpoints import CheckpointService
+from presets import PresetService
+from transactions import OPENING_BALANCE
+from journal import Journal
+from money import format_cents, parse_cents, to_units
 
 
 class SettingsMode:
@@ -8,7 +16,14 @@ class SettingsMode:
     """
 
     def __init__(
-        self, transaction_service: any, category_service: any, account_service: any
+        self,
+        transaction_service: any,
+        category_service: any,
+        account_service: any,
+        budget_service: any = None,
+        journal: any = None,
+        allocation_service: any = None,
+        preset_service: any = None,
     ) -> None:
         """
         Initializes SettingsMode class.
@@ -16,6 +31,18 @@ class SettingsMode:
         self.category_service = category_service
         self.account_service = account_service
         self.transaction_service = transaction_service 
+        self.budget_service = budget_service or BudgetService(transaction_service)
+        self.allocation_service = allocation_service or AllocationService(transaction_service, account_service)
+        self.preset_service = preset_service or PresetService(transaction_service, account_service)
+        self.journal = journal or Journal(
+            transaction_service,
+            account_service,
+            category_service,
+            self.budget_service,
+            self.allocation_service,
+            self.preset_service,
+        )
+        self.checkpoint_service = CheckpointService(os.path.dirname(transaction_service.filepath))
 
     def display_settings_mode_menu(self) -> None:
         """
@@ -27,7 +54,10 @@ class SettingsMode:
             print("1. Manage categories")
             print("2. Manage accounts")
             print("3. Manage financial goals")
-            print("4. Go back to main menu")
+            print("4. Manage budgets")
+            print("5. Manage income allocation")
+            print("6. Manage checkpoints")
+            print("7. Go back to main menu")
 
             choice = input("Enter your choice: ").strip()
 
@@ -38,6 +68,12 @@ class SettingsMode:
             elif choice == "3":
                 self.manage_financial_goals()
             elif choice == "4":
+                self.manage_budgets()
+            elif choice == "5":
+                self.manage_allocations()
+            elif choice == "6":
+                self.manage_checkpoints()
+            elif choice == "7":
                 return
             else:
                 print("\n⚠️  Invalid input. Please enter a valid option.")
@@ -156,6 +192,281 @@ class SettingsMode:
             print("\n\nOperation was cancelled. Returning to previous menu...")
             return
 
+    def manage_budgets(self) -> None:
+        """
+        Allows user to set or delete spending limits of expense categories.
+        """
+        try:
+            while True:
+                self.display_budgets()
+                print("\nBudgets - choose what to do:")
+                print("1. Set a budget")
+                print("2. Delete a budget")
+                print("3. Go back")
+
+                choice = input("Enter your choice: ").strip()
+
+                if choice == "1":
+                    self.set_budget()
+                elif choice == "2":
+                    self.delete_budget()
+                elif choice == "3":
+                    return
+                else:
+                    print("\n⚠️  Invalid input. Please enter a valid option.\n")
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def display_budgets(self) -> None:
+        """
+        Displays the budgets in a tabulated format.
+        """
+        budgets_df = self.budget_service.df
+        if budgets_df.empty:
+            print("\nYou have no budgets yet.")
+            return
+
+        print("\nCurrent budgets:")
+        budgets_df = budgets_df.assign(Limit=to_units(budgets_df["Limit"]))
+        print(tabulate(budgets_df[["Budget_ID", "Category", "Period", "Limit"]].values.tolist(), headers=["ID", "Category", "Period", "Limit"], tablefmt="grid", floatfmt=",.2f"))
+
+    def set_budget(self) -> None:
+        """
+        Sets the spending limit of an expense category for a period.
+        """
+        self.display_categories("Expense")
+        categories = self.category_service.categories["Expense"]
+        category_id = input("\nEnter the ID of the expense category: ").strip()
+        if category_id not in categories:
+            print(f"\n⚠️  Category ID '{category_id}' does not exist within Expense categories.")
+            return
+        category_name = categories[category_id]
+
+        periods = list(BUDGET_PERIODS)
+        print("\nChoose the budget period:")
+        for number, period in enumerate(periods, start=1):
+            print(f"{number}. {period.capitalize()}")
+        choice = input("Enter your choice: ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(periods):
+            print("\n⚠️  Invalid input. Please enter a valid option.")
+            return
+        period = periods[int(choice) - 1]
+
+        limit = self.get_amount("\nEnter the spending limit: ")
+        self.budget_service.set_budget(category_name, period, limit)
+        print(f"\n✔️  The {period} budget of '{category_name}' was set to {format_cents(limit)}.")
+
+    def delete_budget(self) -> None:
+        """
+        Deletes a budget chosen by ID.
+        """
+        budget_id = input("\nEnter the ID of the budget to delete: ").strip()
+        if budget_id.isdigit() and self.budget_service.df["Budget_ID"].eq(int(budget_id)).any():
+            self.budget_service.delete_budget(int(budget_id))
+            print(f"\n✔️  Budget ID {budget_id} has been deleted.")
+        else:
+            print(f"\n⚠️  Budget ID '{budget_id}' does not exist.")
+
+    def manage_allocations(self) -> None:
+        """
+        Allows user to add or delete the rules that split an income category between accounts.
+        """
+        try:
+            while True:
+                self.display_allocation_rules()
+                print("\nIncome allocation - choose what to do:")
+                print("1. Add a rule")
+                print("2. Delete a rule")
+                print("3. Go back")
+
+                choice = input("Enter your choice: ").strip()
+
+                if choice == "1":
+                    self.add_allocation_rule()
+                elif choice == "2":
+                    self.delete_allocation_rule()
+                elif choice == "3":
+                    return
+                else:
+                    print("\n⚠️  Invalid input. Please enter a valid option.\n")
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def display_allocation_rules(self) -> None:
+        """
+        Displays the income allocation rules in a tabulated format.
+        """
+        rules_df = self.allocation_service.df
+        if rules_df.empty:
+            print("\nYou have no income allocation rules yet.")
+            return
+
+        print("\nCurrent income allocation rules:")
+        values = [
+            f"{percent:g}%" if kind == "Percent" else format_cents(amount)
+            for kind, percent, amount in zip(rules_df["Kind"], rules_df["Percent"], rules_df["Amount"])
+        ]
+        rules = rules_df[["Rule_ID", "Category", "To_Account", "Kind"]].assign(Value=values).values.tolist()
+        print(tabulate(rules, headers=["ID", "Income category", "To account", "Kind", "Value"], tablefmt="grid"))
+
+    def add_allocation_rule(self) -> None:
+        """
+        Adds a rule sending a percentage or a fixed amount of an income category to an account.
+        """
+        self.display_categories("Income")
+        categories = self.category_service.categories["Income"]
+        category_id = input("\nEnter the ID of the income category: ").strip()
+        if category_id not in categories:
+            print(f"\n⚠️  Category ID '{category_id}' does not exist within Income categories.")
+            return
+        category_name = categories[category_id]
+
+        self.display_accounts(include_goals=False)
+        self.display_accounts(include_goals=True)
+        account_id = input("\nEnter the ID of the account to allocate to: ").strip()
+        if not account_id.isdigit() or not self.account_service.df["Account_ID"].eq(int(account_id)).any():
+            print(f"\n⚠️  Account ID '{account_id}' does not exist.")
+            return
+        to_account = self.account_service.df.loc[self.account_service.df["Account_ID"] == int(account_id), "Name"].values[0]
+
+        print("\nChoose the kind of allocation:")
+        print("1. Percentage of the income")
+        print("2. Fixed amount")
+        choice = input("Enter your choice: ").strip()
+        if choice not in ["1", "2"]:
+            print("\n⚠️  Invalid input. Please enter a valid option.")
+            return
+        kind = ALLOCATION_KINDS[int(choice) - 1]
+
+        if kind == "Percent":
+            value = self.get_float_number("\nEnter the percentage: ")
+        else:
+            value = self.get_amount("\nEnter the amount: ")
+        if kind == "Percent" and value > 100:
+            print("\n⚠️  The percentage cannot be more than 100.")
+            return
+
+        self.allocation_service.add_rule(category_name, to_account, kind, value)
+        print(f"\n✔️  Income under '{category_name}' will be allocated to the {to_account} account.")
+
+    def delete_allocation_rule(self) -> None:
+        """
+        Deletes an income allocation rule chosen by ID.
+        """
+        rule_id = input("\nEnter the ID of the rule to delete: ").strip()
+        if rule_id.isdigit() and self.allocation_service.df["Rule_ID"].eq(int(rule_id)).any():
+            self.allocation_service.delete_rule(int(rule_id))
+            print(f"\n✔️  Rule ID {rule_id} has been deleted.")
+        else:
+            print(f"\n⚠️  Rule ID '{rule_id}' does not exist.")
+
+    def manage_checkpoints(self) -> None:
+        """
+        Allows user to take, roll back to, delete or prune checkpoints of the data.
+        """
+        try:
+            while True:
+                self.display_checkpoints()
+                print("\nCheckpoints - choose what to do:")
+                print("1. Take a checkpoint")
+                print("2. Roll back to a checkpoint")
+                print("3. Delete a checkpoint")
+                print("4. Keep only the newest checkpoints")
+                print("5. Go back")
+
+                choice = input("Enter your choice: ").strip()
+
+                if choice == "1":
+                    self.create_checkpoint()
+                elif choice == "2":
+                    self.rollback_to_checkpoint()
+                elif choice == "3":
+                    self.delete_checkpoint()
+                elif choice == "4":
+                    self.prune_checkpoints()
+                elif choice == "5":
+                    return
+                else:
+                    print("\n⚠️  Invalid input. Please enter a valid option.\n")
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def display_checkpoints(self) -> None:
+        """
+        Displays the checkpoints in a tabulated format, newest first.
+        """
+        checkpoints = self.checkpoint_service.list_checkpoints()
+        if not checkpoints:
+            print("\nYou have no checkpoints yet.")
+            return
+
+        print("\nCheckpoints:")
+        print(tabulate([[checkpoint["Name"], checkpoint["Created"].replace("T", " "), checkpoint["Size"] / 1_000_000] for checkpoint in checkpoints], headers=["Name", "Created", "Size (MB)"], tablefmt="grid", floatfmt=",.2f"))
+
+    def create_checkpoint(self) -> None:
+        """
+        Takes a checkpoint of the data under a name chosen by the user.
+        """
+        name = input("\nEnter a name for the checkpoint or press 'enter' to name it by the current time: ").strip()
+        try:
+            checkpoint = self.checkpoint_service.create_checkpoint(name)
+        except ValueError as error:
+            print(f"\n⚠️  The checkpoint was not taken: {error}.")
+            return
+        print(f"\n✔️  Checkpoint '{checkpoint['Name']}' was taken.")
+
+    def rollback_to_checkpoint(self) -> None:
+        """
+        Rolls the data back to a checkpoint after confirmation and reloads it. The services
+        are shared with the other modes, so none of them keeps pre-rollback data to save later.
+        """
+        name = input("\nEnter the name of the checkpoint to roll back to: ").strip()
+        print("\nAll changes made since the checkpoint will be lost, and cannot be undone. Do you want to proceed?")
+        print("1. Yes")
+        print("2. No")
+        if input("Enter your choice: ").strip() != "1":
+            print("\n⚠️  Rollback cancelled.")
+            return
+        try:
+            self.checkpoint_service.rollback(name)
+        except ValueError as error:
+            print(f"\n⚠️  {error.args[0].capitalize()}.")
+            return
+        self.transaction_service.reload()
+        self.account_service.reload()
+        self.category_service.categories = None
+        self.budget_service.df = None
+        self.allocation_service.df = None
+        self.preset_service.df = None
+        self.journal.clear()
+        print(f"\n✔️  The data was rolled back to checkpoint '{name}'.")
+
+    def delete_checkpoint(self) -> None:
+        """
+        Deletes a checkpoint chosen by name.
+        """
+        name = input("\nEnter the name of the checkpoint to delete: ").strip()
+        try:
+            self.checkpoint_service.delete_checkpoint(name)
+        except ValueError as error:
+            print(f"\n⚠️  {error.args[0].capitalize()}.")
+            return
+        print(f"\n✔️  Checkpoint '{name}' was deleted.")
+
+    def prune_checkpoints(self) -> None:
+        """
+        Deletes all but the given number of newest checkpoints.
+        """
+        keep = input("\nEnter how many of the newest checkpoints to keep: ").strip()
+        if not keep.isdigit():
+            print("\n⚠️  Invalid input. Please enter a whole number.")
+            return
+        pruned = self.checkpoint_service.prune_checkpoints(int(keep))
+        print(f"\n✔️  {len(pruned)} checkpoint(s) were deleted.")
+
     def display_categories(self, category_type: str) -> None:
         """
         Displays categories in a tabulated format.
@@ -210,12 +521,27 @@ class SettingsMode:
                     f"\n⚠️  The category name '{new_name}' already exists. Please choose a different name."
                 )
             else:
+                transactions_df = self.transaction_service.df
+                renamed_ids = transactions_df.loc[transactions_df["Category"] == old_name, "Transaction_ID"].tolist()
                 self.category_service.edit_category(
                     category_type, int(category_id), new_name
                 )
                 self.transaction_service.update_transactions_category(
                     old_name, new_name
                 )
+                self.budget_service.rename_category(old_name, new_name)
+                self.preset_service.rename_category(category_type, old_name, new_name)
+                if category_type == "Income":
+                    self.allocation_service.rename_category(old_name, new_name)
+                self.journal.record(
+                    "rename_category",
+                    f"renaming of category '{old_name}' to '{new_name}'",
+                    category_type=category_type,
+                    category_id=int(category_id),
+                    old_name=old_name,
+                    new_name=new_name,
+                    transaction_ids=renamed_ids,
+                )
                 print(
                     f"\n✔️  Category ID {category_id} name was changed from {old_name} to {new_name}."
                 )
@@ -241,8 +567,33 @@ class SettingsMode:
             print("2. No")
             confirmation = input("Enter your choice: ").strip()
             if confirmation == "1":
+                transactions_df = self.transaction_service.df
+                budgets_df = self.budget_service.df
+                uncategorized_ids = transactions_df.loc[transactions_df["Category"] == category_name, "Transaction_ID"].tolist()
+                deleted_budgets = budgets_df[budgets_df["Category"] == category_name].to_dict("records")
+                rules_df = self.allocation_service.df
+                deleted_rules = (
+                    rules_df[rules_df["Category"] == category_name].to_dict("records")
+                    if category_type == "Income"
+                    else []
+                )
                 self.category_service.delete_category(category_type, int(category_id))
                 self.transaction_service.uncategorize_transactions(category_name)
+                self.budget_service.delete_category_budgets(category_name)
+                if deleted_rules:
+                    self.allocation_service.delete_rules("Category", category_name)
+                uncategorized_preset_ids = self.preset_service.uncategorize_presets(category_type, category_name)
+                self.journal.record(
+                    "delete_category",
+                    f"deletion of category '{category_name}'",
+                    category_type=category_type,
+                    category_id=int(category_id),
+                    name=category_name,
+                    transaction_ids=uncategorized_ids,
+                    budgets=deleted_budgets,
+                    rules=deleted_rules,
+                    preset_ids=uncategorized_preset_ids,
+                )
                 print(
                     f"\n✔️  Category ID {category_id} has been deleted and associated transactions are now uncategorized."
                 )
@@ -274,8 +625,7 @@ class SettingsMode:
             balance_to_transfer = account_row.iloc[0]["Balance"]
 
             if self.confirm_account_deletion(account_name, int(account_id), balance_to_transfer):
-                self.transfer_balance_to_main(int(account_id), account_name, balance_to_transfer)
-                self.account_service.delete_account(int(account_id))
+                self.delete_account_with_journal(account_row)
                 print(f"\n✔️  Account {account_name} was deleted successfully.")
             else:
                 print("\n⚠️  Account deletion cancelled.")
@@ -304,8 +654,18 @@ class SettingsMode:
             print("No input has been provided. Please enter a name.")
             return
         
+        old_name = self.account_service.df.loc[self.account_service.df["Account_ID"] == int(account_id), "Name"].iloc[0]
         self.account_service.edit_account_name(int(account_id), new_name)
         self.transaction_service.update_account_name_in_transactions(int(account_id), new_name)
+        self.allocation_service.rename_account(old_name, new_name)
+        self.preset_service.rename_account(old_name, new_name)
+        self.journal.record(
+            "rename_account",
+            f"renaming of account '{old_name}' to '{new_name}'",
+            account_id=int(account_id),
+            old_name=old_name,
+            new_name=new_name,
+        )
         print(f"\n✔️  Account with ID {account_id} has been renamed to '{new_name}'.")
 
     def add_new_financial_goal_account(self) -> None:
@@ -314,20 +674,22 @@ class SettingsMode:
         """
         name = self.get_account_name("\nEnter the name of your financial goal: ")
 
-        current_saved_amount = self.get_float_number("\nEnter the amount you've saved up so far: ")
-        goal_amount = self.get_float_number("\nEnter the amount you need: ")
+        current_saved_amount = self.get_amount("\nEnter the amount you've saved up so far: ")
+        goal_amount = self.get_amount("\nEnter the amount you need: ")
 
         note = input("\nEnter a note for the account (optional): ").strip()
 
-        goal_account = self.account_service.add_account(
-            name=name,
-            balance=current_saved_amount,
-            is_goal="Yes",  
-            goal_amount=goal_amount, 
-            note=note
-        )
+        with self.transaction_service.lock.write():
+            goal_account = self.account_service.add_account(
+                name=name,
+                balance=current_saved_amount,
+                is_goal="Yes",  
+                goal_amount=goal_amount, 
+                note=note
+            )
+            self.record_opening_balance(goal_account)
 
-        print(f"\n✔️  Financial goal {goal_account.name} has been added with a goal amount of {goal_amount}.")
+        print(f"\n✔️  Financial goal {goal_account.name} has been added with a goal amount of {format_cents(goal_amount)}.")
 
     def delete_financial_goal_account(self) -> None:
         """
@@ -348,8 +710,7 @@ class SettingsMode:
         balance_to_transfer = account_row.iloc[0]["Balance"]
 
         if self.confirm_account_deletion(account_name, int(account_id), balance_to_transfer):
-            self.transfer_balance_to_main(int(account_id), account_name, balance_to_transfer)
-            self.account_service.delete_account(int(account_id))
+            self.delete_account_with_journal(account_row)
             print(f"\n✔️  Financial goal {account_name} was deleted successfully.")
         else:
             print("\n⚠️  Goal deletion cancelled.")
@@ -371,9 +732,30 @@ class SettingsMode:
         if include_goals and accounts_df.empty:
             print("\nYou currently have no financial goals. Set some.😉")
         else:
+            accounts_df = accounts_df.assign(
+                **{column: to_units(accounts_df[column]) for column in ["Balance", "Goal_Amount"]}
+            )
             accounts = accounts_df[columns_to_display].values.tolist()
             print("\nCurrent Accounts:" if not include_goals else "\nCurrent Financial Goals:")
-            print(tabulate(accounts, headers=headers, tablefmt="grid"))
+            print(tabulate(accounts, headers=headers, tablefmt="grid", floatfmt=",.2f"))
+
+    def record_opening_balance(self, account: any) -> None:
+        """
+        Records the balance a new account starts with as an opening balance transaction,
+        so the account's transactions add up to its balance.
+        """
+        if account.balance:
+            self.transaction_service.add_transaction(
+                OPENING_BALANCE,
+                datetime.now().strftime("%d-%m-%Y"),
+                account.balance,
+                None,
+                None,
+                account.account_id,
+                account.name,
+                "",
+                OPENING_BALANCE,
+            )
 
     def add_account(self) -> None:
             """
@@ -381,11 +763,13 @@ class SettingsMode:
             """
             name = self.get_account_name("\nEnter the new account name: ")
 
-            balance = self.get_float_number("\nEnter the initial balance for the account: ")
+            balance = self.get_amount("\nEnter the initial balance for the account: ")
 
             note = input("\nEnter a note for the account (optional): ").strip()
-            account = self.account_service.add_account(name, balance, "No", "", note)
-            print(f"\n✔️  Account '{account.name}' has been added with balance {balance}.")
+            with self.transaction_service.lock.write():
+                account = self.account_service.add_account(name, balance, "No", "", note)
+                self.record_opening_balance(account)
+            print(f"\n✔️  Account '{account.name}' has been added with balance {format_cents(balance)}.")
 
     
     def get_account_name(self, prompt: str) -> str:
@@ -401,6 +785,20 @@ class SettingsMode:
             else:
                 return name
 
+    def get_amount(self, prompt: str) -> int:
+        """
+        Gets and validates an amount, returning it in cents.
+        """
+        while True:
+            try:
+                amount = parse_cents(input(prompt))
+                if amount < 0:
+                    raise ValueError("\n⚠️  Amount should be provided in format xx.xx.")
+                else:
+                    return amount
+            except ValueError:
+                 print(f"\n⚠️  Invalid input. Please enter a valid amount with up to two decimal places.")
+
     def get_float_number(self, prompt: str) -> float:
         """
         Gets and validates a float value.
@@ -420,11 +818,11 @@ class SettingsMode:
                  print(f"\n⚠️  Invalid input. Please enter a valid amount with up to two decimal places.")
 
     
-    def confirm_account_deletion(self, account_name: str, account_id: int, balance_to_transfer: float) -> bool:
+    def confirm_account_deletion(self, account_name: str, account_id: int, balance_to_transfer: int) -> bool:
         """
         Confirms with the user if they want to delete the account.
         """
-        print(f"\nAccount {account_name} ID {account_id} has a balance of {balance_to_transfer}")
+        print(f"\nAccount {account_name} ID {account_id} has a balance of {format_cents(balance_to_transfer)}")
         print("By deleting this account, you will transfer this balance to the Main account.")
         print("Do you want to proceed?")
         print("1. Yes")
@@ -439,14 +837,36 @@ class SettingsMode:
             else:
                 print("\n⚠️  Invalid input. Please enter a valid option.\n")
 
-    def transfer_balance_to_main(self, from_account_id: int, from_account_name: str, balance_to_transfer: float) -> None:
+    def delete_account_with_journal(self, account_row: any) -> None:
+        """
+        Transfers the balance of an account to Main, deletes the account and the
+        allocation rules to it, and records the deletion so it can be undone.
+        """
+        account = account_row.iloc[0].to_dict()
+        account_id = int(account["Account_ID"])
+        rules_df = self.allocation_service.df
+        deleted_rules = rules_df[rules_df["To_Account"] == account["Name"]].to_dict("records")
+        transfer_ids = self.transfer_balance_to_main(account_id, account["Name"], account["Balance"])
+        self.account_service.delete_account(account_id)
+        if deleted_rules:
+            self.allocation_service.delete_rules("To_Account", account["Name"])
+        self.journal.record(
+            "delete_account",
+            f"deletion of account '{account['Name']}'",
+            account=account,
+            transaction_ids=transfer_ids,
+            rules=deleted_rules,
+        )
+
+    def transfer_balance_to_main(self, from_account_id: int, from_account_name: str, balance_to_transfer: int) -> list:
         """
         Transfers the balance from the deleted account to the Main account.
+        Returns the IDs of the added transactions.
         """
         if balance_to_transfer > 0:
             main_account_id = self.account_service.get_account_id_by_name("Main")
             today = datetime.today().strftime("%d-%m-%Y")
-            self.transaction_service.add_transaction(
+            transfer = self.transaction_service.add_transaction(
                 transaction_type="Transfer",
                 date=today,
                 amount=balance_to_transfer,
@@ -454,8 +874,8 @@ class SettingsMode:
                 from_account=from_account_name,
                 to_account_id=main_account_id,
                 to_account="Main",
-                note="Transfer due to account deletion"
+                note="Transfer due to account deletion",
+                category_name="Transfer",
             )
-
-
-
+            return [transfer.transaction_id]
+        return []
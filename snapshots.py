@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+from money import convert_amounts_to_units
+
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Bumped when the in-memory layout of the DataFrames changes (e.g. amounts stored as cents).
+SNAPSHOT_FORMAT = 4
+
+
+def get_snapshot_path(filepath: str) -> str:
+    """
+    Returns the path of the binary snapshot kept next to a CSV file.
+    """
+    return filepath + SNAPSHOT_SUFFIX
+
+
+def create_source_tag(filepath: str, content: bytes) -> dict:
+    """
+    Creates the tag identifying the CSV file a snapshot was built from.
+    """
+    stat = os.stat(filepath)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": hashlib.blake2b(content, digest_size=16).hexdigest(),
+        "pandas_version": pd.__version__,
+        "format": SNAPSHOT_FORMAT,
+    }
+
+
+def load_snapshot(filepath: str) -> pd.DataFrame:
+    """
+    Loads the DataFrame from the snapshot if it was built from the current CSV file.
+    Returns None if there is no usable snapshot.
+    """
+    try:
+        with open(get_snapshot_path(filepath), "rb") as file:
+            snapshot = pickle.load(file)
+        tag = snapshot["tag"]
+        stat = os.stat(filepath)
+        if (
+            tag["size"] != stat.st_size
+            or tag["mtime_ns"] != stat.st_mtime_ns
+            or tag["pandas_version"] != pd.__version__
+            or tag.get("format") != SNAPSHOT_FORMAT
+        ):
+            return None
+        with open(filepath, "rb") as file:
+            if hashlib.blake2b(file.read(), digest_size=16).hexdigest() != tag["hash"]:
+                return None
+        return snapshot["df"]
+    except Exception:
+        return None
+
+
+def write_snapshot(filepath: str, df: pd.DataFrame, content: bytes = None) -> None:
+    """
+    Writes the snapshot of the DataFrame tagged with the current state of the CSV file.
+    """
+    if content is None:
+        with open(filepath, "rb") as file:
+            content = file.read()
+    write_file_atomically(
+        get_snapshot_path(filepath),
+        pickle.dumps({"tag": create_source_tag(filepath, content), "df": df}, protocol=5),
+    )
+
+
+def write_file_atomically(filepath: str, content: bytes) -> None:
+    """
+    Writes the file under a temporary name and moves it into place, so the file is
+    never left half written and a checkpoint hard-linked to the old file keeps it.
+    """
+    temporary_path = filepath + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(content)
+    os.replace(temporary_path, filepath)
+
+
+def save_csv(filepath: str, df: pd.DataFrame, amount_columns: list = ()) -> bytes:
+    """
+    Saves the DataFrame to the CSV file and returns the written content.
+    Amount columns held in cents are written to the CSV file as decimal amounts.
+    """
+    content = (
+        convert_amounts_to_units(df, amount_columns).to_csv(index=False).encode("utf-8")
+    )
+    write_file_atomically(filepath, content)
+    return content
+
+
+def save_csv_with_snapshot(
+    filepath: str, df: pd.DataFrame, amount_columns: list = ()
+) -> None:
+    """
+    Saves the DataFrame to the CSV file and refreshes its snapshot.
+    Amount columns held in cents are written to the CSV file as decimal amounts.
+    """
+    content = save_csv(filepath, df, amount_columns)
+    write_snapshot(filepath, df, content)
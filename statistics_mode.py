@@ -0,0 +1,75 @@
+import os
+import pandas as pd
+from tabulate import tabulate
+from telemetry import telemetry_log
+
+SIZE_BANDS = [0, 1_000, 10_000, 100_000, 1_000_000, float("inf")]
+SIZE_BAND_LABELS = ["<1k rows", "1k-10k", "10k-100k", "100k-1M", ">=1M rows"]
+
+
+class StatisticsMode:
+    """
+    Shows operation latencies recorded across sessions and how they change as the ledger grows.
+    """
+
+    def __init__(
+        self, transaction_service: any, category_service: any, account_service: any
+    ) -> None:
+        """
+        Initializes StatisticsMode class.
+        """
+        self.transaction_service = transaction_service
+        self.category_service = category_service
+        self.account_service = account_service
+
+    def display_statistics(self) -> None:
+        """
+        Displays p50/p95 latency per operation and the median latency per ledger size.
+        """
+        data_dir = os.path.dirname(self.transaction_service.filepath)
+        records_df = pd.DataFrame(telemetry_log.read_records(data_dir))
+
+        if records_df.empty:
+            print("\n⚠️  No operation timings have been recorded yet.")
+            return
+
+        records_df["ms"] = records_df["seconds"] * 1000
+        summary_df = records_df.groupby("operation").agg(
+            calls=("ms", "size"),
+            p50=("ms", "median"),
+            p95=("ms", lambda values: values.quantile(0.95)),
+            rows=("rows", "last"),
+            file_bytes=("file_bytes", "last"),
+        )
+        summary_df["file_bytes"] = (summary_df["file_bytes"] / 1024).round(1)
+
+        print(f"\nOperation latencies over the last {len(records_df)} recorded operations:")
+        print(
+            tabulate(
+                summary_df.sort_values("p95", ascending=False),
+                headers=["Operation", "Calls", "p50 (ms)", "p95 (ms)", "Latest rows", "Latest file size (KB)"],
+                tablefmt="psql",
+                floatfmt=("", ".0f", ".1f", ".1f", ".0f", ".1f"),
+            )
+        )
+
+        records_df["size_band"] = pd.cut(
+            records_df["rows"], bins=SIZE_BANDS, labels=SIZE_BAND_LABELS, right=False
+        )
+        trend_df = records_df.pivot_table(
+            index="operation",
+            columns="size_band",
+            values="ms",
+            aggfunc="median",
+            observed=True,
+        )
+
+        print("\nMedian latency (ms) by ledger size:")
+        print(
+            tabulate(
+                trend_df.fillna("-"),
+                headers=["Operation", *[str(band) for band in trend_df.columns]],
+                tablefmt="psql",
+                floatfmt=".1f",
+            )
+        )
@@ -0,0 +1,161 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+TELEMETRY_FILENAME = "telemetry.jsonl"
+TELEMETRY_ENV = "FINANCE_APP_TELEMETRY"
+MAX_LOG_BYTES = 2_000_000
+
+# The buffer is written out once it holds this many records or its oldest record
+# is this old, so a long-running process (e.g. the API server) keeps little in memory.
+MAX_PENDING_RECORDS = 1000
+MAX_PENDING_SECONDS = 60
+
+
+class TelemetryLog:
+    """
+    Keeps a rolling log of operation timings next to the data files.
+    Records are buffered in memory and appended at exit, or earlier when the buffer
+    grows too large or too old; the log is trimmed to the newest records when it
+    grows past the size limit.
+    """
+
+    def __init__(self, max_bytes: int = MAX_LOG_BYTES) -> None:
+        """
+        Initializes an empty buffer.
+        """
+        self.max_bytes = max_bytes
+        self.pending = {}
+        self.pending_count = 0
+        self.pending_since = None
+        self.enabled = os.environ.get(TELEMETRY_ENV, "1") != "0"
+        self._exit_handler_registered = False
+        self._lock = threading.Lock()
+
+    def add(self, log_path: str, record: dict) -> None:
+        """
+        Buffers a record for the log file at the given path, and writes the buffer
+        out if it is due.
+        """
+        with self._lock:
+            self.pending.setdefault(log_path, []).append(record)
+            self.pending_count += 1
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            if not self._exit_handler_registered:
+                atexit.register(self.flush)
+                self._exit_handler_registered = True
+        self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        """
+        Writes the buffer out if it holds too many records or its oldest record is too old.
+        """
+        if self.pending_count >= MAX_PENDING_RECORDS or (
+            self.pending_since is not None
+            and time.monotonic() - self.pending_since >= MAX_PENDING_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Appends the buffered records to their log files and trims oversized logs.
+        """
+        with self._lock:
+            pending = self.pending
+            self.pending = {}
+            self.pending_count = 0
+            self.pending_since = None
+        for log_path, records in pending.items():
+            try:
+                with open(log_path, "a") as file:
+                    file.writelines(json.dumps(record) + "\n" for record in records)
+                if os.path.getsize(log_path) > self.max_bytes:
+                    self.trim(log_path)
+            except OSError:
+                continue
+
+    def trim(self, log_path: str) -> None:
+        """
+        Keeps the newest records that fit into half of the size limit.
+        """
+        with open(log_path) as file:
+            lines = file.readlines()
+        kept = []
+        size = 0
+        for line in reversed(lines):
+            size += len(line)
+            if size > self.max_bytes // 2:
+                break
+            kept.append(line)
+        temporary_path = log_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            file.writelines(reversed(kept))
+        os.replace(temporary_path, log_path)
+
+    def read_records(self, data_dir: str) -> list:
+        """
+        Returns the stored and buffered records of a data directory.
+        """
+        log_path = get_log_path(data_dir)
+        records = []
+        try:
+            with open(log_path) as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records + self.pending.get(log_path, [])
+
+
+telemetry_log = TelemetryLog()
+
+
+def get_log_path(data_dir: str) -> str:
+    """
+    Returns the path of the telemetry log in a data directory.
+    """
+    return os.path.join(os.path.abspath(data_dir), TELEMETRY_FILENAME)
+
+
+def track_operation(function: any) -> any:
+    """
+    Decorates a service method so that its duration, the ledger row count and
+    the data file size are recorded in the telemetry log.
+    """
+    operation = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        if not telemetry_log.enabled:
+            return function(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            service = getattr(self, "transaction_service", self)
+            filepath = service.filepath
+            rows = len(service._df) if service._df is not None else None
+            try:
+                file_bytes = os.path.getsize(filepath)
+            except OSError:
+                file_bytes = None
+            telemetry_log.add(
+                get_log_path(os.path.dirname(filepath)),
+                {
+                    "time": time.time(),
+                    "operation": operation,
+                    "seconds": seconds,
+                    "rows": rows,
+                    "file_bytes": file_bytes,
+                },
+            )
+
+    return wrapper
@@ -1,63 +1,128 @@
-from art import text2art
-from transactions import TransactionService
-from accounts import AccountService
-from categories import CategoryService
-from transactions_mode import TransactionsMode
-from overview_mode import OverviewMode
-from settings_mode import SettingsMode
-from financials_goals_mode import FinancialGoalsMode
+import os
+from profiles import DEFAULT_PROFILE, ProfileCache, get_profile_dir, list_profiles
+
+# Checked at startup without importing the presets module.
+PRESETS_FILENAME = "presets.csv"
+
 
 class ToolManager:
     """Encapsulates the main logic of the tool."""
 
-    def __init__(self):
+    def __init__(self, profile_name: str = DEFAULT_PROFILE):
         """
-        Initializes the ToolManager class.
+        Initializes the ToolManager class with a ledger profile.
+        Services and modes are created on first use so the main menu appears right away,
+        and recently used profiles stay loaded so switching back to them is instant.
         """
-        transaction_service = TransactionService()
-        category_service = CategoryService()
-        account_service = AccountService()
-        self.transactions_mode = TransactionsMode(transaction_service, category_service, account_service)
-        self.overview_mode = OverviewMode(transaction_service, category_service, account_service)
-        self.settings_mode = SettingsMode(transaction_service, category_service, account_service)
-        self.financial_goals_mode = FinancialGoalsMode(transaction_service, category_service, account_service)
+        self.profile_cache = ProfileCache()
+        self.profile = self.profile_cache.get(profile_name)
 
     def handle_navigation_of_main_menu(self) -> None:
         """
         Handles user choice for navigation.
+        Adds the recurring transactions that became due since the last session first.
         """
+        self.add_due_presets()
+
         while True:
             self.display_main_menu()
 
             choice = self.get_user_choice()
 
-            goodbye_art = text2art("Goodbye!", font="small")
-
             if choice == 1:
-                self.transactions_mode.display_transactions_mode_menu()
+                self.profile.transactions_mode.display_transactions_mode_menu()
             elif choice == 2:
-                self.overview_mode.display_overview_mode_menu()
+                self.profile.overview_mode.display_overview_mode_menu()
             elif choice == 3:
-                self.financial_goals_mode.display_financial_goals_mode_menu()
+                self.profile.financial_goals_mode.display_financial_goals_mode_menu()
             elif choice == 4:
-                self.settings_mode.display_settings_mode_menu()
+                self.profile.settings_mode.display_settings_mode_menu()
             elif choice == 5:
+                self.profile.statistics_mode.display_statistics()
+            elif choice == 6:
+                self.undo_last_change()
+            elif choice == 7:
+                self.redo_last_change()
+            elif choice == 8:
+                self.switch_profile()
+            elif choice == 9:
+                from art import text2art
+
                 print("\nExiting the program...")
-                print(goodbye_art)
+                print(text2art("Goodbye!", font="small"))
                 break
             else:
                 print("\n⚠️Invalid input. Please try again.\n")
 
+    def add_due_presets(self) -> None:
+        """
+        Adds the due recurring transactions, if any presets were set up.
+        """
+        if not os.path.exists(os.path.join(self.profile.data_dir, PRESETS_FILENAME)):
+            return
+        added = self.profile.preset_service.materialize_due_presets()
+        if added:
+            print(f"\n🔁 {added} recurring transaction(s) were added since your last visit.")
+
+    def undo_last_change(self) -> None:
+        """
+        Reverts the latest change recorded in this session.
+        """
+        description = self.profile.journal.undo()
+        if description is None:
+            print("\n⚠️  There is nothing to undo.")
+        else:
+            print(f"\n↩️  Undone: {description}.")
+
+    def redo_last_change(self) -> None:
+        """
+        Applies the latest undone change again.
+        """
+        description = self.profile.journal.redo()
+        if description is None:
+            print("\n⚠️  There is nothing to redo.")
+        else:
+            print(f"\n↪️  Redone: {description}.")
+
+    def switch_profile(self) -> None:
+        """
+        Switches to another ledger profile, or creates a new one, chosen by name.
+        """
+        print(f"\nCurrent profile: {self.profile.name}")
+        print("Available profiles: " + ", ".join(list_profiles()))
+        try:
+            name = input("\nEnter the name of the profile to switch to (a new name creates it): ").strip()
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+        if not name or name == self.profile.name:
+            print("\n⚠️  The profile was not changed.")
+            return
+        try:
+            get_profile_dir(name)
+        except ValueError as error:
+            print(f"\n⚠️  {error.args[0].capitalize()}.")
+            return
+
+        self.profile = self.profile_cache.get(name)
+        print(f"\n✔️  Switched to profile '{name}'.")
+        self.add_due_presets()
+
     def display_main_menu(self) -> None:
         """
         Displays the main menu choices for the user.
         """
-        print("\nPlease select one of the following options:")
+        print(f"\nProfile: {self.profile.name}")
+        print("Please select one of the following options:")
         print("1. Transactions")
         print("2. Overview")
         print("3. Financial Goals") 
         print("4. Settings") 
-        print("5. Exit")
+        print("5. Statistics")
+        print("6. Undo last change")
+        print("7. Redo last undone change")
+        print("8. Switch profile")
+        print("9. Exit")
 
     def get_user_choice(self) -> int:
         """
@@ -66,7 +131,7 @@ class ToolManager:
         while True:
             try:
                 choice = int(input("Enter your choice: "))
-                if choice in [1, 2, 3, 4, 5, 6]:
+                if choice in [1, 2, 3, 4, 5, 6, 7, 8, 9]:
                     return choice
                 else:
                     print("Invalid input. Please choose one of the indicated modes.")
@@ -1,16 +1,70 @@
+import os
+from array import array
+import numpy as np
 import pandas as pd
+from locking import get_data_lock, write_locked
+from money import read_csv_with_amounts
+from profiles import DATA_DIR
+from snapshots import load_snapshot, save_csv_with_snapshot, write_snapshot
+from telemetry import track_operation
+
+TRANSACTIONS_FILENAME = "transactions.csv"
+
+# Held in memory as integer cents, written to the CSV file as decimal amounts.
+AMOUNT_COLUMNS = ["Amount"]
+
+# Columns repeating a handful of labels, held as pandas categories. Both account
+# name columns share one set of categories, so one can be filled from the other.
+CATEGORICAL_COLUMNS = ["Type", "Category", "From_Account", "To_Account"]
+ACCOUNT_NAME_COLUMNS = ["From_Account", "To_Account"]
+
+# Free text that is mostly unique per row, so categories would not save anything.
+TEXT_COLUMNS = ["Note"]
+
+# Type and category of the rows recording the balance an account was created with.
+# Reports only count incomes, expenses and transfers, so these rows are left out of them.
+OPENING_BALANCE = "Opening Balance"
+
+ID_COLUMNS = {
+    "Transaction_ID": "int32",
+    "From_Account_ID": "Int32",
+    "To_Account_ID": "Int32",
+}
+
+# Number of buffered transactions flushed into the ledger at once.
+BUFFER_BLOCK_SIZE = 10_000
+
+
+def to_text(values: pd.Series) -> pd.Series:
+    """
+    Returns the values as a string column with empty cells as missing values.
+    """
+    values = values.astype("string")
+    return values.mask(values.fillna("") == "")
 
-TRANSACTIONS_FILE = "data/transactions.csv"
 
 class Transaction:
     """Represents one financial transaction."""
 
+    __slots__ = (
+        "transaction_id",
+        "transaction_type",
+        "date",
+        "amount",
+        "category_name",
+        "from_account_id",
+        "from_account",
+        "to_account_id",
+        "to_account",
+        "note",
+    )
+
     def __init__(
         self,
         transaction_id: int,
         transaction_type: str,
         date: str,
-        amount: float,
+        amount: int,
         category_name: str,
         from_account_id: int,
         from_account: str,
@@ -18,7 +72,7 @@ class Transaction:
         to_account: str,
         note: str,
     ) -> None:
-        """Initializes a new transaction"""
+        """Initializes a new transaction. The amount is in cents."""
         self.transaction_id = transaction_id
         self.transaction_type = transaction_type
         self.date = date
@@ -51,10 +105,16 @@ class Transaction:
 class TransactionService:
     """
     Manages transactions and their manipulation in a CSV file.
+    Amounts are kept as integer cents, IDs as narrow integers and the repeated
+    labels as categories; inserted rows are cast to the same types.
     """
-    def __init__(self) -> None:
-        "Initializes the class with a path to the CSV file"
-        self.filepath = TRANSACTIONS_FILE
+    def __init__(self, data_dir: str = DATA_DIR) -> None:
+        """
+        Initializes the class with the path to the CSV file in the profile's data directory.
+        The file is loaded on first access to the transactions.
+        """
+        self.filepath = os.path.join(data_dir, TRANSACTIONS_FILENAME)
+        self.lock = get_data_lock(data_dir)
         self.columns = [
             "Transaction_ID",
             "Type",
@@ -67,25 +127,83 @@ class TransactionService:
             "To_Account",
             "Note",
         ]
-        self.load_or_initialize_transactions_file()
+        self.version = 0
+        self._df = None
+        self._dates = None
+        self._account_index = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Returns the transactions DataFrame, loading the CSV file on first access.
+        The file is loaded under the write lock, so two threads never both load it.
+        """
+        if self._df is None:
+            with self.lock.write():
+                if self._df is None:
+                    self.load_or_initialize_transactions_file()
+        return self._df
+
+    @df.setter
+    def df(self, transactions_df: pd.DataFrame) -> None:
+        """
+        Replaces the transactions DataFrame and drops the caches built on the previous one.
+        """
+        self._df = transactions_df
+        self._dates = None
+        self._account_index = None
+
+    def snapshot(self, with_account_index: bool = False) -> tuple:
+        """
+        Returns the ledger version, DataFrame and parsed dates (and the posting lists
+        if asked) as one consistent set. Changes are made on a copy of the DataFrame
+        and replace the caches, so the returned objects can be read without a lock.
+        """
+        while True:
+            # Loading takes the write lock, so it cannot happen under the read lock.
+            self.df
+            with self.lock.read():
+                if self._df is not None:
+                    snapshot = (self.version, self._df, self.get_transaction_dates())
+                    if with_account_index:
+                        snapshot += (self.get_account_index(),)
+                    return snapshot
+
+    def copy_on_write(self) -> None:
+        """
+        Replaces the DataFrame with a shallow copy before a change. With pandas'
+        copy-on-write the change then copies only the columns it modifies, and
+        snapshots handed out earlier keep their data.
+        """
+        if self._df is not None:
+            self._df = self._df.copy(deep=False)
 
+    @track_operation
     def load_or_initialize_transactions_file(self) -> None:
         """
-        Loads the transactions CSV file or creates a new one if it doesn't exist
+        Loads the transactions CSV file or creates a new one if it doesn't exist.
+        Uses the binary snapshot instead of parsing the CSV file when it is up to date.
         """
         try:
-            self.df = pd.read_csv(self.filepath)
-            for col in ["From_Account_ID", "To_Account_ID"]:
-                self.df[col] = pd.to_numeric(self.df[col], errors="coerce").astype("Int64")
+            snapshot_df = load_snapshot(self.filepath)
+            if snapshot_df is not None:
+                self.df = snapshot_df
+                return
+            self.df = read_csv_with_amounts(self.filepath, AMOUNT_COLUMNS)
+            self.normalize_columns()
+            write_snapshot(self.filepath, self.df)
         except FileNotFoundError:
             self.df = pd.DataFrame(columns=self.columns)
             self.df.to_csv(self.filepath, index=False)
+            self.normalize_columns()
 
+    @track_operation
+    @write_locked
     def add_transaction(
         self,
         transaction_type: str,
         date: str,
-        amount: float,
+        amount: int,
         from_account_id: int, 
         from_account: str,
         to_account_id: int,
@@ -94,7 +212,7 @@ class TransactionService:
         category_name: str = "Uncategorized"
     ) -> Transaction:
         """
-        Adds a new transaction and saves it to the CSV file.
+        Adds a new transaction (amount in cents) and saves it to the CSV file.
         """
         if not category_name:
             category_name = "Uncategorized"
@@ -111,11 +229,145 @@ class TransactionService:
             to_account=to_account,
             note=note,
         )
-        new_transaction_df = pd.DataFrame([transaction.convert_to_dict()])
-        self.df = pd.concat([self.df, new_transaction_df], ignore_index=True)
-        self.sort_transactions()
+        new_transaction_df = self.conform_rows(pd.DataFrame([transaction.convert_to_dict()]))
+        dates = self.get_transaction_dates()
+        if dates.is_monotonic_decreasing:
+            new_date = pd.to_datetime(date, format="%d-%m-%Y")
+            position = len(dates) - int(
+                np.searchsorted(dates.values[::-1], new_date.to_datetime64(), side="right")
+            )
+            self.insert_rows(position, new_transaction_df, [new_date])
+        else:
+            self.df = pd.concat([self.df, new_transaction_df], ignore_index=True)
+            self.sort_transactions()
         self.save_transaction_to_file()
+        return transaction
+
+    @track_operation
+    @write_locked
+    def add_transactions(self, transactions_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds a batch of transactions (amounts in cents) with consecutive IDs in one merge and one save.
+        Within a date, later rows of the batch end up on top as if added one by one.
+        Returns the added rows with their IDs.
+        """
+        if transactions_df.empty:
+            return transactions_df
 
+        new_df = transactions_df.reindex(columns=self.columns).reset_index(drop=True)
+        next_id = self.get_next_transaction_id()
+        new_df["Transaction_ID"] = np.arange(next_id, next_id + len(new_df))
+        new_df["Category"] = new_df["Category"].fillna("Uncategorized")
+        new_df = self.conform_rows(new_df)
+
+        self.merge_rows(new_df)
+        self.save_transaction_to_file()
+        return new_df
+
+    @track_operation
+    @write_locked
+    def restore_transactions(self, rows_df: pd.DataFrame) -> None:
+        """
+        Puts back rows removed earlier (e.g. by an undo) with their original IDs,
+        in one merge and one save. The rows are expected newest first, as in the ledger.
+        """
+        if rows_df.empty:
+            return
+        self.merge_rows(self.conform_rows(rows_df).iloc[::-1].reset_index(drop=True))
+        self.save_transaction_to_file()
+
+    def merge_rows(self, new_df: pd.DataFrame) -> None:
+        """
+        Merges rows into the date order using the already parsed dates; within a date,
+        later rows end up on top as if added one by one.
+        """
+        new_df = new_df.iloc[::-1]
+        combined_dates = pd.concat(
+            [
+                pd.to_datetime(new_df["Date"], format="%d-%m-%Y"),
+                self.get_transaction_dates(),
+            ],
+            ignore_index=True,
+        )
+        order = np.argsort(-combined_dates.to_numpy().astype(np.int64), kind="stable")
+        self._df = (
+            pd.concat([new_df, self._df], ignore_index=True)
+            .iloc[order]
+            .reset_index(drop=True)
+        )
+        self._dates = combined_dates.iloc[order].reset_index(drop=True)
+        self._account_index = None
+
+    def insert_rows(
+        self, position: int, rows_df: pd.DataFrame, row_dates: list
+    ) -> None:
+        """
+        Inserts rows at a position of the date-sorted DataFrame.
+        The parsed dates and the per-account index are updated instead of being rebuilt.
+        """
+        self._df = pd.concat(
+            [self._df.iloc[:position], rows_df, self._df.iloc[position:]],
+            ignore_index=True,
+        )
+        if self._dates is not None:
+            self._dates = pd.Series(
+                np.insert(
+                    self._dates.values,
+                    position,
+                    pd.to_datetime(pd.Series(row_dates)).values,
+                ),
+                name="Date",
+            )
+        if self._account_index is not None:
+            account_index = {
+                account_id: positions + (positions >= position) * len(rows_df)
+                for account_id, positions in self._account_index.items()
+            }
+            for offset, row in enumerate(
+                rows_df[["From_Account_ID", "To_Account_ID"]].itertuples(index=False)
+            ):
+                for account_id in row:
+                    if pd.isna(account_id) or account_id == "":
+                        continue
+                    positions = account_index.get(
+                        int(account_id), np.array([], dtype=np.intp)
+                    )
+                    account_index[int(account_id)] = np.insert(
+                        positions,
+                        np.searchsorted(positions, position + offset),
+                        position + offset,
+                    )
+            self._account_index = account_index
+
+    @track_operation
+    @write_locked
+    def delete_transactions(self, transaction_ids: list) -> pd.DataFrame:
+        """
+        Deletes the transactions with the given IDs and saves the CSV file.
+        The parsed dates and the per-account index are updated instead of being rebuilt.
+        Returns the deleted rows.
+        """
+        removed_mask = self.df["Transaction_ID"].isin(transaction_ids).to_numpy()
+        removed_positions = np.flatnonzero(removed_mask)
+        removed_df = self._df[removed_mask].reset_index(drop=True)
+        if not len(removed_positions):
+            return removed_df
+
+        self._df = self._df[~removed_mask].reset_index(drop=True)
+        if self._dates is not None:
+            self._dates = self._dates[~removed_mask].reset_index(drop=True)
+        if self._account_index is not None:
+            account_index = {}
+            for account_id, positions in self._account_index.items():
+                kept = positions[~np.isin(positions, removed_positions)]
+                account_index[account_id] = kept - np.searchsorted(
+                    removed_positions, kept
+                )
+            self._account_index = account_index
+        self.save_transaction_to_file()
+        return removed_df
+
+    @write_locked
     def sort_transactions(self) -> None:
         """
         Sorts the DataFrame by date with the newest transactions on top.
@@ -124,12 +376,144 @@ class TransactionService:
         self.df.sort_values(by="Date", ascending=False, inplace=True)
         self.df["Date"] = self.df["Date"].dt.strftime("%d-%m-%Y")
         self.df.reset_index(drop=True, inplace=True)
+        self._dates = None
+        self._account_index = None
 
+    @track_operation
+    @write_locked
     def save_transaction_to_file(self) -> None:
         """
-        Saves the DataFrame of transactions to the CSV file.
+        Saves the DataFrame of transactions to the CSV file and refreshes its snapshot.
+        """
+        self.normalize_columns()
+        save_csv_with_snapshot(self.filepath, self.df, AMOUNT_COLUMNS)
+        self.version += 1
+
+    @write_locked
+    def reload(self) -> None:
+        """
+        Drops the loaded ledger so the file is read again on next access, e.g. after
+        a checkpoint rollback. The version is bumped so caches built on it are dropped too.
+        """
+        self.df = None
+        self.version += 1
+
+    def normalize_columns(self) -> None:
+        """
+        Gives the columns their compact types (narrow integer IDs, integer cents,
+        categories and strings, with empty cells as missing values), so the saved
+        snapshot matches a fresh load. Columns that already have their type are left as they are.
+        """
+        for col, dtype in ID_COLUMNS.items():
+            if self._df[col].dtype != dtype:
+                self._df[col] = pd.to_numeric(self._df[col], errors="coerce").astype(dtype)
+        if self._df["Amount"].dtype != "int64":
+            self._df["Amount"] = self._df["Amount"].astype("int64")
+        for col in CATEGORICAL_COLUMNS:
+            if not isinstance(self._df[col].dtype, pd.CategoricalDtype):
+                labels = self._df[col].astype("str")
+                self._df[col] = labels.mask(labels == "").astype("category")
+            elif "" in self._df[col].cat.categories:
+                self._df[col] = self._df[col].cat.remove_categories("")
+        for col in TEXT_COLUMNS:
+            if self._df[col].dtype != pd.StringDtype():
+                self._df[col] = to_text(self._df[col])
+
+        account_names = self._df["From_Account"].cat.categories.union(
+            self._df["To_Account"].cat.categories
+        )
+        for col in ACCOUNT_NAME_COLUMNS:
+            if not self._df[col].cat.categories.equals(account_names):
+                self._df[col] = self._df[col].cat.set_categories(account_names)
+
+    def conform_rows(self, rows_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns new rows cast to the column types of the ledger. Their labels are
+        added to the ledger's categories first, so concatenating the rows keeps the
+        compact types instead of falling back to object columns.
         """
-        self.df.to_csv(self.filepath, index=False)
+        rows_df = rows_df.reindex(columns=self.columns)
+        for col in CATEGORICAL_COLUMNS:
+            labels = rows_df[col].mask(rows_df[col] == "")
+            self.add_categories(col, labels.dropna().unique())
+            rows_df[col] = pd.Categorical(labels, dtype=self.df[col].dtype)
+        for col in TEXT_COLUMNS:
+            rows_df[col] = to_text(rows_df[col])
+        for col, dtype in ID_COLUMNS.items():
+            rows_df[col] = pd.to_numeric(rows_df[col], errors="coerce").astype(dtype)
+        rows_df["Amount"] = rows_df["Amount"].astype("int64")
+        return rows_df
+
+    @write_locked
+    def add_categories(self, column: str, labels: any) -> None:
+        """
+        Adds the labels missing from the categories of a column; account names are
+        added to both account name columns.
+        """
+        missing = pd.Index(labels, dtype="str").difference(self.df[column].cat.categories)
+        if len(missing):
+            columns = ACCOUNT_NAME_COLUMNS if column in ACCOUNT_NAME_COLUMNS else [column]
+            for col in columns:
+                self._df[col] = self._df[col].cat.add_categories(missing)
+
+    @write_locked
+    def set_label(self, column: str, rows: pd.Series, label: str) -> None:
+        """
+        Sets the label of a categorical column for the selected rows.
+        """
+        self.add_categories(column, [label])
+        self._df.loc[rows, column] = label
+
+    def get_label_mask(self, column: str, label: str) -> pd.Series:
+        """
+        Returns a mask of the rows whose label in a categorical column equals the
+        given one, ignoring case. Only the categories are compared as strings;
+        the rows are matched by their category codes.
+        """
+        categories = self.df[column].cat.categories
+        return self.df[column].isin(categories[categories.str.lower() == label.lower()])
+
+    @track_operation
+    def get_transaction_dates(self) -> pd.Series:
+        """
+        Returns the transaction dates parsed as datetimes, aligned with the DataFrame rows.
+        The parsed dates are kept up to date on inserts and deletions.
+        """
+        if self._dates is None:
+            self._dates = pd.to_datetime(
+                self.df["Date"], format="%d-%m-%Y"
+            ).reset_index(drop=True)
+        return self._dates
+
+    def get_account_index(self) -> dict:
+        """
+        Returns the posting lists: for each account ID, the sorted row positions
+        of the transactions that move money from or to the account.
+        """
+        if self._account_index is None:
+            from_positions = self.df.groupby("From_Account_ID", dropna=True).indices
+            to_positions = self.df.groupby("To_Account_ID", dropna=True).indices
+            self._account_index = {
+                int(account_id): np.sort(
+                    np.concatenate(
+                        [
+                            from_positions.get(account_id, np.array([], dtype=np.intp)),
+                            to_positions.get(account_id, np.array([], dtype=np.intp)),
+                        ]
+                    )
+                )
+                for account_id in set(from_positions) | set(to_positions)
+            }
+        return self._account_index
+
+    def get_account_transactions(self, account_id: int) -> pd.DataFrame:
+        """
+        Returns the transactions of an account, newest first, using its posting list.
+        """
+        positions = self.get_account_index().get(
+            int(account_id), np.array([], dtype=np.intp)
+        )
+        return self.df.iloc[positions]
 
     def get_next_transaction_id(self) -> int:
         """
@@ -140,26 +524,162 @@ class TransactionService:
         else:
             return self.df["Transaction_ID"].max() + 1
         
+    @track_operation
+    @write_locked
     def update_transactions_category(self, old_category_name: str, new_category_name: str) -> None:
         """
         Updates the category name for all transactions with the given old category name.
+        A new name only renames the category label, without touching the rows.
         """
-        transactions_to_update = self.df["Category"] == old_category_name
-        self.df.loc[transactions_to_update, "Category"] = new_category_name
+        categories = self.df["Category"].cat.categories
+        if old_category_name not in categories:
+            return
+        if new_category_name in categories:
+            self.set_label("Category", self.df["Category"] == old_category_name, new_category_name)
+        else:
+            self._df["Category"] = self._df["Category"].cat.rename_categories(
+                {old_category_name: new_category_name}
+            )
         self.save_transaction_to_file()
 
+    @track_operation
+    @write_locked
     def uncategorize_transactions(self, category_name: str) -> None:
         """
         Sets the category to 'Uncategorized' for all transactions with the given category name.
         """
         transactions_to_uncategorize = self.df["Category"] == category_name
-        self.df.loc[transactions_to_uncategorize, "Category"] = "Uncategorized"
+        self.set_label("Category", transactions_to_uncategorize, "Uncategorized")
         self.save_transaction_to_file()
 
+    @track_operation
+    @write_locked
     def update_account_name_in_transactions(self, account_id: int, new_name: str) -> None:
         """
         Updates the account name in transactions after an account name change.
         """
-        self.df.loc[self.df["From_Account_ID"] == account_id, "From_Account"] = new_name
-        self.df.loc[self.df["To_Account_ID"] == account_id, "To_Account"] = new_name
-        self.save_transaction_to_file()
\ No newline at end of file
+        self.set_label("From_Account", self.df["From_Account_ID"] == account_id, new_name)
+        self.set_label("To_Account", self.df["To_Account_ID"] == account_id, new_name)
+        self.save_transaction_to_file()
+
+
+class TransactionBuffer:
+    """
+    Collects transactions column by column, in typed arrays for the numbers and
+    lists for the labels, and adds them to the ledger in blocks. Each block is one
+    DataFrame built from the columns and one batched insert, instead of a one-row
+    DataFrame per transaction.
+    """
+
+    def __init__(self, transaction_service: any, block_size: int = BUFFER_BLOCK_SIZE) -> None:
+        """
+        Initializes an empty buffer for the transaction service.
+        """
+        self.transaction_service = transaction_service
+        self.block_size = block_size
+        self.clear()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of buffered transactions.
+        """
+        return len(self._amounts)
+
+    def __enter__(self) -> "TransactionBuffer":
+        """
+        Returns the buffer for use in a with block.
+        """
+        return self
+
+    def __exit__(self, exc_type: any, exc_value: any, traceback: any) -> None:
+        """
+        Adds the remaining transactions to the ledger when the with block succeeds.
+        """
+        if exc_type is None:
+            self.flush()
+
+    def clear(self) -> None:
+        """
+        Empties the buffer.
+        """
+        self._types = []
+        self._dates = []
+        self._amounts = array("q")
+        self._categories = []
+        self._from_account_ids = array("q")
+        self._from_accounts = []
+        self._to_account_ids = array("q")
+        self._to_accounts = []
+        self._notes = []
+
+    def append(
+        self,
+        transaction_type: str,
+        date: str,
+        amount: int,
+        from_account_id: int,
+        from_account: str,
+        to_account_id: int,
+        to_account: str,
+        note: str,
+        category_name: str = "Uncategorized",
+    ) -> None:
+        """
+        Buffers a transaction (amount in cents; an empty account ID means no account)
+        and adds the buffered block to the ledger once it is full.
+        """
+        self._types.append(transaction_type)
+        self._dates.append(date)
+        self._amounts.append(amount)
+        self._categories.append(category_name or "Uncategorized")
+        self._from_account_ids.append(self.convert_account_id(from_account_id))
+        self._from_accounts.append(from_account)
+        self._to_account_ids.append(self.convert_account_id(to_account_id))
+        self._to_accounts.append(to_account)
+        self._notes.append(note)
+        if len(self) >= self.block_size:
+            self.flush()
+
+    def convert_account_id(self, account_id: any) -> int:
+        """
+        Returns the account ID as an integer, or -1 when there is no account.
+        """
+        if pd.isna(account_id) or account_id == "":
+            return -1
+        return int(account_id)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the buffered transactions as a DataFrame without transaction IDs.
+        """
+        account_ids = {}
+        for column, ids in (
+            ("From_Account_ID", self._from_account_ids),
+            ("To_Account_ID", self._to_account_ids),
+        ):
+            values = np.array(ids, dtype=np.int64)
+            account_ids[column] = pd.arrays.IntegerArray(values.astype(np.int32), values < 0)
+        return pd.DataFrame(
+            {
+                "Type": self._types,
+                "Date": self._dates,
+                "Amount": np.array(self._amounts, dtype=np.int64),
+                "Category": self._categories,
+                "From_Account_ID": account_ids["From_Account_ID"],
+                "From_Account": self._from_accounts,
+                "To_Account_ID": account_ids["To_Account_ID"],
+                "To_Account": self._to_accounts,
+                "Note": self._notes,
+            }
+        )
+
+    def flush(self) -> pd.DataFrame:
+        """
+        Adds the buffered transactions to the ledger with one batched insert and
+        empties the buffer. Returns the added rows with their IDs.
+        """
+        if not len(self):
+            return pd.DataFrame(columns=self.transaction_service.columns)
+        added_df = self.transaction_service.add_transactions(self.to_frame())
+        self.clear()
+        return added_df
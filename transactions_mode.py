@@ -1,19 +1,35 @@
 import datetime
 import re
 from tabulate import tabulate
+from presets import FREQUENCIES, PRESET_TYPES, PresetService
+from budgets import BudgetService
+from allocations import AllocationService
+from journal import Journal
+from money import format_cents, parse_cents, to_units
 
 class TransactionsMode:
     """
     Allows user to record their transactions. 
     """
 
-    def __init__(self, transaction_service: any, category_service: any, account_service: any) -> None:
+    def __init__(self, transaction_service: any, category_service: any, account_service: any, budget_service: any = None, journal: any = None, allocation_service: any = None, preset_service: any = None) -> None:
         """
         Initializes TransactionsMode class.
         """
         self.transaction_service = transaction_service
         self.category_service = category_service
         self.account_service = account_service
+        self.budget_service = budget_service or BudgetService(transaction_service)
+        self.allocation_service = allocation_service or AllocationService(transaction_service, account_service)
+        self.preset_service = preset_service or PresetService(transaction_service, account_service)
+        self.journal = journal or Journal(
+            transaction_service,
+            account_service,
+            category_service,
+            self.budget_service,
+            self.allocation_service,
+            self.preset_service,
+        )
 
     def display_transactions_mode_menu(self) -> None:
         """
@@ -24,7 +40,8 @@ class TransactionsMode:
             print("1. Add income")
             print("2. Add expense")
             print("3. Add transfer")
-            print("4. Go back to main menu")
+            print("4. Recurring transactions")
+            print("5. Go back to main menu")
 
             choice = input("Enter your choice: ").strip()
 
@@ -35,6 +52,8 @@ class TransactionsMode:
             elif choice == "3":
                 self.add_transfer()
             elif choice == "4":
+                self.display_presets_menu()
+            elif choice == "5":
                 return
             else:
                 print("\n⚠️  Invalid input. Please enter a valid option.")
@@ -50,7 +69,7 @@ class TransactionsMode:
 
         try:
             date = self.get_date_input()
-            amount = self.get_float_input()
+            amount = self.get_amount_input()
 
             self.display_categories("Income")
             category = self.get_category_input("Income")
@@ -60,9 +79,22 @@ class TransactionsMode:
 
             note = input("\nEnter a note (optional): ")
 
+            allocations_df = self.allocation_service.compute_allocations(category, amount, to_account)
+            if not allocations_df.empty and self.confirm_allocations(allocations_df, to_account):
+                added_df = self.allocation_service.add_income_with_allocations(
+                    date, amount, category, to_account, note, allocations_df
+                )
+                self.journal.record(
+                    "add_transactions",
+                    f"income of {format_cents(amount)} on {date} with its allocations",
+                    transaction_ids=added_df["Transaction_ID"].tolist(),
+                )
+                print(f"\n✔️  Your income in the amount of {format_cents(amount)} on {date} has been added to {to_account} account under category '{category}' and allocated to {len(allocations_df)} account(s).")
+                return
+
             to_account_id = self.account_service.get_account_id_by_name(to_account)
 
-            self.transaction_service.add_transaction(
+            income = self.transaction_service.add_transaction(
                 transaction_type="Income",
                 date=date,
                 amount=amount,
@@ -75,8 +107,13 @@ class TransactionsMode:
             )
 
             self.account_service.update_account_balance(to_account, amount)
+            self.journal.record(
+                "add_transactions",
+                f"income of {format_cents(amount)} on {date}",
+                transaction_ids=[income.transaction_id],
+            )
 
-            print(f"\n✔️  Your income in the amount of {amount} on {date} has been added to {to_account} account under category '{category}'")
+            print(f"\n✔️  Your income in the amount of {format_cents(amount)} on {date} has been added to {to_account} account under category '{category}'")
         except EOFError:
             print("\n\nOperation was cancelled. Returning to previous menu...\n")
             return
@@ -91,7 +128,7 @@ class TransactionsMode:
 
         try:
             date = self.get_date_input()
-            amount = self.get_float_input()
+            amount = self.get_amount_input()
 
             self.display_categories("Expense")
             category = self.get_category_input("Expense")
@@ -107,7 +144,7 @@ class TransactionsMode:
                 
             from_account_id = self.account_service.get_account_id_by_name(from_account)
 
-            self.transaction_service.add_transaction(
+            expense = self.transaction_service.add_transaction(
                 transaction_type="Expense",
                 date=date,
                 amount=-amount,  
@@ -120,8 +157,16 @@ class TransactionsMode:
             )
 
             self.account_service.update_account_balance(from_account, -amount)
+            self.journal.record(
+                "add_transactions",
+                f"expense of {format_cents(amount)} on {date}",
+                transaction_ids=[expense.transaction_id],
+            )
+
+            print(f"\n✔️  Your expense in the amount of {format_cents(amount)} on {date} has been deducted from {from_account} account under category '{category}'")
 
-            print(f"\n✔️  Your expense in the amount of {amount} on {date} has been deducted from {from_account} account under category '{category}'")
+            self.budget_service.record_expense(category, date, amount)
+            self.display_budget_warnings(category, date)
         except EOFError:
             print("\n\nOperation was cancelled. Returning to previous menu...")
             return
@@ -136,7 +181,7 @@ class TransactionsMode:
 
         try:
             date = self.get_date_input()
-            amount = self.get_float_input()
+            amount = self.get_amount_input()
 
             self.display_accounts()
 
@@ -162,7 +207,7 @@ class TransactionsMode:
             from_account_id = self.account_service.get_account_id_by_name(from_account)
             to_account_id = self.account_service.get_account_id_by_name(to_account)
 
-            self.transaction_service.add_transaction(
+            transfer_out = self.transaction_service.add_transaction(
                 transaction_type="Transfer Out",
                 date=date,
                 amount=-amount, 
@@ -174,7 +219,7 @@ class TransactionsMode:
                 note=note
             )
 
-            self.transaction_service.add_transaction(
+            transfer_in = self.transaction_service.add_transaction(
                 transaction_type="Transfer In",
                 date=date,
                 amount=amount,
@@ -188,12 +233,200 @@ class TransactionsMode:
 
             self.account_service.update_account_balance(from_account, -amount)
             self.account_service.update_account_balance(to_account, amount)
+            self.journal.record(
+                "add_transactions",
+                f"transfer of {format_cents(amount)} from {from_account} to {to_account}",
+                transaction_ids=[transfer_out.transaction_id, transfer_in.transaction_id],
+            )
 
-            print(f"\n✔️  Your transfer from {from_account} account to {to_account} account in the amount of {amount} has been executed successfully.")
+            print(f"\n✔️  Your transfer from {from_account} account to {to_account} account in the amount of {format_cents(amount)} has been executed successfully.")
         except EOFError:
             print("\n\nOperation was cancelled. Returning to previous menu...")
             return
         
+    def confirm_allocations(self, allocations_df: any, from_account: str) -> bool:
+        """
+        Shows the transfers the allocation rules ask for and asks whether to make them.
+        """
+        print(f"\nYour allocation rules transfer from the {from_account} account:")
+        print(tabulate(allocations_df.assign(Amount=to_units(allocations_df["Amount"])).values.tolist(), headers=["To account", "Amount"], tablefmt="grid", floatfmt=",.2f"))
+        print("Would you like to make these transfers together with the income?")
+        print("1. Yes")
+        print("2. No")
+
+        while True:
+            user_choice = input("Select your option: ").strip()
+
+            if user_choice == "1":
+                return True
+            elif user_choice == "2":
+                return False
+            else:
+                print("\n⚠️  Invalid input. Please enter a valid option.\n")
+
+    def display_budget_warnings(self, category: str, date: str) -> None:
+        """
+        Warns the user when the category's spending is close to or over one of its limits.
+        """
+        period_names = {"weekly": "week", "monthly": "month", "quarterly": "quarter", "yearly": "year"}
+        expense_date = datetime.datetime.strptime(date, "%d-%m-%Y").date()
+        for budget in self.budget_service.check_budgets(category, expense_date):
+            period_name = period_names[budget["Period"]]
+            if budget["Spent"] > budget["Limit"]:
+                print(f"\n⚠️  You are over your {category} budget for this {period_name}: {format_cents(budget['Spent'])} of {format_cents(budget['Limit'])} spent ({budget['Used_%']:.0f}%).")
+            else:
+                print(f"\n⚠️  You are at {budget['Used_%']:.0f}% of your {category} budget for this {period_name}: {format_cents(budget['Spent'])} of {format_cents(budget['Limit'])} spent.")
+
+    def display_presets_menu(self) -> None:
+        """
+        Displays the recurring transactions (presets) menu.
+        """
+        while True:
+            print("\nRecurring transactions:")
+            print("1. Show presets")
+            print("2. Add preset")
+            print("3. Delete preset")
+            print("4. Add due transactions now")
+            print("5. Go back")
+
+            choice = input("Enter your choice: ").strip()
+
+            if choice == "1":
+                self.display_presets()
+            elif choice == "2":
+                self.add_preset()
+            elif choice == "3":
+                self.delete_preset()
+            elif choice == "4":
+                self.add_due_presets()
+            elif choice == "5":
+                return
+            else:
+                print("\n⚠️  Invalid input. Please enter a valid option.")
+
+    def display_presets(self) -> None:
+        """
+        Displays the presets.
+        """
+        presets_df = self.preset_service.df
+        if presets_df.empty:
+            print("\nYou have no recurring transactions yet.")
+            return
+
+        columns_to_display = ["Preset_ID", "Name", "Type", "Amount", "Category", "From_Account", "To_Account", "Frequency", "Start_Date", "Last_Run"]
+        headers = ["ID", "Name", "Type", "Amount", "Category", "From", "To", "Frequency", "Start date", "Last added"]
+        print("\nRecurring transactions:")
+        presets_df = presets_df.assign(Amount=to_units(presets_df["Amount"]))
+        print(tabulate(presets_df[columns_to_display].fillna("").values.tolist(), headers=headers, tablefmt="grid", floatfmt=",.2f"))
+
+    def add_preset(self) -> None:
+        """
+        Gets user inputs for a new preset and adds its occurrences that are already due.
+        """
+        print("\n🔁 Adding a recurring transaction:")
+
+        try:
+            name = input("\nEnter a name for the preset: ").strip()
+            while not name:
+                print("\n⚠️  The name cannot be empty.")
+                name = input("Enter a name for the preset: ").strip()
+
+            print("\nChoose the type of the transaction:")
+            for number, preset_type in enumerate(PRESET_TYPES, start=1):
+                print(f"{number}. {preset_type}")
+            preset_type = self.get_option_input(PRESET_TYPES)
+
+            print("\nChoose how often the transaction occurs:")
+            frequencies = list(FREQUENCIES)
+            for number, frequency in enumerate(frequencies, start=1):
+                print(f"{number}. {frequency.capitalize()}")
+            frequency = self.get_option_input(frequencies)
+
+            print("\nThe first occurrence:")
+            start_date = self.get_date_input()
+            amount = self.get_amount_input()
+
+            category = "Transfer"
+            if preset_type != "Transfer":
+                self.display_categories(preset_type)
+                category = self.get_category_input(preset_type)
+
+            self.display_accounts()
+            from_account = ""
+            to_account = ""
+            if preset_type == "Income":
+                to_account = self.get_account_input()
+            elif preset_type == "Expense":
+                from_account = self.get_account_input()
+            else:
+                print("\nChoose the account to transfer the funds from")
+                from_account = self.get_account_input()
+                while True:
+                    print("\nChoose the account to transfer the funds to")
+                    to_account = self.get_account_input()
+                    if from_account != to_account:
+                        break
+                    print("\n⚠️  Cannot transfer to the same account. Please choose a different account.")
+
+            note = input("\nEnter a note (optional): ")
+
+            self.preset_service.add_preset(
+                name=name,
+                transaction_type=preset_type,
+                amount=amount,
+                frequency=frequency,
+                start_date=start_date,
+                category_name=category,
+                from_account=from_account,
+                to_account=to_account,
+                note=note,
+            )
+            print(f"\n✔️  The '{name}' preset has been added.")
+            self.add_due_presets()
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+    def delete_preset(self) -> None:
+        """
+        Deletes a preset chosen by ID.
+        """
+        self.display_presets()
+        if self.preset_service.df.empty:
+            return
+
+        try:
+            preset_id = input("\nEnter the ID of the preset to delete: ").strip()
+        except EOFError:
+            print("\n\nOperation was cancelled. Returning to previous menu...")
+            return
+
+        if not preset_id.isdigit() or not self.preset_service.df["Preset_ID"].eq(int(preset_id)).any():
+            print("\n⚠️  Invalid preset ID.")
+            return
+        self.preset_service.delete_preset(int(preset_id))
+        print("\n✔️  The preset has been deleted. Transactions it already added were kept.")
+
+    def add_due_presets(self) -> None:
+        """
+        Adds all due occurrences of the presets to the ledger.
+        """
+        added = self.preset_service.materialize_due_presets()
+        if added:
+            print(f"\n✔️  {added} recurring transaction(s) have been added.")
+        else:
+            print("\nNo recurring transactions are due.")
+
+    def get_option_input(self, options: list) -> str:
+        """
+        Helper method that gets the number of one of the listed options, verifies it.
+        """
+        while True:
+            choice = input("Enter your choice: ").strip()
+            if choice.isdigit() and 1 <= int(choice) <= len(options):
+                return options[int(choice) - 1]
+            print("\n⚠️  Invalid input. Please enter a valid option.")
+
     def get_date_input(self) -> str:
         """
         Helper method that gets date, verifies input.
@@ -212,19 +445,16 @@ class TransactionsMode:
                 print("\n⚠️  Invalid date format. Please enter the date in DD-MM-YYYY format.")
                 date_input = input("Enter date: ").strip()
         
-    def get_float_input(self) -> float:
+    def get_amount_input(self) -> int:
         """
-        Helper method that gets a float input, verifies it.
+        Helper method that gets an amount input, verifies it and returns it in cents.
         """
         while True:
-            amount_input = input("\nEnter amount: ").strip().replace(",", ".")
-            parts = amount_input.split(".")
+            amount_input = input("\nEnter amount: ")
             try:
-                amount = float(amount_input)
+                amount = parse_cents(amount_input)
                 if amount <= 0:
                     raise ValueError("\n⚠️  Amount should be provided in format xx.xx.")
-                elif len(parts) > 1 and len(parts[1]) > 2:
-                    raise ValueError("\n⚠️  Amount must not have more than two decimal places.")
                 else:
                     return amount
             except ValueError:
@@ -272,8 +502,9 @@ class TransactionsMode:
         columns_to_display = ["Account_ID", "Name", "Balance"]
         headers = ["ID", "Name", "Balance"]
 
+        accounts_df = accounts_df.assign(Balance=to_units(accounts_df["Balance"]))
         accounts = accounts_df[columns_to_display].values.tolist()
-        print(tabulate(accounts, headers=headers, tablefmt="grid"))
+        print(tabulate(accounts, headers=headers, tablefmt="grid", floatfmt=",.2f"))
 
     def get_account_input(self) -> None:
         """